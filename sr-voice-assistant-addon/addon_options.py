@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""Home Assistant 애드온 옵션(/data/options.json) 로더"""
+import json
+import logging
+import os
+
+_LOGGER = logging.getLogger(__name__)
+
+OPTIONS_FILE = "/data/options.json"
+
+
+def load_options() -> dict:
+    """애드온 옵션을 읽어 dict로 반환 (파일이 없거나 깨졌으면 빈 dict)"""
+    if not os.path.exists(OPTIONS_FILE):
+        return {}
+
+    try:
+        with open(OPTIONS_FILE, 'r', encoding='utf-8') as f:
+            options = json.load(f)
+        return options if isinstance(options, dict) else {}
+    except Exception as e:
+        _LOGGER.error(f"애드온 옵션 로드 실패: {e}")
+        return {}
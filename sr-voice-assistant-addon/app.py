@@ -1,182 +1,96 @@
-import json
-import os
-from datetime import datetime, timedelta
-from flask import Flask, render_template_string, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify
 from flask_socketio import SocketIO
+from eventlet import tpool
+from chat_service import ChatService, RETENTION_INTERVAL, PAGE_SIZE, SEARCH_PAGE_SIZE, make_message
+from chat_broadcast import BroadcastCoalescer, BROADCAST_WINDOW
+from chat_feed import ChatFeedListener
+from addon_options import load_options
+import metrics
 
 app = Flask(__name__)
 socketio = SocketIO(app, cors_allowed_origins="*")
+# 연달아 들어오는 메시지는 new_messages 한 번으로 묶어서 전송
+broadcaster = BroadcastCoalescer(socketio)
 
-DB_FILE = '/data/chat_db.json'
+# 대화 기록/검색 (Chat UI 공통 로직)
+chat_service = ChatService(load_options())
+chat_service.load()
 
-# HTML 템플릿 (인라인)
-HTML_TEMPLATE = """<!DOCTYPE html>
-<html lang="ko">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>음성 대화 기록</title>
-    <style>
-body {
-    margin: 0;
-    font-family: "Apple SD Gothic Neo", "Noto Sans KR", sans-serif;
-    background-color: #e5e5e5;
-}
 
-.chat-container {
-    height: 100vh;
-    padding: 15px;
-    overflow-y: auto;
-    box-sizing: border-box;
-    display: flex;
-    flex-direction: column;
-}
+def retention_loop():
+    """보존 기간이 지난 대화를 주기적으로 정리 (요청 처리 경로와 분리)"""
+    while True:
+        socketio.sleep(RETENTION_INTERVAL)
+        chat_service.expire()
 
-.chat-row:first-child {
-    margin-top: auto !important;
-}
-
-.chat-row {
-    display: flex;
-    margin-bottom: 10px;
-}
-
-.chat-row.user {
-    justify-content: flex-end;
-}
-
-.chat-row.user .bubble {
-    background-color: #fef01b;
-    border-radius: 15px 15px 0 15px;
-}
-
-.chat-row.assistant {
-    justify-content: flex-start;
-}
-
-.chat-row.assistant .bubble {
-    background-color: white;
-    border-radius: 15px 15px 15px 0;
-}
-
-.bubble {
-    max-width: 70%;
-    padding: 10px 14px;
-    font-size: 15px;
-    line-height: 1.4;
-    box-shadow: 0 1px 2px rgba(0,0,0,0.1);
-    word-break: break-word;
-}
-    </style>
-</head>
-<body>
-<div class="chat-container" id="chat">
-    {% for chat in chat_history %}
-        <div class="chat-row {{ chat.role }}">
-            <div class="bubble">
-                {{ chat.message }}
-            </div>
-        </div>
-    {% endfor %}
-</div>
-
-<script src="https://cdn.socket.io/4.7.2/socket.io.min.js"></script>
-<script>
-    const chat = document.getElementById("chat");
-    
-    window.onload = function() {
-        chat.scrollTop = chat.scrollHeight;
-    };
-
-    const socket = io(); 
-    socket.on("new_message", data => {
-        const row = document.createElement("div");
-        row.className = `chat-row ${data.role}`;
-
-        const bubble = document.createElement("div");
-        bubble.className = "bubble";
-        bubble.innerText = data.message;
-
-        row.appendChild(bubble);
-        chat.appendChild(row);
-
-        chat.scrollTop = chat.scrollHeight;
-    });
-</script>
-</body>
-</html>"""
-
-def load_and_clean_history():
-    """파일에서 대화를 불러오고 30일이 지난 데이터는 삭제"""
-    if not os.path.exists(DB_FILE):
-        return []
-    
+def chat_feed_loop():
+    """STT/TTS 서버가 Unix 소켓으로 보낸 메시지를 바로 저장 + 전송 (HA 자동화 불필요)"""
     try:
-        with open(DB_FILE, 'r', encoding='utf-8') as f:
-            history = json.load(f)
-        
-        one_month_ago = datetime.now() - timedelta(days=30)
-        
-        clean_history = [
-            msg for msg in history 
-            if "timestamp" not in msg or datetime.fromisoformat(msg["timestamp"]) > one_month_ago
-        ]
-        return clean_history
-    except Exception as e:
-        print(f"[ERROR] 히스토리 로드 실패: {e}")
-        return []
-
-chat_history = load_and_clean_history()
+        listener = ChatFeedListener()
+    except OSError as e:
+        print(f"[ERROR] 직접 전달 소켓 생성 실패: {e}")
+        return
+    while True:
+        # 전송 묶음 간격마다 쌓인 메시지를 한 번에 처리
+        socketio.sleep(BROADCAST_WINDOW)
+        messages = [m for m in map(make_message, listener.drain()) if m is not None]
+        if messages:
+            store_and_broadcast(messages)
 
 @app.route("/")
 def index():
-    return render_template_string(HTML_TEMPLATE, chat_history=chat_history)
+    return chat_service.render_index()
+
+@app.route("/history")
+def history():
+    return jsonify(chat_service.history_page(
+        before=request.args.get("before", type=int),
+        limit=request.args.get("limit", PAGE_SIZE, type=int),
+    ))
+
+@app.route("/search")
+def search():
+    return jsonify(chat_service.search(
+        request.args.get("q", ""),
+        offset=request.args.get("offset", 0, type=int),
+        limit=request.args.get("limit", SEARCH_PAGE_SIZE, type=int),
+    ))
+
+def store_and_broadcast(messages):
+    chat_service.store(messages)
+    
+    # WebSocket으로 실시간 전송 (짧은 시간 안의 메시지는 묶어서)
+    broadcaster.publish(messages)
+
+@app.route("/metrics")
+def metrics_text():
+    """STT/TTS 서버 단계별 지표 (Prometheus 텍스트 형식)"""
+    # 소켓 수집은 블로킹 호출이므로 eventlet 허브를 막지 않도록 스레드 풀에서 실행
+    text = tpool.execute(metrics.collect, metrics.METRICS_PROCESSES)
+    return Response(text, content_type=metrics.CONTENT_TYPE)
 
 @app.route("/add", methods=["POST"])
 def add_message():
-    global chat_history
-    data = request.json
-    
-    new_msg = {
-        "role": data["role"],
-        "message": data["message"],
-        "timestamp": datetime.now().isoformat()
-    }
-    
-    # --- Robot Control JSON Filter ---
-    try:
-        if new_msg["role"] == "assistant":
-            # Remove [ ... ] JSON block if present
-            import re
-            json_pattern = r'(\[.*?\])'
-            new_msg["message"] = re.sub(json_pattern, '', new_msg["message"], flags=re.DOTALL).strip()
-            # Also clean up potential markdown block artifacts around it
-            new_msg["message"] = re.sub(r'^```json\s*', '', new_msg["message"])
-            new_msg["message"] = re.sub(r'^```\s*', '', new_msg["message"])
-            new_msg["message"] = re.sub(r'```\s*$', '', new_msg["message"]).strip()
-    except:
-        pass
-    # ---------------------------------
+    new_msg = make_message(request.json)
+    if new_msg is None:
+        return jsonify({"status": "error", "error": "role, message 필요"}), 400
     
-    chat_history.append(new_msg)
-    
-    # 30일 지난 데이터 정리
-    chat_history = [
-        msg for msg in chat_history 
-        if datetime.fromisoformat(msg["timestamp"]) > (datetime.now() - timedelta(days=30))
-    ]
-    
-    # 파일 저장
-    try:
-        with open(DB_FILE, 'w', encoding='utf-8') as f:
-            json.dump(chat_history, f, ensure_ascii=False, indent=4)
-    except Exception as e:
-        print(f"[ERROR] 파일 저장 실패: {e}")
-    
-    # WebSocket으로 실시간 전송
-    socketio.emit("new_message", new_msg)
+    store_and_broadcast([new_msg])
     return jsonify({"status": "ok"})
 
+@app.route("/add_batch", methods=["POST"])
+def add_messages():
+    """메시지 목록을 한 번에 추가 (요청 본문: [{role, message}, ...])"""
+    messages, error = chat_service.parse_batch(request.json)
+    if error:
+        return jsonify({"status": "error", "error": error}), 400
+    
+    if messages:
+        store_and_broadcast(messages)
+    return jsonify({"status": "ok", "added": len(messages)})
+
 if __name__ == "__main__":
     print("[INFO] Flask Chat UI 서버 시작 (Port 9822)...")
+    socketio.start_background_task(retention_loop)
+    socketio.start_background_task(chat_feed_loop)
     socketio.run(app, host="0.0.0.0", port=9822)
\ No newline at end of file
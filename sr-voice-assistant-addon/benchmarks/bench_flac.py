@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""FLAC 인코딩 벤치마크: flac 실행 파일(SpeechRecognition 기본) vs 프로세스 내 인코딩
+
+사용법: python3 benchmarks/bench_flac.py [--seconds 5] [--repeat 20]
+결과는 오디오 1초당 인코딩 시간(ms)으로 출력합니다.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import speech_recognition as sr
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from flac_encoder import encode_flac  # noqa: E402
+from stt_vad import SAMPLE_RATE, SAMPLE_WIDTH  # noqa: E402
+
+
+def make_speechlike_audio(seconds: float) -> bytes:
+    """음성과 비슷한 스펙트럼의 합성 오디오 (압축률이 실제와 비슷하도록)"""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 3 * t)
+    voice = sum(np.sin(2 * np.pi * f * t) / (i + 1) for i, f in enumerate((180, 360, 720, 1440)))
+    audio = envelope * voice * 6000 + rng.normal(0, 200, len(t))
+    return np.clip(audio, -32768, 32767).astype('<i2').tobytes()
+
+
+def bench(name, func, seconds, repeat):
+    func()  # 워밍업
+    start = time.perf_counter()
+    for _ in range(repeat):
+        size = len(func())
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"{name:<28} {elapsed * 1000 / seconds:8.2f} ms/초   ({size} bytes)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    audio = make_speechlike_audio(args.seconds)
+    print(f"오디오 {args.seconds}초, {len(audio)} bytes, 반복 {args.repeat}회")
+
+    bench(
+        "flac 실행 파일 (before)",
+        lambda: sr.AudioData(audio, SAMPLE_RATE, SAMPLE_WIDTH).get_flac_data(),
+        args.seconds, args.repeat,
+    )
+    bench(
+        "프로세스 내 (after)",
+        lambda: encode_flac(memoryview(audio), SAMPLE_RATE),
+        args.seconds, args.repeat,
+    )
+
+
+if __name__ == "__main__":
+    main()
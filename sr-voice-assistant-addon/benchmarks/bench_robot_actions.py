@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""로봇 동작 블록 추출 벤치마크: 기존 정규식 처리 vs 단일 스캔 파서
+
+파서의 경계 사례와 무작위 입력 검사는 tests/test_robot_actions.py에 있습니다.
+
+사용법: python3 benchmarks/bench_robot_actions.py [--repeat 2000]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from robot_actions import ActionBlockParser, extract_actions  # noqa: E402
+
+SAMPLES = {
+    "텍스트만": "오늘 날씨는 맑고 기온은 23도입니다. 외출하기 좋은 날이에요!" * 3,
+    "펜스 + 동작": (
+        "좋아요, 인사할게요!\n```json\n"
+        + json.dumps([{"r": 10, "p": -5, "y": 20, "a": 30, "d": 0.4}] * 8)
+        + "\n```\n반갑습니다."
+    ),
+    "괄호 텍스트 + 동작": (
+        "[웃음] 알겠어요. " + json.dumps([{"y": 30, "d": 0.5}, {"y": -30, "d": 0.5}]) + " 끝!"
+    ),
+}
+
+
+def extract_actions_regex(text):
+    """기존 wyoming_tts.py / app.py 방식 (비교용)"""
+    actions = None
+    match = re.search(r'(\[.*?\])', text, re.DOTALL)
+    if match:
+        try:
+            actions = json.loads(match.group(1))
+            start, end = match.span(1)
+            pre_text = re.sub(r'```\w*\s*$', '', text[:start])
+            post_text = re.sub(r'^\s*```', '', text[end:])
+            text = (pre_text + post_text).strip()
+        except json.JSONDecodeError:
+            pass
+    return text, actions
+
+
+def extract_actions_chunked(text, size):
+    parser = ActionBlockParser()
+    out = "".join(parser.feed(text[i:i + size]) for i in range(0, len(text), size))
+    return (out + parser.finish()).strip(), parser.actions
+
+
+def bench(name, func, text, repeat):
+    func(text)  # 워밍업
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(text)
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"  {name:<26} {elapsed * 1e6:8.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    for label, text in SAMPLES.items():
+        print(f"{label} ({len(text)}자)")
+        bench("정규식 (before)", extract_actions_regex, text, args.repeat)
+        bench("단일 스캔 (after)", extract_actions, text, args.repeat)
+        bench("단일 스캔, 16자 조각", lambda t: extract_actions_chunked(t, 16), text, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
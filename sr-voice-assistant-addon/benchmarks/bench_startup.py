@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""애드온 시작 시간/메모리 비교: 3개 프로세스(run.sh 기본) vs 단일 프로세스(supervisor.py)
+
+세 포트(Chat UI 9822, STT 10300, TTS 10400)가 모두 연결을 받을 때까지의 시간과
+그 시점 모든 프로세스의 상주 메모리(VmRSS) 합계를 잽니다. 애드온 컨테이너 안에서
+(/data 사용 가능, 포트 비어 있음) 실행하세요.
+
+사용법: python3 benchmarks/bench_startup.py [--repeat 3]
+"""
+import argparse
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+ADDON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+PORTS = (9822, 10300, 10400)
+LAYOUTS = {
+    "3개 프로세스 (before)": [["app.py"], ["wyoming_stt.py"], ["wyoming_tts.py"]],
+    "단일 프로세스 (after)": [["supervisor.py"]],
+}
+READY_TIMEOUT = 60.0
+
+
+def port_open(port: int) -> bool:
+    try:
+        with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+            return True
+    except OSError:
+        return False
+
+
+def rss_kb(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def measure(commands: list):
+    """(세 포트가 모두 열릴 때까지 걸린 초, 전체 RSS MB)"""
+    if any(port_open(port) for port in PORTS):
+        sys.exit("포트가 이미 사용 중입니다 - 애드온을 멈춘 뒤 실행하세요")
+    start = time.monotonic()
+    procs = [
+        subprocess.Popen([sys.executable, *command], cwd=ADDON_DIR,
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        for command in commands
+    ]
+    try:
+        pending = set(PORTS)
+        while pending:
+            if time.monotonic() - start > READY_TIMEOUT:
+                raise RuntimeError(f"{READY_TIMEOUT:.0f}초 안에 열리지 않은 포트: {sorted(pending)}")
+            pending = {port for port in pending if not port_open(port)}
+            time.sleep(0.01)
+        elapsed = time.monotonic() - start
+        # 사전 워밍 등 백그라운드 초기화가 자리 잡을 때까지 잠시 대기
+        time.sleep(1.0)
+        return elapsed, sum(rss_kb(proc.pid) for proc in procs) / 1024
+    finally:
+        for proc in procs:
+            proc.send_signal(signal.SIGTERM)
+        for proc in procs:
+            try:
+                proc.wait(10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+        # 다음 측정 전에 포트가 풀릴 때까지 대기
+        while any(port_open(port) for port in PORTS):
+            time.sleep(0.05)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for label, commands in LAYOUTS.items():
+        results = [measure(commands) for _ in range(args.repeat)]
+        best_time = min(elapsed for elapsed, _ in results)
+        best_rss = min(rss for _, rss in results)
+        print(f"{label:<22} 시작 {best_time:6.2f}초   메모리 {best_rss:7.1f} MB   ({args.repeat}회 중 최솟값)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""TTS 오디오 전송 벤치마크: AudioChunk(1024 bytes)마다 write_event vs AudioStreamWriter 묶음 전송
+
+Unix 소켓 건너편에서 읽기만 하는 상대에게 합성 결과와 같은 크기(4096 bytes)로 나오는 PCM을
+보내고, 오디오 1초당 CPU 시간, 이벤트 수, transport 쓰기 수를 비교합니다. 묶음 전송 결과는
+wyoming 파서로 다시 읽어 오디오가 그대로인지 확인합니다.
+
+--decoder: 문장 하나를 ffmpeg로 디코딩할 때 매번 프로세스를 띄우는 경우와 DecoderPool로
+미리 띄워 둔 경우의 첫 PCM까지 시간과 CPU 시간(부모 + ffmpeg)을 비교합니다.
+
+사용법: python3 benchmarks/bench_tts_emit.py [--seconds 60] [--chunk-ms 100]
+        python3 benchmarks/bench_tts_emit.py --decoder [--segments 50]
+"""
+import argparse
+import asyncio
+import os
+import resource
+import sys
+import tempfile
+import time
+
+from wyoming.audio import AudioChunk, AudioStop
+from wyoming.event import async_read_event, async_write_event
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from tts_stream import TTS_RATE, TTS_WIDTH, TTS_CHANNELS, DecoderPool, _spawn_decoder, _kill  # noqa: E402
+from tts_writer import AudioStreamWriter  # noqa: E402
+from standins import make_mp3  # noqa: E402
+
+PCM_PIECE = 4096
+
+
+class CountingWriter:
+    """StreamWriter의 write/writelines 호출 수를 세는 래퍼"""
+
+    def __init__(self, writer):
+        self._writer = writer
+        self.writes = 0
+
+    def write(self, data):
+        self.writes += 1
+        self._writer.write(data)
+
+    def writelines(self, data):
+        self.writes += 1
+        self._writer.writelines(data)
+
+    def __getattr__(self, attr):
+        return getattr(self._writer, attr)
+
+
+async def emit_per_chunk(writer, pcm_pieces):
+    """기존 방식: 1024 bytes마다 AudioChunk 이벤트를 만들고 write_event"""
+    events = 0
+    for pcm in pcm_pieces:
+        for i in range(0, len(pcm), 1024):
+            await async_write_event(AudioChunk(
+                audio=pcm[i:i + 1024], rate=TTS_RATE, width=TTS_WIDTH, channels=TTS_CHANNELS
+            ).event(), writer)
+            events += 1
+    await async_write_event(AudioStop().event(), writer)
+    return events
+
+
+async def emit_batched(writer, pcm_pieces, chunk_ms):
+    stream = AudioStreamWriter(writer, TTS_RATE, TTS_WIDTH, TTS_CHANNELS, chunk_ms=chunk_ms)
+    for pcm in pcm_pieces:
+        await stream.write(pcm)
+    await stream.finish()
+    return stream.chunks
+
+
+async def drain_reader(reader, parse: bool):
+    """상대 쪽: 끝까지 읽기 (parse면 이벤트로 해석해 오디오 바이트 수 반환)"""
+    if not parse:
+        while await reader.read(65536):
+            pass
+        return None
+    audio = bytearray()
+    while True:
+        event = await async_read_event(reader)
+        if event is None or AudioStop.is_type(event.type):
+            return bytes(audio)
+        if AudioChunk.is_type(event.type):
+            audio += AudioChunk.from_event(event).audio
+
+
+async def run(name, emit, pcm_pieces, parse=False):
+    path = os.path.join(tempfile.mkdtemp(), "emit.sock")
+    received = asyncio.get_running_loop().create_future()
+
+    async def handle(reader, writer):
+        received.set_result(await drain_reader(reader, parse))
+        writer.close()
+
+    server = await asyncio.start_unix_server(handle, path)
+    _, raw_writer = await asyncio.open_unix_connection(path)
+    writer = CountingWriter(raw_writer)
+
+    started_cpu = time.process_time()
+    started = time.perf_counter()
+    events = await emit(writer)
+    writer.write_eof()
+    audio = await received
+    elapsed = time.perf_counter() - started
+    cpu = time.process_time() - started_cpu
+
+    raw_writer.close()
+    server.close()
+    os.unlink(path)
+    return name, cpu, elapsed, events, writer.writes, audio
+
+
+def _cpu_seconds() -> float:
+    """이 프로세스 + 종료된 자식(ffmpeg) CPU 시간"""
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+async def decode_segments(mp3: bytes, segments: int, pool: bool):
+    """문장 segments개를 차례로 디코딩 - (첫 PCM까지 시간 목록, CPU 초)"""
+    decoders = DecoderPool() if pool else None
+    if decoders is not None:
+        decoders.fill()
+        await asyncio.sleep(0.5)
+    first = []
+    started_cpu = _cpu_seconds()
+    for _ in range(segments):
+        started = time.perf_counter()
+        proc = await (decoders.acquire() if decoders is not None else _spawn_decoder())
+        proc.stdin.write(mp3)
+        proc.stdin.close()
+        await proc.stdout.read(4096)
+        first.append(time.perf_counter() - started)
+        while await proc.stdout.read(65536):
+            pass
+        await (decoders.release(proc) if decoders is not None else _kill(proc))
+        # 문장 사이 간격 (재생 중 다음 문장 준비)
+        await asyncio.sleep(0.05)
+    if decoders is not None:
+        await decoders.close()
+    return first, _cpu_seconds() - started_cpu
+
+
+async def bench_decoder(segments: int):
+    mp3 = make_mp3(2.0)
+    for name, pool in (("문장마다 ffmpeg 시작 (before)", False), ("DecoderPool (after)", True)):
+        first, cpu = await decode_segments(mp3, segments, pool)
+        first.sort()
+        print(
+            f"{name:<30} 첫 PCM p50 {first[len(first) // 2] * 1000:6.1f}ms   "
+            f"p95 {first[int(len(first) * 0.95)] * 1000:6.1f}ms   문장당 CPU {cpu / segments * 1000:6.1f}ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=60.0, help="보낼 오디오 길이")
+    parser.add_argument("--chunk-ms", type=int, default=100)
+    parser.add_argument("--decoder", action="store_true", help="ffmpeg 디코더 시작 비용 비교")
+    parser.add_argument("--segments", type=int, default=50, help="--decoder에서 디코딩할 문장 수")
+    args = parser.parse_args()
+
+    if args.decoder:
+        asyncio.run(bench_decoder(args.segments))
+        return
+
+    total = int(args.seconds * TTS_RATE) * TTS_WIDTH * TTS_CHANNELS
+    pcm = os.urandom(total)
+    pieces = [pcm[i:i + PCM_PIECE] for i in range(0, total, PCM_PIECE)]
+
+    # 묶음 전송 결과가 wyoming 파서로 같은 오디오인지 확인
+    *_, audio = asyncio.run(run("check", lambda w: emit_batched(w, pieces, args.chunk_ms), pieces, parse=True))
+    if audio != pcm:
+        sys.exit("묶음 전송 결과가 원본 오디오와 다릅니다")
+
+    for name, emit in (
+        ("1024 bytes write_event (before)", lambda w: emit_per_chunk(w, pieces)),
+        (f"AudioStreamWriter {args.chunk_ms}ms (after)", lambda w: emit_batched(w, pieces, args.chunk_ms)),
+    ):
+        _, cpu, elapsed, events, writes, _ = asyncio.run(run(name, emit, pieces))
+        print(
+            f"{name:<34} 오디오 1초당 CPU {cpu / args.seconds * 1000:6.2f}ms   "
+            f"이벤트 {events:6d}   transport 쓰기 {writes:6d}   ({elapsed:.2f}초)"
+        )
+
+
+if __name__ == "__main__":
+    main()
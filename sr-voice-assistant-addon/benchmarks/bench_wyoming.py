@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""Wyoming STT/TTS 서버 부하 벤치마크 - 지연 분위수(p50/p95/p99), 처리량, JSON 결과 비교
+
+Wyoming 클라이언트로 STT(10300)에 WAV를 AudioStart/AudioChunk/AudioStop으로 재생하고,
+TTS(10400)에 Synthesize 요청을 지정한 동시성으로 보냅니다.
+
+기본값은 네트워크 없이 동작하도록 `serve` 하위 명령을 자식 프로세스로 띄웁니다. 이 서버는
+실제 핸들러(wyoming_stt/wyoming_tts)에 Google 인식, gTTS, HA 서비스 API 대역
+(benchmarks/standins.py, 지연 설정 가능)만 끼워 넣은 것입니다. --external이면 이미 실행 중인
+애드온을 그대로 측정합니다. ffmpeg가 필요합니다.
+
+사용법:
+  python3 benchmarks/bench_wyoming.py --output before.json
+  python3 benchmarks/bench_wyoming.py --baseline before.json --output after.json
+  python3 benchmarks/bench_wyoming.py --wav hello.wav --concurrency 8 --stt-delay 0.5
+  python3 benchmarks/bench_wyoming.py --external --host homeassistant.local
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import math
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+from functools import partial
+
+from wyoming.asr import Transcribe, Transcript
+from wyoming.audio import AudioChunk, AudioStart, AudioStop
+from wyoming.client import AsyncTcpClient
+from wyoming.tts import Synthesize, SynthesizeVoice
+
+ADDON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ADDON_DIR)
+from utterance_buffer import SAMPLE_RATE, SAMPLE_WIDTH  # noqa: E402
+from tts_stream import TTS_RATE, TTS_WIDTH, TTS_CHANNELS  # noqa: E402
+
+RESULT_VERSION = 1
+STT_PORT = 10300
+TTS_PORT = 10400
+HA_PORT = 18123
+# HA가 보내는 것과 같은 AudioChunk 크기 (16kHz 16bit mono 32ms)
+CHUNK_BYTES = 1024
+READY_TIMEOUT = 60.0
+
+# {n}: 요청 번호 (문장 단위 TTS 캐시가 적중하지 않도록 모든 문장에 포함)
+TTS_TEXTS = [
+    "오늘 날씨는 맑고 기온은 {n}도입니다.",
+    "거실 조명을 {n}% 밝기로 켰어요. 다른 도움이 필요하면 {n}번 말씀해 주세요.",
+    "내일 아침 {n}분에 알람을 맞췄습니다.",
+]
+ROBOT_BLOCK = ' ```json\n[{"r": 10, "d": 0.3}, {"y": -20, "d": 0.3}, {"y": 0}]\n``` '
+
+
+def percentile(values: list, p: float) -> float:
+    """선형 보간 분위수 (p: 0~100)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * p / 100
+    low = math.floor(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize_ms(values: list) -> dict:
+    return {
+        "p50": round(percentile(values, 50) * 1000, 1),
+        "p95": round(percentile(values, 95) * 1000, 1),
+        "p99": round(percentile(values, 99) * 1000, 1),
+        "mean": round(sum(values) / len(values) * 1000, 1) if values else 0.0,
+        "max": round(max(values) * 1000, 1) if values else 0.0,
+    }
+
+
+# ---------------------------------------------------------------- 오디오 fixture
+
+def load_wav(path: str) -> bytes:
+    """16kHz 16bit mono WAV의 PCM (다른 형식은 종료)"""
+    with wave.open(path, "rb") as f:
+        if (f.getframerate(), f.getsampwidth(), f.getnchannels()) != (SAMPLE_RATE, SAMPLE_WIDTH, 1):
+            sys.exit(f"{path}: {SAMPLE_RATE}Hz {SAMPLE_WIDTH * 8}bit mono WAV만 지원합니다")
+        return f.readframes(f.getnframes())
+
+
+def make_utterance(voice_seconds: float = 1.5, silence_seconds: float = 0.5) -> bytes:
+    """무음 - 음성 비슷한 신호 - 무음 (WAV가 없을 때의 기본 fixture)"""
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    t = np.arange(int(voice_seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 3 * t)
+    voice = sum(np.sin(2 * np.pi * f * t) / (i + 1) for i, f in enumerate((180, 360, 720, 1440)))
+    silence = np.zeros(int(silence_seconds * SAMPLE_RATE))
+    audio = np.concatenate([silence, envelope * voice * 6000, silence])
+    audio = audio + rng.normal(0, 30, len(audio))
+    return np.clip(audio, -32768, 32767).astype("<i2").tobytes()
+
+
+# ---------------------------------------------------------------- 요청
+
+async def stt_request(host: str, port: int, audio: bytes, realtime: bool) -> dict:
+    """발화 하나를 재생하고 AudioStop부터 Transcript까지 시간 측정"""
+    started = time.monotonic()
+    async with AsyncTcpClient(host, port) as client:
+        await client.write_event(Transcribe(language="ko-KR").event())
+        await client.write_event(AudioStart(rate=SAMPLE_RATE, width=SAMPLE_WIDTH, channels=1).event())
+        for i in range(0, len(audio), CHUNK_BYTES):
+            await client.write_event(AudioChunk(
+                audio=audio[i:i + CHUNK_BYTES], rate=SAMPLE_RATE, width=SAMPLE_WIDTH, channels=1
+            ).event())
+            if realtime:
+                # 마이크처럼 오디오 길이에 맞춰 전송
+                due = started + (i + CHUNK_BYTES) / (SAMPLE_RATE * SAMPLE_WIDTH)
+                await asyncio.sleep(max(0.0, due - time.monotonic()))
+        stopped = time.monotonic()
+        await client.write_event(AudioStop().event())
+        while True:
+            event = await client.read_event()
+            if event is None:
+                raise ConnectionError("Transcript 전에 연결 종료")
+            if Transcript.is_type(event.type):
+                text = Transcript.from_event(event).text
+                break
+    done = time.monotonic()
+    return {"latency": done - stopped, "total": done - started, "ok": bool(text)}
+
+
+async def tts_request(host: str, port: int, text: str) -> dict:
+    """Synthesize 하나를 보내고 첫 AudioChunk / AudioStop까지 시간 측정"""
+    started = time.monotonic()
+    first_chunk = None
+    audio_bytes = 0
+    async with AsyncTcpClient(host, port) as client:
+        await client.write_event(Synthesize(text=text, voice=SynthesizeVoice(name="ko")).event())
+        while True:
+            event = await client.read_event()
+            if event is None:
+                raise ConnectionError("AudioStop 전에 연결 종료")
+            if AudioChunk.is_type(event.type):
+                if first_chunk is None:
+                    first_chunk = time.monotonic()
+                audio_bytes += len(AudioChunk.from_event(event).audio)
+            elif AudioStop.is_type(event.type):
+                break
+    done = time.monotonic()
+    if first_chunk is None:
+        first_chunk = done
+    return {
+        "first_chunk": first_chunk - started, "total": done - started,
+        "audio_bytes": audio_bytes, "ok": audio_bytes > 0,
+    }
+
+
+async def run_load(make_request, count: int, concurrency: int, timeout: float):
+    """count개 요청을 동시성 concurrency로 실행 - (결과 목록, 오류 목록, 경과 초)"""
+    results, errors = [], []
+    next_index = iter(range(count))
+
+    async def worker():
+        for index in next_index:
+            try:
+                results.append(await asyncio.wait_for(make_request(index), timeout))
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+
+    started = time.monotonic()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return results, errors, time.monotonic() - started
+
+
+def _summary(results: list, errors: list, elapsed: float, count: int) -> dict:
+    ok = [r for r in results if r["ok"]]
+    return {
+        "requests": count,
+        "ok": len(ok),
+        "failed": count - len(ok),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(ok) / elapsed, 2) if elapsed else 0.0,
+        "errors": sorted(set(errors))[:5],
+    }
+
+
+async def bench_stt(args, fixtures: list) -> dict:
+    request = lambda i: stt_request(args.host, args.stt_port, fixtures[i % len(fixtures)], args.realtime)
+    # 첫 요청(지연 import, 연결 풀)은 통계에서 제외
+    await run_load(request, args.warmup, 1, args.timeout)
+    results, errors, elapsed = await run_load(request, args.stt_requests, args.concurrency, args.timeout)
+    summary = _summary(results, errors, elapsed, args.stt_requests)
+    audio_seconds = sum(
+        len(fixtures[i % len(fixtures)]) for i in range(len(results))
+    ) / (SAMPLE_RATE * SAMPLE_WIDTH)
+    summary["audio_seconds_per_s"] = round(audio_seconds / elapsed, 2) if elapsed else 0.0
+    summary["latency_ms"] = summarize_ms([r["latency"] for r in results if r["ok"]])
+    summary["total_ms"] = summarize_ms([r["total"] for r in results if r["ok"]])
+    return summary
+
+
+async def bench_tts(args) -> dict:
+    def text_for(i: int) -> str:
+        text = TTS_TEXTS[i % len(TTS_TEXTS)].format(n=0 if args.repeat_text else i)
+        return text + ROBOT_BLOCK if args.robot else text
+
+    # 워밍업은 측정 문장과 겹치지 않도록 음수 번호 사용 (--repeat-text면 캐시를 미리 채움)
+    await run_load(lambda i: tts_request(args.host, args.tts_port, text_for(-1 - i)), args.warmup, 1, args.timeout)
+    results, errors, elapsed = await run_load(
+        lambda i: tts_request(args.host, args.tts_port, text_for(i)), args.tts_requests, args.concurrency, args.timeout
+    )
+    summary = _summary(results, errors, elapsed, args.tts_requests)
+    audio_seconds = sum(r["audio_bytes"] for r in results) / (TTS_RATE * TTS_WIDTH * TTS_CHANNELS)
+    summary["audio_seconds_per_s"] = round(audio_seconds / elapsed, 2) if elapsed else 0.0
+    summary["first_chunk_ms"] = summarize_ms([r["first_chunk"] for r in results if r["ok"]])
+    summary["total_ms"] = summarize_ms([r["total"] for r in results if r["ok"]])
+    return summary
+
+
+# ---------------------------------------------------------------- 결과 비교
+
+def _flatten(data: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in data.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(baseline: dict, current: dict):
+    """기준 결과 대비 변화 출력 (지연은 낮을수록, 처리량은 높을수록 좋음)"""
+    before = _flatten(baseline.get("results", {}))
+    after = _flatten(current["results"])
+    print(f"\n{'지표':<34} {'기준':>10} {'현재':>10} {'변화':>8}")
+    for name, value in after.items():
+        if name not in before or name.endswith(("requests", "elapsed_s")):
+            continue
+        old = before[name]
+        change = f"{(value - old) / old * 100:+.1f}%" if old else "-"
+        print(f"{name:<34} {old:>10} {value:>10} {change:>8}")
+    if baseline.get("config") != current["config"]:
+        print("주의: 기준 결과와 설정이 다릅니다 (config 항목 확인)")
+
+
+# ---------------------------------------------------------------- 대역 서버
+
+async def serve(args):
+    """실제 STT/TTS 핸들러 + 외부 서비스 대역으로 Wyoming 서버 실행 (SIGTERM까지)"""
+    import logging
+    from startup import wait_for_stop_signal
+    from wyoming.server import AsyncServer
+    import standins
+    import wyoming_stt
+    import wyoming_tts
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, format='[%(levelname)s] %(message)s')
+    os.environ["SUPERVISOR_API"] = f"http://127.0.0.1:{args.ha_port}"
+    standins.install_recognizer(args.stt_delay, args.jitter)
+    standins.install_gtts(args.tts_delay, args.jitter, args.tts_audio_seconds)
+    ha = await standins.serve_ha_api(args.ha_port, args.ha_delay, args.jitter)
+
+    options = {"chat_direct_feed": False}
+    if args.options:
+        with open(args.options, encoding="utf-8") as f:
+            options.update(json.load(f))
+    with tempfile.TemporaryDirectory(prefix="bench_tts_cache_") as cache_dir:
+        # /data 없이 실행되도록 TTS 디스크 캐시는 임시 디렉터리에
+        wyoming_tts.TtsCache = partial(wyoming_tts.TtsCache, cache_dir=cache_dir)
+        stt = wyoming_stt.create_handler_factory(options)
+        tts = wyoming_tts.create_handler_factory(options)
+        servers = []
+        try:
+            for (factory, _, warmup, _), port in ((stt, args.stt_port), (tts, args.tts_port)):
+                server = AsyncServer.from_uri(f"tcp://127.0.0.1:{port}")
+                await server.start(factory)
+                servers.append(server)
+                warmup()
+            await wait_for_stop_signal()
+        finally:
+            for server in servers:
+                await server.stop()
+            await stt[3]()
+            await tts[3]()
+            print(f"HA API 대역 호출: {ha.app['calls']}", file=sys.stderr)
+            await ha.cleanup()
+
+
+def _port_open(host: str, port: int) -> bool:
+    try:
+        with socket.create_connection((host, port), timeout=0.2):
+            return True
+    except OSError:
+        return False
+
+
+def start_standin_server(args) -> subprocess.Popen:
+    """serve 하위 명령을 자식 프로세스로 실행하고 두 포트가 열릴 때까지 대기"""
+    ports = (args.stt_port, args.tts_port)
+    if any(_port_open(args.host, port) for port in ports):
+        sys.exit("포트가 이미 사용 중입니다 - 애드온을 멈추거나 --external로 실행하세요")
+    command = [
+        sys.executable, os.path.abspath(__file__), "serve",
+        "--stt-port", str(args.stt_port), "--tts-port", str(args.tts_port), "--ha-port", str(args.ha_port),
+        "--stt-delay", str(args.stt_delay), "--tts-delay", str(args.tts_delay), "--ha-delay", str(args.ha_delay),
+        "--jitter", str(args.jitter), "--tts-audio-seconds", str(args.tts_audio_seconds),
+    ]
+    if args.options:
+        command += ["--options", args.options]
+    if args.verbose:
+        command.append("--verbose")
+    proc = subprocess.Popen(command, cwd=ADDON_DIR)
+    started = time.monotonic()
+    while not all(_port_open(args.host, port) for port in ports):
+        if proc.poll() is not None:
+            sys.exit(f"대역 서버 시작 실패 (code={proc.returncode})")
+        if time.monotonic() - started > READY_TIMEOUT:
+            proc.kill()
+            sys.exit(f"{READY_TIMEOUT:.0f}초 안에 대역 서버가 열리지 않았습니다")
+        time.sleep(0.05)
+    return proc
+
+
+def stop_standin_server(proc: subprocess.Popen):
+    proc.send_signal(signal.SIGTERM)
+    try:
+        proc.wait(10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+# ---------------------------------------------------------------- 진입점
+
+def _standin_args(parser: argparse.ArgumentParser):
+    parser.add_argument("--stt-port", type=int, default=STT_PORT)
+    parser.add_argument("--tts-port", type=int, default=TTS_PORT)
+    parser.add_argument("--ha-port", type=int, default=HA_PORT, help="HA 서비스 API 대역 포트")
+    parser.add_argument("--stt-delay", type=float, default=0.3, help="Google 인식 대역 지연 (초)")
+    parser.add_argument("--tts-delay", type=float, default=0.2, help="gTTS 대역 첫 응답 지연 (초)")
+    parser.add_argument("--ha-delay", type=float, default=0.02, help="HA 서비스 API 대역 지연 (초)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="대역 지연 무작위 변동 비율 (0~1)")
+    parser.add_argument("--tts-audio-seconds", type=float, default=1.0, help="gTTS 대역이 문장마다 돌려주는 오디오 길이")
+    parser.add_argument("--options", help="애드온 옵션 JSON 파일 (options.json 형식, 대역 서버에 적용)")
+    parser.add_argument("--verbose", action="store_true", help="대역 서버 로그 표시")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command")
+    _standin_args(sub.add_parser("serve", help="대역 서비스로 STT/TTS 서버만 실행"))
+
+    _standin_args(parser)
+    parser.add_argument("--external", action="store_true", help="이미 실행 중인 서버 측정 (대역 서버 띄우지 않음)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--only", choices=("stt", "tts"), help="한쪽만 측정")
+    parser.add_argument("--wav", nargs="*", default=[], help="STT에 재생할 16kHz 16bit mono WAV (여러 개면 돌아가며)")
+    parser.add_argument("--realtime", action="store_true", help="오디오 길이에 맞춰 실시간 속도로 전송")
+    parser.add_argument("--stt-requests", type=int, default=20)
+    parser.add_argument("--tts-requests", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--warmup", type=int, default=2, help="통계에서 제외할 워밍업 요청 수")
+    parser.add_argument("--timeout", type=float, default=30.0, help="요청당 제한 시간 (초)")
+    parser.add_argument("--repeat-text", action="store_true", help="TTS 요청마다 같은 문장 (캐시 적중 측정)")
+    parser.add_argument("--robot", action="store_true", help="TTS 문장에 로봇 동작 블록 포함 (HA API 경로)")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", help="비교할 기준 결과 JSON")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        asyncio.run(serve(args))
+        return
+
+    fixtures = [load_wav(path) for path in args.wav] or [make_utterance()]
+    config = {
+        key: getattr(args, key) for key in (
+            "external", "wav", "realtime", "stt_requests", "tts_requests", "concurrency", "warmup",
+            "repeat_text", "robot", "stt_delay", "tts_delay", "ha_delay", "jitter", "tts_audio_seconds", "options",
+        )
+    }
+    proc = None if args.external else start_standin_server(args)
+    try:
+        results = {}
+        if args.only in (None, "stt"):
+            results["stt"] = asyncio.run(bench_stt(args, fixtures))
+        if args.only in (None, "tts"):
+            results["tts"] = asyncio.run(bench_tts(args))
+    finally:
+        if proc is not None:
+            stop_standin_server(proc)
+
+    report = {
+        "version": RESULT_VERSION,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "config": config,
+        "results": results,
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
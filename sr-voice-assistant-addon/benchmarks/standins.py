@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""네트워크 없이 Wyoming 서버를 돌리기 위한 외부 서비스 대역 (bench_wyoming.py serve에서 사용)
+
+- Google 음성 인식: Recognizer.recognize_google을 지연 후 고정 문장을 돌려주는 함수로 교체
+- gTTS: 지연 후 ffmpeg로 만든 사인파 MP3를 조각내어 돌려주는 클래스로 교체
+- HA 서비스 API: /api/services/esphome/<서비스>에 지연 후 200을 돌려주는 로컬 aiohttp 서버
+
+지연은 모두 초 단위이며 jitter(0~1)만큼 무작위로 흔듭니다.
+"""
+import logging
+import random
+import subprocess
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+STANDIN_TRANSCRIPT = "벤치마크 문장입니다"
+# gTTS 응답 한 조각 크기 (실제 gTTS 스트림과 비슷하게)
+MP3_PART_BYTES = 4096
+
+
+def _delay(seconds: float, jitter: float) -> float:
+    return max(0.0, seconds * (1.0 + random.uniform(-jitter, jitter)))
+
+
+def install_recognizer(delay: float = 0.3, jitter: float = 0.0, text: str = STANDIN_TRANSCRIPT):
+    """speech_recognition의 Google 인식을 로컬 대역으로 교체 (인식 스레드에서 호출됨)"""
+    import speech_recognition as sr
+
+    def recognize_google(self, audio_data, language="en-US", **kwargs):
+        # 실제 요청처럼 FLAC 인코딩은 수행 (lazy 인코딩 경로 포함)
+        audio_data.get_flac_data()
+        time.sleep(_delay(delay, jitter))
+        return text
+
+    sr.Recognizer.recognize_google = recognize_google
+
+
+def make_mp3(seconds: float = 1.0, rate: int = 24000) -> bytes:
+    """ffmpeg로 사인파 MP3 생성 (tts_stream과 같은 ffmpeg 필요)"""
+    proc = subprocess.run(
+        ["ffmpeg", "-hide_banner", "-loglevel", "error",
+         "-f", "lavfi", "-i", f"sine=frequency=220:duration={seconds}",
+         "-ac", "1", "-ar", str(rate), "-b:a", "32k", "-f", "mp3", "pipe:1"],
+        capture_output=True, check=True,
+    )
+    return proc.stdout
+
+
+def install_gtts(delay: float = 0.2, jitter: float = 0.0, audio_seconds: float = 1.0):
+    """gTTS를 로컬 대역으로 교체 - 문장마다 audio_seconds 길이의 MP3를 돌려줌"""
+    import gtts
+
+    mp3 = make_mp3(audio_seconds)
+
+    class StandInTTS:
+        def __init__(self, text="", lang="ko", **kwargs):
+            self.text = text
+            self.lang = lang
+
+        def stream(self):
+            # 첫 조각까지의 지연 (요청 왕복 + 합성)
+            time.sleep(_delay(delay, jitter))
+            for i in range(0, len(mp3), MP3_PART_BYTES):
+                yield mp3[i:i + MP3_PART_BYTES]
+
+    gtts.gTTS = StandInTTS
+    return len(mp3)
+
+
+async def serve_ha_api(port: int, delay: float = 0.02, jitter: float = 0.0, host: str = "127.0.0.1"):
+    """HA ESPHome 서비스 API 대역 실행 (AppRunner 반환 - cleanup()으로 종료)
+
+    SUPERVISOR_API=http://<host>:<port> 로 두면 BlossomController가 이 서버를 호출합니다.
+    """
+    import asyncio
+    from aiohttp import web
+
+    calls = {}
+
+    async def call_service(request: web.Request):
+        service = request.match_info["service"]
+        calls[service] = calls.get(service, 0) + 1
+        await request.read()
+        await asyncio.sleep(_delay(delay, jitter))
+        return web.json_response([])
+
+    app = web.Application()
+    app["calls"] = calls
+    app.router.add_post("/api/services/esphome/{service}", call_service)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    _LOGGER.info(f"HA API 대역 리스닝 중 (Port {port}, 지연 {delay * 1000:.0f}ms)")
+    return runner
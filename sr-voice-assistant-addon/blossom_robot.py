@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""Blossom 로봇 제어 (Home Assistant ESPHome 서비스 호출)"""
+import asyncio
+import logging
+import os
+import time
+import numpy as np
+
+import metrics
+
+_LOGGER = logging.getLogger(__name__)
+
+# ESPHome 장치 이름 (서비스: esphome/<장치>_set_motors)
+DEFAULT_ROBOT_DEVICE = "esp32_voice"
+
+class RotationTransformer:
+    def __init__(self):
+        # a, b, c Axis Angles (Radians)
+        angles = np.radians([0, 120, 240])
+
+        # Basis Vectors (3x3 Matrix)
+        # Each row is x, y, z component of a, b, c vectors
+        # z component is 1.0 to ensure Yaw moves all motors
+        self.basis_vectors = np.array([
+            [np.cos(theta), np.sin(theta), 1.0] for theta in angles
+        ])
+
+    def rpy_to_abc_rotation(self, roll, pitch, yaw):
+        """Global RPY to Local ABC rotation (Degrees)"""
+        # Global Rotation Vector
+        global_rotation_vec = np.array([roll, pitch, yaw])
+
+        # Matrix Multiplication
+        abc_rotations = self.basis_vectors @ global_rotation_vec
+        return abc_rotations[0], abc_rotations[1], abc_rotations[2]
+
+    def rpy_to_abc_rotations(self, rpy):
+        """(N, 3) RPY 배열을 한 번의 행렬곱으로 (N, 3) ABC 회전으로 변환 (Degrees)"""
+        return np.asarray(rpy, dtype=float) @ self.basis_vectors.T
+
+
+MIN_STEP_DELAY = 0.2  # 키프레임 간 최소 간격 (초)
+
+
+def interpolate_trajectory(angles, delays, step):
+    """키프레임 사이를 step(초) 간격으로 선형 보간
+
+    angles: (N, 4) 모터 각도, delays: (N,) 각 키프레임 이후 대기 시간.
+    전체 재생 시간은 그대로 유지됩니다.
+    """
+    n = len(delays)
+    if n < 2 or step <= 0:
+        return angles, delays
+
+    # 마지막 키프레임은 다음 목표가 없으므로 보간하지 않음
+    counts = np.ones(n, dtype=int)
+    counts[:-1] = np.maximum(1, np.ceil(delays[:-1] / step).astype(int))
+
+    segment = np.repeat(np.arange(n), counts)
+    offset = np.arange(len(segment)) - np.repeat(np.cumsum(counts) - counts, counts)
+    frac = (offset / counts[segment])[:, None]
+
+    nxt = np.minimum(segment + 1, n - 1)
+    out_angles = angles[segment] + (angles[nxt] - angles[segment]) * frac
+    out_delays = delays[segment] / counts[segment]
+    return out_angles, out_delays
+
+# HA API 호출 설정 (모터 명령)
+MOTOR_REQUEST_TIMEOUT = 2.0   # 요청당 제한 시간 (초)
+MOTOR_CONNECT_RETRIES = 1     # 연결 단계 실패 시 재시도 횟수
+MOTOR_POOL_SIZE = 4           # 로봇 한 대당 유지할 keep-alive 연결 수
+
+
+def create_ha_session(pool_size: int = MOTOR_POOL_SIZE):
+    """HA API용 keep-alive 세션 (이벤트 루프 안에서 호출)"""
+    import aiohttp
+
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=pool_size, keepalive_timeout=60),
+        timeout=aiohttp.ClientTimeout(total=MOTOR_REQUEST_TIMEOUT),
+        headers={
+            "Authorization": f"Bearer {os.getenv('SUPERVISOR_TOKEN', '')}",
+            "Content-Type": "application/json"
+        },
+    )
+# 로봇 지표 (/metrics)
+API_SECONDS = metrics.histogram(
+    "sr_robot_api_seconds", "HA ESPHome 서비스 호출 시간 (status: HTTP 코드, timeout, connect_error, error)",
+    ("device", "service", "status"))
+SEQUENCE_DRIFT_SECONDS = metrics.histogram(
+    "sr_robot_sequence_drift_seconds", "시퀀스 프레임의 예정 시각 대비 지연", ("device",),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0))
+FRAMES = metrics.counter(
+    "sr_robot_frames_total", "시퀀스 프레임 수 (sent: 전송, skipped: 늦어서 건너뜀)", ("device", "result"))
+
+# 궤적 업로드 1회당 최대 키프레임 수 (ESPHome API 메시지 크기 제한 고려)
+MAX_KEYFRAMES_PER_CALL = 64
+
+
+class BlossomController:
+    """Robot controller using Home Assistant ESPHome API
+
+    device: ESPHome 장치 이름 (esphome/<device>_set_motors 서비스 호출)
+    get_session: 공유 세션을 돌려주는 함수 (없으면 자체 세션 사용)
+    """
+    
+    def __init__(self, device=DEFAULT_ROBOT_DEVICE, get_session=None):
+        self.ha_url = os.getenv("SUPERVISOR_API", "http://supervisor/core")
+        self.device = device
+        self.transformer = RotationTransformer()
+        self._sequence_task = None
+        self._shared_session = get_session
+        self._session = None
+        # 마지막 시퀀스의 타이밍 통계 (지연, 건너뛴 프레임)
+        self.last_sequence_stats = {}
+        # True: 전체 궤적을 <device>_set_trajectory 한 번(또는 몇 번)으로 전송
+        self.trajectory_upload = False
+        # 궤적 업로드 시 키프레임 사이 보간 간격 (0이면 보간 안 함)
+        self.interpolation_step = 0.0
+        _LOGGER.info(f"Initialized BlossomController (HA API Mode, device={device})")
+
+    def _get_session(self):
+        """keep-alive 연결을 재사용하는 세션 (이벤트 루프 안에서 최초 호출 시 생성)"""
+        if self._shared_session is not None:
+            return self._shared_session()
+        if self._session is None or self._session.closed:
+            self._session = create_ha_session()
+        return self._session
+
+    async def close(self):
+        """서버 종료 시 진행 중인 동작을 멈추고 (자체) 연결 풀 정리"""
+        self.stop()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _call_service(self, service, data):
+        """ESPHome 서비스 호출 (HA API)"""
+        import aiohttp
+        
+        service_url = f"{self.ha_url}/api/services/esphome/{service}"
+        _LOGGER.info(f"Calling HA API: {service_url}")
+        
+        session = self._get_session()
+        started = time.monotonic()
+        status = "error"
+        try:
+            for attempt in range(MOTOR_CONNECT_RETRIES + 1):
+                try:
+                    async with session.post(service_url, json=data) as resp:
+                        status = resp.status
+                        resp_text = await resp.text()
+                        _LOGGER.info(f"HA API Response: {resp.status} - {resp_text[:200]}")
+                        if resp.status != 200:
+                            _LOGGER.error(f"HA API Error: {resp.status} - {resp_text}")
+                    return
+                except (aiohttp.ClientConnectorError, aiohttp.ServerDisconnectedError) as e:
+                    # 연결 실패 또는 끊긴 keep-alive 연결 - 절대 각도 명령이라 재전송해도 안전
+                    status = "connect_error"
+                    if attempt < MOTOR_CONNECT_RETRIES:
+                        _LOGGER.debug(f"HA API 연결 재시도: {e}")
+                        continue
+                    _LOGGER.error(f"HA API Send Error: {e}")
+                except asyncio.TimeoutError:
+                    # 시간 초과는 재시도하지 않음 (늦게 도착한 명령이 다음 동작을 덮어쓰지 않도록)
+                    status = "timeout"
+                    _LOGGER.error(f"HA API Timeout ({MOTOR_REQUEST_TIMEOUT}s)")
+                except Exception as e:
+                    _LOGGER.error(f"HA API Send Error: {e}")
+                return
+        finally:
+            # 재시도를 포함한 호출 한 번의 시간
+            kind = service[len(self.device) + 1:] if service.startswith(f"{self.device}_") else service
+            API_SECONDS.labels(self.device, kind, status).observe(time.monotonic() - started)
+
+    async def send_cmd(self, m1, m2, m3, m4):
+        """Send motor angles via Home Assistant ESPHome service"""
+        data = {"m1": float(m1), "m2": float(m2), "m3": float(m3), "m4": float(m4)}
+        _LOGGER.info(f"Motor data: {data}")
+        await self._call_service(f"{self.device}_set_motors", data)
+
+    async def send_trajectory(self, angles, delays):
+        """시간 정보가 포함된 궤적을 ESP32에 한 번에 전송 (ESP32가 자체 타이밍으로 재생)"""
+        data = {
+            "m1": np.round(angles[:, 0], 1).tolist(),
+            "m2": np.round(angles[:, 1], 1).tolist(),
+            "m3": np.round(angles[:, 2], 1).tolist(),
+            "m4": np.round(angles[:, 3], 1).tolist(),
+            "d": np.round(delays, 3).tolist(),
+        }
+        _LOGGER.info(f"Trajectory upload: {len(delays)} keyframes, {float(delays.sum()):.2f}s")
+        await self._call_service(f"{self.device}_set_trajectory", data)
+
+    def plan_trajectory(self, actions):
+        """액션 목록 전체를 (N, 4) 모터 각도와 (N,) 대기 시간 배열로 변환 (IK 일괄 계산)"""
+        params = np.array([
+            [
+                float(action.get('r', 0)),
+                float(action.get('p', 0)),
+                float(action.get('y', 0)),
+                float(action.get('a', 0)),
+                float(action.get('d', 1.0)),
+            ]
+            for action in actions
+        ], dtype=float).reshape(-1, 5)
+
+        angles = np.empty((len(params), 4))
+        angles[:, :3] = self.transformer.rpy_to_abc_rotations(params[:, :3])
+        angles[:, 3] = params[:, 3]
+        delays = np.maximum(params[:, 4], MIN_STEP_DELAY)  # Minimum 0.2s delay
+        return angles, delays
+
+    def start_sequence(self, actions):
+        """새 시퀀스 시작 - 진행 중인 시퀀스는 선점(취소)하고, 완전히 멈춘 뒤 시작"""
+        previous = self._sequence_task
+        if previous is not None and not previous.done():
+            _LOGGER.info("Preempting running Robot Sequence")
+            previous.cancel()
+        self._sequence_task = asyncio.create_task(self._run_after(previous, actions))
+        return self._sequence_task
+
+    async def _run_after(self, previous, actions):
+        if previous is not None:
+            # 이전 시퀀스의 마지막 명령과 새 명령이 섞이지 않도록 종료 대기
+            await asyncio.wait([previous])
+        await self.run_sequence(actions)
+
+    async def run_sequence(self, actions):
+        """Execute a sequence of actions on a monotonic-clock timeline.
+
+        각 프레임은 시퀀스 시작 시각 + 누적 delay에 발사되므로 HTTP 지연이 누적되지 않고,
+        다음 프레임 시각까지 지나버린 프레임은 건너뜁니다 (마지막 프레임은 항상 전송).
+        """
+        loop = asyncio.get_running_loop()
+        _LOGGER.info(f"Starting Robot Sequence ({self.device}): {len(actions)} steps")
+        stats = {"frames": 0, "sent": 0, "skipped": 0, "max_late_ms": 0.0, "mean_late_ms": 0.0}
+        total_late = 0.0
+        
+        try:
+            angles, delays = self.plan_trajectory(actions)
+
+            if self.trajectory_upload:
+                if self.interpolation_step > 0:
+                    angles, delays = interpolate_trajectory(angles, delays, self.interpolation_step)
+                # 큰 궤적은 몇 개로 나눠 보내고, 앞 조각 재생이 끝나는 시각에 다음 조각 전송
+                batches = [
+                    (start, min(start + MAX_KEYFRAMES_PER_CALL, len(delays)))
+                    for start in range(0, len(delays), MAX_KEYFRAMES_PER_CALL)
+                ]
+            else:
+                batches = [(i, i + 1) for i in range(len(delays))]
+
+            n = len(delays)
+            offsets = np.concatenate(([0.0], np.cumsum(delays))).tolist()
+            stats["frames"] = len(batches)
+            t0 = loop.time()
+
+            for start, end in batches:
+                due = t0 + offsets[start]
+                now = loop.time()
+                if now < due:
+                    await asyncio.sleep(due - now)
+                    now = loop.time()
+
+                late = now - due
+                total_late += late
+                SEQUENCE_DRIFT_SECONDS.labels(self.device).observe(late)
+                stats["max_late_ms"] = max(stats["max_late_ms"], late * 1000)
+
+                if end < n and now >= t0 + offsets[end]:
+                    # 이미 다음 프레임 시각 - 늦은 프레임은 보내지 않음
+                    stats["skipped"] += 1
+                    FRAMES.labels(self.device, "skipped").inc()
+                    continue
+
+                if self.trajectory_upload:
+                    await self.send_trajectory(angles[start:end], delays[start:end])
+                else:
+                    _LOGGER.info(f"Motion Step {start+1}: M={angles[start].tolist()}, Delay={delays[start]}, Late={late*1000:.0f}ms")
+                    # Send Command via HA API
+                    await self.send_cmd(*angles[start].tolist())
+                stats["sent"] += 1
+                FRAMES.labels(self.device, "sent").inc()
+
+            # 마지막 프레임 유지 시간까지가 시퀀스 (이 동안에도 선점 가능)
+            remaining = t0 + offsets[-1] - loop.time()
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+
+        except asyncio.CancelledError:
+            _LOGGER.info("Robot Sequence Preempted")
+            raise
+        except Exception as e:
+            _LOGGER.error(f"Sequence Error: {e}")
+        finally:
+            if stats["frames"]:
+                stats["mean_late_ms"] = round(total_late * 1000 / stats["frames"], 1)
+            stats["max_late_ms"] = round(stats["max_late_ms"], 1)
+            self.last_sequence_stats = stats
+            _LOGGER.info(f"Robot Sequence Ended ({self.device}): {stats}")
+
+    def stop(self):
+        if self._sequence_task is not None and not self._sequence_task.done():
+            self._sequence_task.cancel()
+
+
+class RobotRegistry:
+    """ESPHome 장치별 BlossomController 관리 - HTTP 연결 풀은 모든 로봇이 공유
+
+    로봇마다 자신의 시퀀스를 가지므로 한 로봇의 동작이 다른 로봇을 막거나 선점하지 않습니다.
+    """
+
+    def __init__(self, devices=None, trajectory_upload=False, interpolation_step=0.0):
+        self.devices = list(devices or [DEFAULT_ROBOT_DEVICE])
+        self.default_device = self.devices[0]
+        self.trajectory_upload = trajectory_upload
+        self.interpolation_step = interpolation_step
+        self._controllers = {}
+        self._session = None
+
+    def get_session(self):
+        if self._session is None or self._session.closed:
+            # 로봇 수에 비례해 연결 수를 늘려 처리량이 선형으로 늘도록 함
+            self._session = create_ha_session(MOTOR_POOL_SIZE * len(self.devices))
+        return self._session
+
+    def controller_for(self, target=None) -> BlossomController:
+        """대상 장치의 컨트롤러 (모르는 대상이면 기본 장치)"""
+        device = target if target in self.devices else self.default_device
+        controller = self._controllers.get(device)
+        if controller is None:
+            controller = BlossomController(device, get_session=self.get_session)
+            controller.trajectory_upload = self.trajectory_upload
+            controller.interpolation_step = self.interpolation_step
+            self._controllers[device] = controller
+        return controller
+
+    async def close(self):
+        """서버 종료 시 모든 로봇 동작 중지 및 공유 연결 풀 정리"""
+        for controller in self._controllers.values():
+            await controller.close()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
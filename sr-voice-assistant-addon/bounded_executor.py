@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""STT/TTS 전용 스레드 풀 - 대기열 상한, 요청별 마감 시간, 대기 시간 통계"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+
+
+class ExecutorBusy(Exception):
+    """대기열이 가득 차서 요청을 받을 수 없음"""
+
+
+class DeadlineExceeded(Exception):
+    """대기열에서 기다리는 동안 요청 마감 시간이 지남"""
+
+
+class BoundedExecutor:
+    """크기가 정해진 ThreadPoolExecutor 앞에 입장 제한을 둔 실행기
+
+    실행 중 + 대기 중 작업이 max_workers + max_queue 를 넘으면 즉시 ExecutorBusy를
+    발생시켜 호출 측이 거절/대체 응답을 선택하게 합니다.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+
+        self.pending = 0       # 대기 + 실행 중
+        self.running = 0
+        self.submitted = 0
+        self.rejected = 0
+        self.expired = 0
+        self.timed_out = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._waits = 0
+        # 대기열 깊이/대기 시간을 /metrics 게이지로 (3개 프로세스 모드에서도 수집됨)
+        metrics.track_executor(self)
+
+    def submit(self, func, *args, deadline: float = None, on_done=None) -> asyncio.Future:
+        """작업 제출. deadline은 time.monotonic() 기준 절대 시각 (대기 중 만료 시 실행 안 함)
+
+        on_done(): 스레드 작업이 끝나거나(예외 포함) 시작 전에 취소/거절되면 한 번 호출됩니다.
+        호출 측 asyncio 대기가 먼저 취소/시간 초과돼도 실행 중인 작업이 끝난 뒤에 호출되므로
+        작업이 읽는 자원은 여기서 해제합니다.
+        """
+        with self._lock:
+            busy = self.pending >= self.max_workers + self.max_queue
+            if busy:
+                self.rejected += 1
+            else:
+                self.pending += 1
+                self.submitted += 1
+        if busy:
+            if on_done is not None:
+                on_done()
+            raise ExecutorBusy(f"{self.name} 대기열 가득 참 ({self.pending})")
+
+        queued_at = time.monotonic()
+
+        def job():
+            started_at = time.monotonic()
+            with self._lock:
+                self.running += 1
+                waited = started_at - queued_at
+                self._waits += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+            try:
+                if deadline is not None and started_at > deadline:
+                    with self._lock:
+                        self.expired += 1
+                    raise DeadlineExceeded(f"{self.name} 대기 {waited:.1f}초 - 마감 시간 초과")
+                return func(*args)
+            finally:
+                with self._lock:
+                    self.running -= 1
+
+        try:
+            future = self._executor.submit(job)
+        except RuntimeError:
+            # 종료된 풀
+            self._on_done(None)
+            if on_done is not None:
+                on_done()
+            raise
+        # 스레드 작업이 실제로 끝나거나 취소될 때 대기열 점유 해제
+        future.add_done_callback(self._on_done)
+        if on_done is not None:
+            future.add_done_callback(lambda _future: on_done())
+        return asyncio.wrap_future(future)
+
+    async def run(self, func, *args, timeout: float = None, on_done=None):
+        """작업을 실행하고 결과를 기다림. timeout 초과 시 asyncio.TimeoutError (on_done은 submit 참고)"""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        future = self.submit(func, *args, deadline=deadline, on_done=on_done)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timed_out += 1
+            raise
+
+    def _on_done(self, _future):
+        with self._lock:
+            self.pending -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "running": self.running,
+                "queued": self.pending - self.running,
+                "max_queue": self.max_queue,
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+                "expired": self.expired,
+                "timed_out": self.timed_out,
+                "wait_avg_ms": round(self._wait_total / self._waits * 1000, 1) if self._waits else 0.0,
+                "wait_max_ms": round(self._wait_max * 1000, 1),
+            }
+
+    def shutdown(self, cancel_futures: bool = True):
+        self._executor.shutdown(wait=False, cancel_futures=cancel_futures)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Chat UI 실시간 전송 묶음 처리 - 짧은 시간 안에 들어온 메시지를 new_messages 한 번으로 전송"""
+import threading
+
+# 첫 메시지 이후 이 시간(초) 동안 들어온 메시지를 함께 전송
+BROADCAST_WINDOW = 0.05
+# 한 번에 보내는 최대 메시지 수 (넘으면 나눠서 전송)
+MAX_BROADCAST_BATCH = 200
+
+
+class BroadcastCoalescer:
+    """Socket.IO 서버의 emit/sleep/start_background_task로 동작 (Flask-SocketIO, eventlet)"""
+
+    def __init__(self, socketio, event: str = "new_messages",
+                 window: float = BROADCAST_WINDOW, max_batch: int = MAX_BROADCAST_BATCH):
+        self.socketio = socketio
+        self.event = event
+        self.window = window
+        self.max_batch = max_batch
+        self.broadcasts = 0    # 실제 emit 횟수
+        self.messages = 0      # 전송한 메시지 수
+        self._pending = []
+        self._scheduled = False
+        self._lock = threading.Lock()
+
+    def publish(self, messages: list):
+        """전송 대기열에 추가 - 대기 중인 전송이 없으면 window 후 전송 예약"""
+        with self._lock:
+            self._pending.extend(messages)
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self.socketio.start_background_task(self._flush_later)
+
+    def _flush_later(self):
+        self.socketio.sleep(self.window)
+        for chunk in self._take_batches():
+            self.socketio.emit(self.event, chunk)
+
+    def _take_batches(self) -> list:
+        """대기열을 비우고 max_batch 단위로 나눈 전송 목록 반환"""
+        with self._lock:
+            batch, self._pending = self._pending, []
+            self._scheduled = False
+        chunks = [batch[i:i + self.max_batch] for i in range(0, len(batch), self.max_batch)]
+        self.broadcasts += len(chunks)
+        self.messages += len(batch)
+        return chunks
+
+
+class AsyncBroadcastCoalescer(BroadcastCoalescer):
+    """python-socketio AsyncServer용 (단일 프로세스 모드, asyncio - emit/sleep이 코루틴)"""
+
+    async def _flush_later(self):
+        await self.socketio.sleep(self.window)
+        for chunk in self._take_batches():
+            await self.socketio.emit(self.event, chunk)
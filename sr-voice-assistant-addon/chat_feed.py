@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Wyoming STT/TTS 서버 → Chat UI 직접 전달 (Unix 데이터그램 소켓)
+
+메시지 하나가 JSON 데이터그램 하나입니다. 보내는 쪽은 기다리지 않고 보내기만 하므로
+Chat UI가 꺼져 있거나 밀려 있어도 음성 처리는 지연되지 않습니다 (그때는 메시지를 버림).
+단일 프로세스 모드(supervisor.py)에서는 소켓 없이 LocalChatFeed로 같은 루프 안에서 전달합니다.
+"""
+import asyncio
+import json
+import logging
+import os
+import socket
+
+_LOGGER = logging.getLogger(__name__)
+
+CHAT_FEED_SOCKET = "/tmp/sr_chat_feed.sock"
+# 수신 버퍼 (기본값보다 넉넉하게 - 몰려도 버려지지 않도록)
+FEED_RECV_BUFFER = 1024 * 1024
+# 데이터그램 최대 크기
+MAX_DATAGRAM = 64 * 1024
+# 단일 프로세스 모드에서 Chat UI가 가져가지 않은 메시지 상한
+MAX_LOCAL_PENDING = 1000
+
+
+class ChatFeedPublisher:
+    """STT 인식 결과 / TTS 응답 문장을 Chat UI로 전송"""
+
+    def __init__(self, path: str = CHAT_FEED_SOCKET):
+        self.path = path
+        self.sent = 0
+        self.dropped = 0
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sock.setblocking(False)
+
+    def publish(self, role: str, message: str):
+        if not message or not message.strip():
+            return
+        data = json.dumps({"role": role, "message": message}, ensure_ascii=False).encode()
+        if len(data) > MAX_DATAGRAM:
+            self.dropped += 1
+            _LOGGER.warning(f"Chat UI 전달 생략 - 메시지가 너무 김 ({len(data)} bytes)")
+            return
+        try:
+            self._sock.sendto(data, self.path)
+            self.sent += 1
+        except OSError as e:
+            # Chat UI 미실행(ENOENT/ECONNREFUSED) 또는 수신 버퍼 가득 참(EAGAIN)
+            self.dropped += 1
+            _LOGGER.debug(f"Chat UI 전달 실패 ({role}): {e}")
+
+    def close(self):
+        self._sock.close()
+
+
+class ChatFeedListener:
+    """Chat UI 쪽 수신 소켓 - drain()으로 쌓인 메시지를 한 번에 가져옴 (블로킹 없음)"""
+
+    def __init__(self, path: str = CHAT_FEED_SOCKET):
+        self.path = path
+        if os.path.exists(path):
+            os.unlink(path)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, FEED_RECV_BUFFER)
+        self._sock.bind(path)
+        self._sock.setblocking(False)
+
+    def fileno(self) -> int:
+        return self._sock.fileno()
+
+    def drain(self) -> list:
+        """지금까지 도착한 메시지 목록 (없으면 빈 목록)"""
+        messages = []
+        while True:
+            try:
+                data = self._sock.recv(MAX_DATAGRAM)
+            except (BlockingIOError, InterruptedError):
+                return messages
+            try:
+                messages.append(json.loads(data))
+            except ValueError:
+                _LOGGER.warning(f"잘못된 Chat UI 메시지 무시: {data[:50]!r}")
+
+    def close(self):
+        self._sock.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+class LocalChatFeed:
+    """단일 프로세스 모드용 - publish/drain 인터페이스는 같고 소켓 대신 메모리 목록 사용
+
+    같은 이벤트 루프 안에서만 호출합니다 (STT/TTS 핸들러와 Chat UI 작업).
+    """
+
+    def __init__(self, max_pending: int = MAX_LOCAL_PENDING):
+        self.max_pending = max_pending
+        self.sent = 0
+        self.dropped = 0
+        self._pending = []
+        self._ready = asyncio.Event()
+
+    def publish(self, role: str, message: str):
+        if not message or not message.strip():
+            return
+        if len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            _LOGGER.debug(f"Chat UI 전달 실패 ({role}): 대기 메시지가 너무 많음")
+            return
+        self._pending.append({"role": role, "message": message})
+        self.sent += 1
+        self._ready.set()
+
+    async def wait(self):
+        """전달할 메시지가 생길 때까지 대기"""
+        await self._ready.wait()
+
+    def drain(self) -> list:
+        """지금까지 들어온 메시지 목록 (없으면 빈 목록)"""
+        self._ready.clear()
+        messages, self._pending = self._pending, []
+        return messages
+
+    def close(self):
+        self._pending = []
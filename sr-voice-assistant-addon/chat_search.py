@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""Chat UI 대화 검색 - 메모리 역색인 (한글/한자/가나는 2글자 n-gram, 그 외는 단어 단위)
+
+조사가 붙은 한국어(예: "날씨가", "날씨는")도 "날씨"로 찾을 수 있도록 CJK 글자는
+겹치는 2-gram으로 색인합니다. 메시지 추가 시 색인하고, 보존 기간 만료 시 제거합니다.
+"""
+import heapq
+import html
+import math
+import re
+import threading
+import unicodedata
+
+# 한글 음절/자모, CJK 한자, 히라가나/가타카나
+_CJK = r'\u1100-\u11ff\u3040-\u30ff\u3130-\u318f\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af'
+_WORD = re.compile(rf'[{_CJK}]+|[^\W{_CJK}]+')
+_CJK_RUN = re.compile(rf'[{_CJK}]')
+
+# BM25 파라미터
+BM25_K1 = 1.2
+BM25_B = 0.75
+# 검색어가 그대로 들어 있는 메시지에 주는 가산점
+PHRASE_BOOST = 2.0
+# 스니펫 길이 (검색어 앞뒤 글자 수)
+SNIPPET_CONTEXT = 40
+
+
+def normalize(text: str) -> str:
+    return unicodedata.normalize("NFKC", text).casefold()
+
+
+def tokenize(text: str) -> list:
+    """검색 토큰 목록 (중복 포함, 순서 유지)"""
+    return _tokenize_normalized(normalize(text))
+
+
+def _tokenize_normalized(text: str) -> list:
+    tokens = []
+    for word in _WORD.findall(text):
+        if _CJK_RUN.match(word) and len(word) > 1:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.append(word)
+    return tokens
+
+
+class SearchIndex:
+    """메시지 ID → 토큰 빈도 역색인 (ID가 증가하는 순서로 추가/제거)"""
+
+    def __init__(self):
+        self._postings = {}    # 토큰 → {ID: 빈도}
+        self._docs = {}        # ID → 메시지
+        self._texts = {}       # ID → 정규화된 본문 (구문 일치 확인용)
+        self._lengths = {}     # ID → 토큰 수
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, message_id: int, message: dict):
+        text = normalize(message.get("message", ""))
+        tokens = _tokenize_normalized(text)
+        counts = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        with self._lock:
+            for token, count in counts.items():
+                self._postings.setdefault(token, {})[message_id] = count
+            self._docs[message_id] = message
+            self._texts[message_id] = text
+            self._lengths[message_id] = len(tokens)
+            self._total_length += len(tokens)
+
+    def remove(self, message_id: int):
+        """만료된 메시지 제거 (해당 메시지의 토큰 목록만 훑음)"""
+        with self._lock:
+            if self._docs.pop(message_id, None) is None:
+                return
+            text = self._texts.pop(message_id)
+            self._total_length -= self._lengths.pop(message_id)
+            for token in set(_tokenize_normalized(text)):
+                posting = self._postings.get(token)
+                if posting is not None:
+                    posting.pop(message_id, None)
+                    if not posting:
+                        del self._postings[token]
+
+    def search(self, query: str, offset: int = 0, limit: int = 20):
+        """모든 검색 토큰을 포함하는 메시지를 BM25 순으로 (동점이면 최신 우선)
+
+        반환: (전체 결과 수, [{id, role, message, timestamp, snippet}...])
+        """
+        phrase = normalize(query).strip()
+        query_tokens = _tokenize_normalized(phrase)
+        terms = set(query_tokens)
+        if not terms:
+            return 0, []
+
+        with self._lock:
+            postings = [self._postings.get(term) for term in terms]
+            if not all(postings):
+                return 0, []
+            # 가장 드문 토큰부터 교집합 (dict 키 집합 연산)
+            postings.sort(key=len)
+            candidates = postings[0].keys()
+            for posting in postings[1:]:
+                candidates = candidates & posting.keys()
+            ids = list(candidates)
+
+            n_docs = len(self._docs)
+            avg_length = self._total_length / n_docs if n_docs else 1.0
+            base = BM25_K1 * (1 - BM25_B)
+            per_token = BM25_K1 * BM25_B / (avg_length or 1.0)
+            lengths = self._lengths
+            norms = [base + per_token * lengths[i] for i in ids]
+
+            # 토큰이 둘 이상이면 검색어가 그대로 이어서 나오는 메시지를 우대
+            if len(query_tokens) > 1:
+                texts = self._texts
+                scores = [PHRASE_BOOST if phrase in texts[i] else 0.0 for i in ids]
+            else:
+                scores = [0.0] * len(ids)
+
+            # 후보 목록 전체에 대해 토큰별로 한 번에 누적
+            for posting in postings:
+                weight = math.log(1 + (n_docs - len(posting) + 0.5) / (len(posting) + 0.5)) * (BM25_K1 + 1)
+                tfs = map(posting.__getitem__, ids)
+                scores = [s + weight * tf / (tf + n) for s, tf, n in zip(scores, tfs, norms)]
+
+            # 요청한 페이지까지만 부분 정렬
+            top = heapq.nlargest(offset + limit, zip(scores, ids))[offset:]
+            page = [(message_id, self._docs[message_id]) for _, message_id in top]
+
+        highlighter = _highlighter(query)
+        hits = [
+            {"id": message_id, **message, "snippet": make_snippet(message.get("message", ""), highlighter)}
+            for message_id, message in page
+        ]
+        return len(ids), hits
+
+
+def _highlighter(query: str):
+    words = sorted({w for w in query.split() if w}, key=len, reverse=True)
+    if not words:
+        return None
+    return re.compile("|".join(re.escape(w) for w in words), re.IGNORECASE)
+
+
+def make_snippet(text: str, highlighter) -> str:
+    """첫 일치 위치 주변을 잘라 HTML 이스케이프 후 일치 부분을 <mark>로 감쌈"""
+    match = highlighter.search(text) if highlighter else None
+    center = match.start() if match else 0
+    start = max(0, center - SNIPPET_CONTEXT)
+    end = min(len(text), center + SNIPPET_CONTEXT * 2)
+    window = text[start:end]
+
+    parts = []
+    last = 0
+    for m in highlighter.finditer(window) if highlighter else ():
+        parts.append(html.escape(window[last:m.start()]))
+        parts.append(f"<mark>{html.escape(m.group())}</mark>")
+        last = m.end()
+    parts.append(html.escape(window[last:]))
+    return ("…" if start > 0 else "") + "".join(parts) + ("…" if end < len(text) else "")
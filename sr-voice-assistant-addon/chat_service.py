@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""Chat UI 공통 로직 - 웹 프레임워크와 무관 (Flask app.py, asyncio chat_web.py가 공유)"""
+from jinja2 import Environment
+
+from robot_actions import extract_actions
+from chat_store import ChatStore, ChatHistory, RETENTION_DAYS
+from chat_search import SearchIndex
+
+# 보존 기간이 지난 대화 정리 주기 (초)
+RETENTION_INTERVAL = 600
+# 첫 화면/이전 대화 요청 한 번에 보내는 메시지 수
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+# 검색 결과 한 페이지 크기
+SEARCH_PAGE_SIZE = 20
+# /add_batch 한 번에 받는 최대 메시지 수
+MAX_BATCH_SIZE = 500
+
+# HTML 템플릿 (인라인)
+HTML_TEMPLATE = """<!DOCTYPE html>
+<html lang="ko">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>음성 대화 기록</title>
+    <style>
+body {
+    margin: 0;
+    font-family: "Apple SD Gothic Neo", "Noto Sans KR", sans-serif;
+    background-color: #e5e5e5;
+}
+
+.chat-container {
+    height: 100vh;
+    padding: 15px;
+    overflow-y: auto;
+    box-sizing: border-box;
+    display: flex;
+    flex-direction: column;
+}
+
+.chat-row:first-child {
+    margin-top: auto !important;
+}
+
+.chat-row {
+    display: flex;
+    margin-bottom: 10px;
+}
+
+.chat-row.user {
+    justify-content: flex-end;
+}
+
+.chat-row.user .bubble {
+    background-color: #fef01b;
+    border-radius: 15px 15px 0 15px;
+}
+
+.chat-row.assistant {
+    justify-content: flex-start;
+}
+
+.chat-row.assistant .bubble {
+    background-color: white;
+    border-radius: 15px 15px 15px 0;
+}
+
+.bubble {
+    max-width: 70%;
+    padding: 10px 14px;
+    font-size: 15px;
+    line-height: 1.4;
+    box-shadow: 0 1px 2px rgba(0,0,0,0.1);
+    word-break: break-word;
+}
+
+.search {
+    position: fixed;
+    top: 10px;
+    right: 15px;
+    width: min(360px, calc(100% - 30px));
+    z-index: 10;
+}
+
+.search input {
+    width: 100%;
+    padding: 8px 12px;
+    border: none;
+    border-radius: 18px;
+    box-sizing: border-box;
+    box-shadow: 0 1px 3px rgba(0,0,0,0.2);
+    font-size: 14px;
+}
+
+.search-results {
+    max-height: 60vh;
+    overflow-y: auto;
+    margin-top: 6px;
+    background-color: white;
+    border-radius: 10px;
+    box-shadow: 0 2px 6px rgba(0,0,0,0.2);
+}
+
+.search-results:empty {
+    display: none;
+}
+
+.search-hit {
+    padding: 8px 12px;
+    border-bottom: 1px solid #eee;
+    font-size: 14px;
+}
+
+.search-hit time {
+    display: block;
+    color: #888;
+    font-size: 12px;
+}
+
+.search-hit mark {
+    background-color: #fef01b;
+}
+    </style>
+</head>
+<body>
+<div class="search">
+    <input type="search" id="search" placeholder="대화 검색">
+    <div class="search-results" id="search-results"></div>
+</div>
+<div class="chat-container" id="chat" data-before="{{ before or '' }}">
+    {% for chat in chat_history %}
+        <div class="chat-row {{ chat.role }}">
+            <div class="bubble">
+                {{ chat.message }}
+            </div>
+        </div>
+    {% endfor %}
+</div>
+
+<script src="https://cdn.socket.io/4.7.2/socket.io.min.js"></script>
+<script>
+    const chat = document.getElementById("chat");
+    // 더 오래된 페이지의 커서 (없으면 처음까지 모두 불러온 상태)
+    let before = chat.dataset.before;
+    let loading = false;
+    
+    window.onload = function() {
+        chat.scrollTop = chat.scrollHeight;
+    };
+
+    function createRow(data) {
+        const row = document.createElement("div");
+        row.className = `chat-row ${data.role}`;
+
+        const bubble = document.createElement("div");
+        bubble.className = "bubble";
+        bubble.innerText = data.message;
+
+        row.appendChild(bubble);
+        return row;
+    }
+
+    // 맨 위 근처까지 스크롤하면 이전 대화를 한 페이지씩 불러옴
+    async function loadOlder() {
+        if (!before || loading) return;
+        loading = true;
+        try {
+            const resp = await fetch(`/history?before=${before}`);
+            const page = await resp.json();
+            const fragment = document.createDocumentFragment();
+            page.messages.forEach(data => fragment.appendChild(createRow(data)));
+
+            // 보던 위치가 밀려나지 않도록 추가된 높이만큼 스크롤 보정
+            const previousHeight = chat.scrollHeight;
+            chat.insertBefore(fragment, chat.firstChild);
+            chat.scrollTop += chat.scrollHeight - previousHeight;
+            before = page.before;
+        } catch (e) {
+            console.error("이전 대화 불러오기 실패", e);
+        } finally {
+            loading = false;
+        }
+    }
+
+    chat.addEventListener("scroll", () => {
+        if (chat.scrollTop < 200) loadOlder();
+    });
+
+    // 대화 검색 (입력이 멈추면 요청, 결과 맨 아래까지 스크롤하면 다음 페이지)
+    const searchInput = document.getElementById("search");
+    const searchResults = document.getElementById("search-results");
+    let searchTimer = null;
+    let searchQuery = "";
+    let searchOffset = null;
+
+    async function runSearch(reset) {
+        if (reset) {
+            searchQuery = searchInput.value.trim();
+            searchOffset = 0;
+            searchResults.replaceChildren();
+        }
+        if (!searchQuery || searchOffset === null) return;
+        const offset = searchOffset;
+        searchOffset = null;
+        const resp = await fetch(`/search?q=${encodeURIComponent(searchQuery)}&offset=${offset}`);
+        const result = await resp.json();
+        if (result.query !== searchQuery) return;
+        result.hits.forEach(hit => {
+            const item = document.createElement("div");
+            item.className = "search-hit";
+            const time = document.createElement("time");
+            time.textContent = hit.timestamp.slice(0, 16).replace("T", " ");
+            const text = document.createElement("div");
+            text.innerHTML = hit.snippet;  // 서버에서 이스케이프 후 <mark>만 추가됨
+            item.append(time, text);
+            searchResults.appendChild(item);
+        });
+        searchOffset = result.next_offset;
+    }
+
+    searchInput.addEventListener("input", () => {
+        clearTimeout(searchTimer);
+        searchTimer = setTimeout(() => runSearch(true), 250);
+    });
+
+    searchResults.addEventListener("scroll", () => {
+        if (searchResults.scrollTop + searchResults.clientHeight > searchResults.scrollHeight - 50) {
+            runSearch(false);
+        }
+    });
+
+    const socket = io(); 
+    // 묶어서 오는 새 메시지를 한 번의 DOM 갱신으로 추가
+    socket.on("new_messages", batch => {
+        const fragment = document.createDocumentFragment();
+        batch.forEach(data => fragment.appendChild(createRow(data)));
+        chat.appendChild(fragment);
+        chat.scrollTop = chat.scrollHeight;
+    });
+</script>
+</body>
+</html>"""
+
+# 템플릿은 시작할 때 한 번만 컴파일 (Flask와 같은 HTML 자동 이스케이프)
+PAGE_TEMPLATE = Environment(autoescape=True).from_string(HTML_TEMPLATE)
+
+
+def make_message(data):
+    """요청의 메시지 하나를 저장 형식으로 변환 (role/message가 없으면 None)"""
+    if not isinstance(data, dict) or "role" not in data or "message" not in data:
+        return None
+    
+    new_msg = {
+        "role": data["role"],
+        "message": data["message"],
+    }
+    
+    # --- Robot Control JSON Filter ---
+    if new_msg["role"] == "assistant":
+        # 로봇 동작 JSON 블록과 감싼 마크다운 코드 펜스 제거
+        new_msg["message"], _ = extract_actions(new_msg["message"])
+    # ---------------------------------
+    return new_msg
+
+
+def _clamp(value: int, low: int, high: int) -> int:
+    return min(max(value, low), high)
+
+
+class ChatService:
+    """대화 기록/검색/추가 요청 처리 (응답은 JSON으로 보낼 dict)"""
+
+    def __init__(self, options: dict):
+        retention_days = float(options.get("chat_retention_days", RETENTION_DAYS))
+        # 대화 기록 저장소 (/data/chat_log.jsonl, 추가 전용)
+        self.history = ChatHistory(ChatStore(), retention_days, index=SearchIndex())
+
+    def load(self):
+        """저장소에서 대화를 불러오고 보존 기간이 지난 데이터는 삭제 (잘린 기록은 복구)"""
+        try:
+            self.history.load()
+        except Exception as e:
+            print(f"[ERROR] 히스토리 로드 실패: {e}")
+
+    def render_index(self) -> str:
+        # 최신 한 페이지만 렌더링, 이전 대화는 스크롤 시 /history로 불러옴
+        messages, before = self.history.page(limit=PAGE_SIZE)
+        return PAGE_TEMPLATE.render(chat_history=messages, before=before)
+
+    def history_page(self, before: int = None, limit: int = PAGE_SIZE) -> dict:
+        """대화 기록 페이지 (before: 이 ID보다 오래된 메시지, 오래된 순)"""
+        messages, next_before = self.history.page(before=before, limit=_clamp(limit, 1, MAX_PAGE_SIZE))
+        return {"messages": messages, "before": next_before}
+
+    def search(self, query: str, offset: int = 0, limit: int = SEARCH_PAGE_SIZE) -> dict:
+        """대화 검색 (관련도 순, offset/limit 페이지, snippet은 <mark> 강조가 들어간 HTML)"""
+        query = query.strip()
+        offset = max(offset, 0)
+        total, hits = self.history.index.search(query, offset=offset, limit=_clamp(limit, 1, MAX_PAGE_SIZE))
+        next_offset = offset + len(hits) if offset + len(hits) < total else None
+        return {"query": query, "total": total, "hits": hits, "next_offset": next_offset}
+
+    @staticmethod
+    def parse_batch(data):
+        """/add_batch 요청 본문 검사 - (메시지 목록, None) 또는 (None, 오류 메시지)"""
+        if not isinstance(data, list) or len(data) > MAX_BATCH_SIZE:
+            return None, f"메시지 목록 필요 (최대 {MAX_BATCH_SIZE}개)"
+        messages = [make_message(item) for item in data]
+        if None in messages:
+            return None, "role, message 필요"
+        return messages, None
+
+    def store(self, messages: list):
+        # 메모리 기록에 추가 + 로그에 한 번에 저장 (정리는 retention 작업에서)
+        try:
+            self.history.add_many(messages)
+        except Exception as e:
+            print(f"[ERROR] 파일 저장 실패: {e}")
+
+    def expire(self):
+        """보존 기간이 지난 대화 정리 (주기 작업에서 호출)"""
+        try:
+            removed = self.history.expire()
+            if removed:
+                print(f"[INFO] 보존 기간이 지난 대화 {removed}개 정리")
+        except Exception as e:
+            print(f"[ERROR] 대화 정리 실패: {e}")
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""Chat UI 대화 저장소 - 추가 전용 JSONL 로그 + 주기적 압축
+
+메시지 하나는 로그 한 줄로 추가(append + fsync)되므로 저장 비용이 기록 크기와 무관하게
+일정합니다. 쓰는 도중 종료되어 마지막 줄이 잘려도 그 줄만 버리고 복구합니다.
+"""
+import bisect
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+CHAT_LOG_FILE = "/data/chat_log.jsonl"
+# 이전 버전의 전체 JSON 파일 (있으면 최초 실행 시 로그로 옮김)
+LEGACY_DB_FILE = "/data/chat_db.json"
+# 로그의 만료/손상 줄이 이만큼 쌓이면 보존 중인 메시지만으로 다시 씀
+COMPACT_MIN_STALE_LINES = 1000
+# 대화 보존 기간 기본값 (일)
+RETENTION_DAYS = 30
+
+
+class ChatStore:
+    """추가 전용 JSONL 대화 로그"""
+
+    def __init__(self, path: str = CHAT_LOG_FILE, legacy_path: str = LEGACY_DB_FILE,
+                 fsync: bool = True):
+        self.path = path
+        self.legacy_path = legacy_path
+        self.fsync = fsync
+        self.lines = 0         # 로그 파일의 유효한 줄 수
+        self._file = None
+        self._lock = threading.Lock()
+
+    def load(self) -> list:
+        """로그를 읽어 메시지 목록 반환 (잘린 마지막 줄/손상된 줄은 건너뜀)"""
+        messages = []
+        corrupt = 0
+        good_size = 0
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        # 기록 도중 종료된 마지막 줄
+                        corrupt += 1
+                        break
+                    good_size += len(line)
+                    try:
+                        messages.append(json.loads(line))
+                    except ValueError:
+                        corrupt += 1
+            if good_size < os.path.getsize(self.path):
+                # 다음 추가가 깨진 줄 뒤에 이어 붙지 않도록 잘라냄
+                with open(self.path, "r+b") as f:
+                    f.truncate(good_size)
+        elif os.path.exists(self.legacy_path):
+            messages = self._load_legacy()
+            if messages:
+                self.compact(messages)
+                os.replace(self.legacy_path, self.legacy_path + ".bak")
+                print(f"[INFO] 이전 대화 파일에서 {len(messages)}개 메시지 이전 완료")
+            return messages
+
+        self.lines = len(messages)
+        if corrupt:
+            print(f"[WARN] 대화 로그의 손상된 줄 {corrupt}개 제외")
+            self.compact(messages)
+        return messages
+
+    def _load_legacy(self) -> list:
+        try:
+            with open(self.legacy_path, "r", encoding="utf-8") as f:
+                history = json.load(f)
+            return history if isinstance(history, list) else []
+        except Exception as e:
+            print(f"[ERROR] 이전 대화 파일 로드 실패: {e}")
+            return []
+
+    def append(self, message: dict):
+        """메시지 한 줄 추가 (기록 크기와 무관한 O(1) 쓰기)"""
+        self.append_many([message])
+
+    def append_many(self, messages: list):
+        """여러 메시지를 한 번의 쓰기 + fsync로 추가"""
+        data = "".join(json.dumps(message, ensure_ascii=False) + "\n" for message in messages)
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(data)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self.lines += len(messages)
+
+    def needs_compaction(self, retained: int) -> bool:
+        """로그에 만료된 줄이 충분히 쌓였는지"""
+        return self.lines - retained >= max(COMPACT_MIN_STALE_LINES, retained)
+
+    def compact(self, messages: list):
+        """보존할 메시지만으로 로그를 새로 써서 원자적으로 교체"""
+        tmp_path = self.path + ".tmp"
+        with self._lock:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for message in messages:
+                    f.write(json.dumps(message, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            os.replace(tmp_path, self.path)
+            self.lines = len(messages)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class ChatHistory:
+    """보존 기간 내 메시지를 시간순 리스트로 보관 - 만료는 시작 위치만 앞으로 옮김
+
+    만료된 앞부분은 보존 중인 메시지 수만큼 쌓였을 때 한 번에 잘라내므로(분할 상환 O(1))
+    리스트 인덱싱이 그대로 유지되어 페이지 조회는 보존 기간과 무관하게 O(log n + limit)입니다.
+
+    타임스탬프는 불러올 때/추가할 때 한 번만 정수 ID(epoch 마이크로초, 항상 증가)로
+    변환해 함께 보관합니다. ID는 같은 로그에서 재시작 후에도 같게 계산되므로
+    페이지 커서로 씁니다.
+    """
+
+    def __init__(self, store: ChatStore, retention_days: float = RETENTION_DAYS, index=None):
+        self.store = store
+        self.retention = retention_days * 86400
+        # 검색 색인 (chat_search.SearchIndex) - 추가/만료 시 함께 갱신
+        self.index = index
+        self._entries = []         # (ID, 메시지) - _head 앞은 만료됨
+        self._head = 0
+        self._last_id = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries) - self._head
+
+    def _next_id(self, epoch: float) -> int:
+        self._last_id = max(int(epoch * 1_000_000), self._last_id + 1)
+        return self._last_id
+
+    def load(self):
+        """저장소에서 불러와 보존 기간이 지난 메시지 정리"""
+        now = time.time()
+        timed = []
+        for message in self.store.load():
+            try:
+                epoch = datetime.fromisoformat(message["timestamp"]).timestamp()
+            except (KeyError, TypeError, ValueError):
+                # 시각이 없는 메시지는 불러온 시점부터 보존 기간 적용
+                epoch = now
+            timed.append((epoch, message))
+        # 시계가 뒤로 간 적이 있어도 앞에서부터 만료할 수 있도록 정렬 (안정 정렬)
+        timed.sort(key=lambda entry: entry[0])
+        with self._lock:
+            self._last_id = 0
+            self._entries = [(self._next_id(epoch), message) for epoch, message in timed]
+            self._head = 0
+        self.expire(now)
+        if self.index is not None:
+            for message_id, message in self._entries[self._head:]:
+                self.index.add(message_id, message)
+
+    def add(self, message: dict) -> int:
+        """현재 시각으로 메시지를 추가하고 저장 (timestamp 필드를 채우고 ID 반환)"""
+        return self.add_many([message])[0]
+
+    def add_many(self, messages: list) -> list:
+        """여러 메시지를 같은 시각으로 추가하고 한 번에 저장 (ID 목록 반환)"""
+        now = datetime.now()
+        timestamp = now.isoformat()
+        with self._lock:
+            ids = []
+            for message in messages:
+                message["timestamp"] = timestamp
+                message_id = self._next_id(now.timestamp())
+                self._entries.append((message_id, message))
+                ids.append(message_id)
+            # 압축과 순서가 엇갈리지 않도록 같은 잠금 안에서 기록
+            self.store.append_many(messages)
+        if self.index is not None:
+            for message_id, message in zip(ids, messages):
+                self.index.add(message_id, message)
+        return ids
+
+    def page(self, before: int = None, limit: int = 50):
+        """before(ID)보다 오래된 메시지 최대 limit개 (오래된 순, 각 항목에 id 포함)
+
+        반환: (메시지 목록, 더 오래된 페이지의 커서 또는 None)
+        """
+        with self._lock:
+            entries = self._entries
+            head = self._head
+            end = len(entries)
+            if before is not None:
+                end = bisect.bisect_left(entries, before, lo=head, key=lambda entry: entry[0])
+            start = max(head, end - limit)
+            items = entries[start:end]
+        page = [{"id": message_id, **message} for message_id, message in items]
+        cursor = page[0]["id"] if start > head and page else None
+        return page, cursor
+
+    def expire(self, now: float = None) -> int:
+        """보존 기간이 지난 메시지를 앞에서부터 제거하고, 필요하면 로그 압축. 제거 수 반환"""
+        cutoff = ((time.time() if now is None else now) - self.retention) * 1_000_000
+        with self._lock:
+            entries = self._entries
+            head = self._head
+            while head < len(entries) and entries[head][0] <= cutoff:
+                if self.index is not None:
+                    self.index.remove(entries[head][0])
+                head += 1
+            removed = head - self._head
+            if head >= len(entries) - head:
+                # 만료된 앞부분이 보존 중인 메시지보다 많아지면 잘라냄
+                del entries[:head]
+                head = 0
+            self._head = head
+            if self.store.needs_compaction(len(entries) - head):
+                self.store.compact([message for _, message in entries[head:]])
+        return removed
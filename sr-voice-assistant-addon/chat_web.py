@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""Chat UI 웹 서버 - asyncio 버전 (aiohttp + python-socketio, 단일 프로세스 모드용)
+
+app.py(Flask + eventlet)와 같은 경로/응답을 제공하며 대화 기록 로직은 chat_service.py를
+공유합니다. 파일 저장(fsync)/검색은 이벤트 루프를 막지 않도록 전용 스레드 풀에서 실행합니다.
+"""
+import asyncio
+import logging
+
+import socketio
+from aiohttp import web
+
+from chat_service import ChatService, RETENTION_INTERVAL, PAGE_SIZE, SEARCH_PAGE_SIZE, make_message
+from chat_broadcast import AsyncBroadcastCoalescer, BROADCAST_WINDOW
+from bounded_executor import BoundedExecutor, ExecutorBusy
+import metrics
+
+_LOGGER = logging.getLogger(__name__)
+
+HOST = "0.0.0.0"
+PORT = 9822
+
+# 대화 저장/검색 전용 스레드 풀 기본값 (쓰기 순서는 ChatHistory 잠금이 보장)
+CHAT_MAX_WORKERS = 2
+CHAT_MAX_QUEUE = 32
+
+
+def _int_arg(request: web.Request, name: str, default=None):
+    """쿼리 정수 인자 (없거나 잘못된 값이면 default - Flask의 type=int와 같음)"""
+    try:
+        return int(request.query[name])
+    except (KeyError, ValueError):
+        return default
+
+
+class ChatWebServer:
+    """Chat UI 라우트 + Socket.IO + 직접 전달/보존 기간 작업"""
+
+    def __init__(self, options: dict, executor: BoundedExecutor = None, chat_feed=None, health=None):
+        self.service = ChatService(options)
+        self.executor = executor or BoundedExecutor("chat", CHAT_MAX_WORKERS, CHAT_MAX_QUEUE)
+        # STT/TTS가 publish한 메시지 (chat_feed.LocalChatFeed, None이면 사용 안 함)
+        self.chat_feed = chat_feed
+        self.sio = socketio.AsyncServer(async_mode="aiohttp", cors_allowed_origins="*")
+        # 연달아 들어오는 메시지는 new_messages 한 번으로 묶어서 전송
+        self.broadcaster = AsyncBroadcastCoalescer(self.sio)
+
+        self.app = web.Application()
+        self.sio.attach(self.app)
+        self.app.router.add_get("/", self.index)
+        self.app.router.add_get("/history", self.history)
+        self.app.router.add_get("/search", self.search)
+        self.app.router.add_post("/add", self.add_message)
+        self.app.router.add_post("/add_batch", self.add_messages)
+        self.app.router.add_get("/metrics", self.metrics_text)
+        if health is not None:
+            # 상태 확인 (supervisor.py가 제공하는 핸들러)
+            self.app.router.add_get("/health", health)
+
+    async def load(self):
+        """대화 기록 불러오기 (파일 읽기/색인은 스레드 풀에서)"""
+        await self.executor.run(self.service.load)
+
+    async def serve(self, ready=None, host: str = HOST, port: int = PORT):
+        """웹 서버 실행 (취소될 때까지), 수신을 시작하면 ready() 호출"""
+        runner = web.AppRunner(self.app, access_log=None)
+        await runner.setup()
+        try:
+            await web.TCPSite(runner, host, port).start()
+            _LOGGER.info(f"Chat UI 서버 리스닝 중 (Port {port})...")
+            if ready is not None:
+                ready()
+            await asyncio.Event().wait()
+        finally:
+            await runner.cleanup()
+
+    async def feed_loop(self, ready=None):
+        """STT/TTS 서버가 publish한 메시지를 바로 저장 + 전송 (HA 자동화 불필요)"""
+        if ready is not None:
+            ready()
+        while True:
+            await self.chat_feed.wait()
+            # 전송 묶음 간격 동안 쌓인 메시지를 한 번에 처리
+            await asyncio.sleep(BROADCAST_WINDOW)
+            messages = [m for m in map(make_message, self.chat_feed.drain()) if m is not None]
+            if messages:
+                try:
+                    await self.store_and_broadcast(messages)
+                except ExecutorBusy as e:
+                    _LOGGER.warning(f"Chat UI 메시지 {len(messages)}개 저장 생략: {e}")
+
+    async def retention_loop(self, ready=None):
+        """보존 기간이 지난 대화를 주기적으로 정리 (요청 처리 경로와 분리)"""
+        if ready is not None:
+            ready()
+        while True:
+            await asyncio.sleep(RETENTION_INTERVAL)
+            await self.executor.run(self.service.expire)
+
+    async def store_and_broadcast(self, messages: list):
+        await self.executor.run(self.service.store, messages)
+
+        # WebSocket으로 실시간 전송 (짧은 시간 안의 메시지는 묶어서)
+        self.broadcaster.publish(messages)
+
+    async def index(self, request: web.Request):
+        html = await self.executor.run(self.service.render_index)
+        return web.Response(text=html, content_type="text/html")
+
+    async def history(self, request: web.Request):
+        return web.json_response(await self.executor.run(
+            self.service.history_page, _int_arg(request, "before"), _int_arg(request, "limit", PAGE_SIZE)
+        ))
+
+    async def search(self, request: web.Request):
+        return web.json_response(await self.executor.run(
+            self.service.search,
+            request.query.get("q", ""),
+            _int_arg(request, "offset", 0),
+            _int_arg(request, "limit", SEARCH_PAGE_SIZE),
+        ))
+
+    async def metrics_text(self, request: web.Request):
+        """단계별 지표 (같은 프로세스의 STT/TTS 포함, Prometheus 텍스트 형식)"""
+        text = await self.executor.run(metrics.REGISTRY.render)
+        return web.Response(body=text.encode(), headers={"Content-Type": metrics.CONTENT_TYPE})
+
+    async def _store_request(self, messages: list, **extra):
+        try:
+            await self.store_and_broadcast(messages)
+        except ExecutorBusy:
+            return web.json_response({"status": "error", "error": "저장 대기열 가득 참"}, status=503)
+        return web.json_response({"status": "ok", **extra})
+
+    async def add_message(self, request: web.Request):
+        try:
+            new_msg = make_message(await request.json())
+        except ValueError:
+            new_msg = None
+        if new_msg is None:
+            return web.json_response({"status": "error", "error": "role, message 필요"}, status=400)
+
+        return await self._store_request([new_msg])
+
+    async def add_messages(self, request: web.Request):
+        """메시지 목록을 한 번에 추가 (요청 본문: [{role, message}, ...])"""
+        try:
+            data = await request.json()
+        except ValueError:
+            data = None
+        messages, error = self.service.parse_batch(data)
+        if error:
+            return web.json_response({"status": "error", "error": error}, status=400)
+
+        if not messages:
+            return web.json_response({"status": "ok", "added": 0})
+        return await self._store_request(messages, added=len(messages))
+
+    def close(self):
+        self.executor.shutdown()
+        self.service.history.store.close()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""프로세스 내 FLAC 인코딩 (libsndfile) - 요청마다 flac 실행 파일을 띄우지 않음"""
+import io
+import logging
+import numpy as np
+import speech_recognition as sr
+
+_LOGGER = logging.getLogger(__name__)
+
+try:
+    import soundfile
+except (ImportError, OSError) as e:
+    # libsndfile이 없으면 SpeechRecognition 기본 경로(flac 실행 파일)로 동작
+    _LOGGER.warning(f"soundfile 사용 불가, flac 실행 파일로 인코딩합니다: {e}")
+    soundfile = None
+
+
+def encode_flac(audio, sample_rate: int) -> bytes:
+    """16bit mono PCM(bytes 또는 memoryview)을 FLAC으로 인코딩 (반쪽 샘플은 버림)"""
+    samples = np.frombuffer(audio[:len(audio) - len(audio) % 2], dtype='<i2')
+    flac_buffer = io.BytesIO()
+    soundfile.write(flac_buffer, samples, sample_rate, format="FLAC", subtype="PCM_16")
+    return flac_buffer.getvalue()
+
+
+class EncodedAudioData(sr.AudioData):
+    """미리 인코딩한 FLAC을 recognize_google에 그대로 넘기는 AudioData"""
+
+    def __init__(self, frame_data, sample_rate, sample_width, flac_data):
+        super().__init__(frame_data, sample_rate, sample_width)
+        self.flac_data = flac_data
+
+    def get_flac_data(self, convert_rate=None, convert_width=None):
+        if convert_rate in (None, self.sample_rate) and convert_width in (None, self.sample_width):
+            return self.flac_data
+        return super().get_flac_data(convert_rate, convert_width)
+
+
+def make_audio_data(audio, sample_rate: int, sample_width: int) -> sr.AudioData:
+    """인식 요청용 AudioData 생성 - 가능하면 FLAC을 프로세스 내에서 미리 인코딩"""
+    # 잘린 마지막 청크로 길이가 프레임 단위가 아니면 온전한 프레임까지만 사용
+    audio = audio[:len(audio) - len(audio) % sample_width]
+    if soundfile is None or sample_width != 2:
+        return sr.AudioData(audio, sample_rate, sample_width)
+
+    try:
+        flac_data = encode_flac(audio, sample_rate)
+    except Exception as e:
+        _LOGGER.warning(f"FLAC 인코딩 실패, 기본 경로 사용: {e}")
+        return sr.AudioData(audio, sample_rate, sample_width)
+    return EncodedAudioData(audio, sample_rate, sample_width, flac_data)
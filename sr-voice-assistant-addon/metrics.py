@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""음성 파이프라인 단계별 지표 - 카운터/히스토그램, Prometheus 텍스트 형식 출력
+
+관찰 한 번은 bisect + 잠금 안의 덧셈 몇 번이라 요청 경로에서 바로 기록해도 됩니다.
+프로세스마다 REGISTRY 하나에 모으고, 3개 프로세스 모드에서는 STT/TTS 서버가 Unix 소켓
+(METRICS_SOCKET_DIR/sr_metrics_<이름>.sock)으로 내보낸 것을 Chat UI의 /metrics가 합칩니다.
+"""
+import asyncio
+import bisect
+import logging
+import os
+import socket
+import threading
+
+_LOGGER = logging.getLogger(__name__)
+
+METRICS_SOCKET_DIR = "/tmp"
+# 3개 프로세스 모드에서 Chat UI가 지표를 모으는 프로세스
+METRICS_PROCESSES = ("stt", "tts")
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# /metrics 요청 시 다른 프로세스 응답 대기 시간 (초)
+COLLECT_TIMEOUT = 0.5
+
+# 초 단위 지연 구간 (5ms ~ 30s)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# 바이트 구간 (16kHz 16bit mono 기준 약 0.5초 ~ 30초)
+BYTES_BUCKETS = (16000, 32000, 64000, 128000, 256000, 512000, 1024000)
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: tuple = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        """레이블 값별 하위 지표 (처음 쓰는 조합이면 생성)"""
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in sorted(self._children.items()):
+            lines.extend(child.render(self.name, self.label_names, key))
+        return lines
+
+
+class _CounterValue:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def render(self, name, label_names, key) -> list:
+        return [f"{name}{_format_labels(label_names, key)} {_format_value(self.value)}"]
+
+
+class Counter(_Metric):
+    """증가만 하는 값 (요청 수, 보낸 청크 수 등)"""
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterValue()
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+
+class _HistogramValue:
+    __slots__ = ("buckets", "counts", "sum", "count", "_lock")
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def render(self, name, label_names, key) -> list:
+        with self._lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += bucket_count
+            le = "+Inf" if bound == float("inf") else _format_value(bound)
+            bucket_labels = _format_labels(label_names, key, f'le="{le}"')
+            lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+        labels = _format_labels(label_names, key)
+        lines.append(f"{name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{name}_count{labels} {count}")
+        return lines
+
+
+class Histogram(_Metric):
+    """관찰값 분포 (구간별 누적 개수 + 합계 + 개수)"""
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                # 모듈을 다시 불러와도 같은 지표를 이어서 씀
+                return existing
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+class ExecutorMetrics:
+    """BoundedExecutor.stats()를 수집 시점에 게이지/카운터로 출력 (실행기 이름 레이블)"""
+    name = "sr_executor"
+
+    # (stats 키, 지표 이름, 종류, 설명, 배율)
+    FIELDS = (
+        ("running", "sr_executor_running", "gauge", "실행 중 작업 수", 1),
+        ("queued", "sr_executor_queued", "gauge", "대기 중 작업 수", 1),
+        ("workers", "sr_executor_workers", "gauge", "스레드 수", 1),
+        ("max_queue", "sr_executor_max_queue", "gauge", "대기열 상한", 1),
+        ("wait_avg_ms", "sr_executor_wait_avg_seconds", "gauge", "평균 대기 시간", 0.001),
+        ("wait_max_ms", "sr_executor_wait_max_seconds", "gauge", "최대 대기 시간", 0.001),
+        ("submitted", "sr_executor_submitted_total", "counter", "제출된 작업 수", 1),
+        ("rejected", "sr_executor_rejected_total", "counter", "대기열이 가득 차 거절된 작업 수", 1),
+        ("expired", "sr_executor_expired_total", "counter", "대기 중 마감 시간이 지난 작업 수", 1),
+        ("timed_out", "sr_executor_timed_out_total", "counter", "결과 대기 시간 초과 수", 1),
+    )
+
+    def __init__(self):
+        self._executors = {}
+        self._lock = threading.Lock()
+
+    def add(self, executor):
+        # 같은 이름으로 다시 만들면 새 실행기로 교체
+        with self._lock:
+            self._executors[executor.name] = executor
+
+    def render(self) -> list:
+        with self._lock:
+            executors = sorted(self._executors.items())
+        stats = [(name, executor.stats()) for name, executor in executors]
+        lines = []
+        for key, metric, kind, help_text, scale in self.FIELDS:
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+            for name, values in stats:
+                labels = _format_labels(("executor",), (name,))
+                lines.append(f"{metric}{labels} {_format_value(values[key] * scale)}")
+        return lines
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, help_text: str, labels: tuple = ()) -> Counter:
+    return REGISTRY.register(Counter(name, help_text, labels))
+
+
+def histogram(name: str, help_text: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram(name, help_text, labels, buckets))
+
+
+def track_executor(executor):
+    """BoundedExecutor의 대기열/대기 시간을 /metrics에 노출"""
+    REGISTRY.register(ExecutorMetrics()).add(executor)
+
+
+def socket_path(process: str) -> str:
+    return os.path.join(METRICS_SOCKET_DIR, f"sr_metrics_{process}.sock")
+
+
+async def serve_metrics_socket(process: str):
+    """이 프로세스의 지표를 Unix 소켓으로 제공 (연결마다 전체 텍스트를 보내고 닫음)"""
+    path = socket_path(process)
+    if os.path.exists(path):
+        os.unlink(path)
+
+    async def handle(reader, writer):
+        try:
+            writer.write(REGISTRY.render().encode())
+            await writer.drain()
+        finally:
+            writer.close()
+
+    return await asyncio.start_unix_server(handle, path)
+
+
+def collect(processes: list) -> str:
+    """이 프로세스 + 다른 프로세스(Unix 소켓) 지표를 합친 텍스트 (응답 없는 프로세스는 생략)"""
+    parts = [REGISTRY.render()]
+    for process in processes:
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(COLLECT_TIMEOUT)
+                sock.connect(socket_path(process))
+                chunks = []
+                while True:
+                    data = sock.recv(65536)
+                    if not data:
+                        break
+                    chunks.append(data)
+            parts.append(b"".join(chunks).decode())
+        except OSError as e:
+            _LOGGER.debug(f"{process} 지표 수집 실패: {e}")
+    return _merge(parts)
+
+
+def _merge(texts: list) -> str:
+    """여러 프로세스의 출력을 지표별로 합침 (같은 이름의 HELP/TYPE은 한 번만)"""
+    families = {}
+    for text in texts:
+        family = None
+        for line in text.splitlines():
+            if line.startswith(("# HELP ", "# TYPE ")):
+                family = line.split(" ", 3)[2]
+                headers, _ = families.setdefault(family, ([], []))
+                if len(headers) < 2 and line not in headers:
+                    headers.append(line)
+            elif line and family is not None:
+                families[family][1].append(line)
+    lines = [line for headers, samples in families.values() for line in headers + samples]
+    return "\n".join(lines) + "\n" if lines else ""
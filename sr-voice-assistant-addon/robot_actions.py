@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""LLM 응답에서 로봇 동작 JSON 블록 추출 (TTS 서버와 Chat UI 공용)
+
+응답 예: 안녕하세요! ```json [{"r": 10, "d": 0.5}, {"y": -20}] ``` 반가워요.
+
+한 번의 순차 스캔으로 최상위 [ ... ] 블록을 찾아(중첩 괄호, 문자열 안의 괄호 처리)
+JSON 동작 목록인지 검증하고, 블록과 감싼 마크다운 코드 펜스를 텍스트에서 제거합니다.
+스트리밍 텍스트에도 쓸 수 있도록 조각 단위 입력을 지원하며, 블록이 닫히는 즉시
+동작을 꺼낼 수 있습니다.
+"""
+import json
+import re
+
+# 블록이 이보다 길어지도록 닫히지 않으면 동작 블록이 아닌 일반 텍스트로 처리
+MAX_BLOCK_CHARS = 8192
+
+# 블록 안에서 의미 있는 문자 (그 외 문자는 한 번에 건너뜀)
+_BLOCK_TOKEN = re.compile(r'[\[\]"\\]')
+# 여는 펜스의 언어 표시와 뒤따르는 공백 (```json\n)
+_FENCE_INFO = re.compile(r'[\w-]*\s*')
+_FENCE = "```"
+_DECODER = json.JSONDecoder()
+
+_TEXT, _BLOCK, _CLOSING, _DONE = range(4)
+
+
+def is_action_list(value) -> bool:
+    """비어 있지 않은 dict 목록인지 (BlossomController.start_sequence 입력 형식)"""
+    return (
+        isinstance(value, list)
+        and len(value) > 0
+        and all(isinstance(action, dict) for action in value)
+    )
+
+
+class ActionBlockParser:
+    """텍스트 조각을 입력받아 동작 블록을 제외한 텍스트를 돌려주는 증분 파서
+
+    feed()는 더 이상 바뀌지 않는 텍스트만 반환하고, 블록이나 펜스의 일부일 수 있는
+    꼬리는 다음 조각이 올 때까지 보류합니다. 응답 하나에서 첫 번째 유효한 블록만
+    동작으로 사용합니다 (self.actions).
+    """
+
+    def __init__(self, max_block_chars: int = MAX_BLOCK_CHARS):
+        self.max_block_chars = max_block_chars
+        self.actions = None
+        self._buf = ""
+        self._state = _TEXT
+        self._block_start = 0    # 버퍼 앞부분은 여는 펜스 (있을 때)
+        self._scan = 0           # 블록 스캔 재개 위치
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._decoded = 0        # 빠른 경로 파싱이 실패했을 때의 버퍼 길이
+
+    def feed(self, chunk: str) -> str:
+        """조각 추가 후 확정된 텍스트 반환 (동작 블록은 self.actions로)"""
+        self._buf += chunk
+        return self._process(final=False)
+
+    def finish(self) -> str:
+        """입력 종료 - 보류 중인 텍스트를 모두 반환 (닫히지 않은 블록은 텍스트로)"""
+        out = self._process(final=True)
+        while self._state == _BLOCK:
+            out += self._abandon_block()
+            out += self._process(final=True)
+        out += self._buf
+        self._buf = ""
+        return out
+
+    def _process(self, final: bool) -> str:
+        out = []
+        while True:
+            if self._state == _TEXT:
+                done = self._scan_text(out, final)
+            elif self._state == _BLOCK:
+                done = self._scan_block(out)
+            elif self._state == _CLOSING:
+                done = self._scan_closing(final)
+            else:
+                out.append(self._buf)
+                self._buf = ""
+                done = True
+            if done:
+                return "".join(out)
+
+    def _scan_text(self, out: list, final: bool) -> bool:
+        buf = self._buf
+        start = buf.find("[")
+        if start < 0:
+            # 끝부분이 여는 펜스의 일부일 수 있으면 보류
+            keep = len(buf) if final else self._fence_tail(buf, len(buf), partial=True)
+            out.append(buf[:keep])
+            self._buf = buf[keep:]
+            return True
+
+        fence = self._fence_tail(buf, start, partial=False)
+        out.append(buf[:fence])
+        self._buf = buf[fence:]
+        self._block_start = start - fence
+        self._scan = self._block_start
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._decoded = 0
+        self._state = _BLOCK
+
+        # 빠른 경로: 블록 전체가 이미 도착했으면 C 파서가 한 번에 검증 + 끝 위치 확인
+        try:
+            value, end = _DECODER.raw_decode(self._buf, self._block_start)
+        except ValueError:
+            # 아직 덜 왔거나 JSON이 아님 - 괄호 스캔으로 블록 끝을 찾음
+            self._decoded = len(self._buf)
+            return False
+        return self._close_block(out, end, value)
+
+    @staticmethod
+    def _fence_tail(buf: str, end: int, partial: bool) -> int:
+        """buf[:end]이 여는 펜스(```json 등)로 끝나면 그 시작 위치, 아니면 end
+
+        partial=True면 아직 완성되지 않은 펜스(` 또는 ``)도 포함합니다.
+        """
+        tick = buf.rfind("`", 0, end)
+        if tick < 0:
+            return end
+        run = tick
+        while run > 0 and buf[run - 1] == "`":
+            run -= 1
+        ticks = tick + 1 - run
+        if ticks == 3 and _FENCE_INFO.fullmatch(buf, tick + 1, end):
+            return run
+        if partial and ticks < 3 and tick == end - 1:
+            return run
+        return end
+
+    def _scan_block(self, out: list) -> bool:
+        buf = self._buf
+        pos = self._scan
+        while True:
+            match = _BLOCK_TOKEN.search(buf, pos)
+            end = match.start() if match else len(buf)
+            if end - self._block_start >= self.max_block_chars:
+                out.append(self._abandon_block())
+                return False
+            if match is None:
+                self._scan = len(buf)
+                return True
+
+            pos = match.end()
+            char = match.group()
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "[":
+                self._depth += 1
+            elif char == "]":
+                self._depth -= 1
+                if self._depth == 0:
+                    value = None
+                    # 블록 전체가 있는 상태에서 빠른 경로가 이미 실패했으면 다시 파싱하지 않음
+                    if pos > self._decoded:
+                        try:
+                            value = json.loads(buf[self._block_start:pos])
+                        except ValueError:
+                            pass
+                    return self._close_block(out, pos, value)
+
+    def _close_block(self, out: list, end: int, actions) -> bool:
+        buf = self._buf
+        if not is_action_list(actions):
+            # 일반 텍스트의 괄호 - 그대로 내보내고 이어서 스캔
+            out.append(buf[:end])
+            self._buf = buf[end:]
+            self._state = _TEXT
+            return False
+
+        self.actions = actions
+        self._buf = buf[end:]
+        self._state = _CLOSING
+        return False
+
+    def _abandon_block(self) -> str:
+        """닫히지 않은 블록의 여는 괄호까지를 텍스트로 돌려주고 그 뒤부터 다시 스캔"""
+        head = self._buf[:self._block_start + 1]
+        self._buf = self._buf[self._block_start + 1:]
+        self._state = _TEXT
+        return head
+
+    def _scan_closing(self, final: bool) -> bool:
+        """블록 뒤의 닫는 펜스(공백 포함) 제거"""
+        buf = self._buf
+        stripped = buf.lstrip()
+        if stripped.startswith(_FENCE):
+            self._buf = stripped[len(_FENCE):]
+        elif not final and _FENCE.startswith(stripped):
+            # 공백 또는 펜스 일부만 도착 - 다음 조각까지 보류
+            return True
+        self._state = _DONE
+        return False
+
+
+def extract_actions(text: str):
+    """(동작 블록을 제거한 텍스트, 동작 목록 또는 None)"""
+    if "[" not in text:
+        return text.strip(), None
+    parser = ActionBlockParser()
+    clean = parser.feed(text) + parser.finish()
+    return clean.strip(), parser.actions
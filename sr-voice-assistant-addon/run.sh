@@ -4,6 +4,17 @@ echo "========================================"
 echo "SR Voice Assistant + Chat UI 시작"
 echo "========================================"
 
+# 시작 로그에 모듈별 import 시간 표시 (python -X importtime과 같은 분석, startup.py)
+if bashio::config.true 'startup_import_profile'; then
+    export SR_IMPORT_PROFILE=1
+fi
+
+# 단일 프로세스 모드: STT/TTS/Chat UI를 하나의 이벤트 루프에서 실행
+if bashio::config.true 'single_process'; then
+    echo "[INFO] 단일 프로세스 모드 시작 (Chat UI 9822, STT 10300, TTS 10400)..."
+    exec python3 /supervisor.py
+fi
+
 # Flask Chat UI 서버 백그라운드 실행
 echo "[INFO] Flask Chat UI 서버 시작 (Port 9822)..."
 python3 /app.py &
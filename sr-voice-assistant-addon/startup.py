@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""서버 시작 시간 측정 - 단계별 소요 시간, 백그라운드 import, import 시간 분석
+
+SR_IMPORT_PROFILE=1 (애드온 옵션 startup_import_profile)이면 이 모듈을 import한 뒤의
+모든 import를 `python -X importtime`처럼 모듈별 자체/누적 시간으로 기록하고, 시작 로그에
+오래 걸린 순서로 보여 줍니다. 진입점 모듈에서 가장 먼저 import하세요.
+"""
+import asyncio
+import importlib
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+IMPORT_PROFILE_ENV = "SR_IMPORT_PROFILE"
+# 시작 로그에 보여 줄 import 수
+IMPORT_PROFILE_TOP = 15
+
+# /proc을 읽을 수 없을 때의 시작 기준
+_IMPORTED_AT = time.monotonic()
+
+
+def process_uptime() -> float:
+    """프로세스가 만들어진 뒤 지난 시간 (초, 인터프리터 시작 + import 포함)"""
+    try:
+        with open("/proc/self/stat", encoding="ascii") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime", encoding="ascii") as f:
+            system_uptime = float(f.read().split()[0])
+        # 22번째 필드: 부팅 후 프로세스 시작 시각 (clock tick)
+        return system_uptime - int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return time.monotonic() - _IMPORTED_AT
+
+
+class _TimedLoader:
+    """exec_module 시간만 재고 나머지는 원래 로더에 위임"""
+
+    def __init__(self, loader, name: str, profiler):
+        self._loader = loader
+        self._name = name
+        self._profiler = profiler
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        # 모듈에는 원래 로더를 남김 (리소스/소스 조회가 로더 타입을 확인하는 경우)
+        module.__loader__ = self._loader
+        if module.__spec__ is not None:
+            module.__spec__.loader = self._loader
+        self._profiler._enter()
+        started = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._exit(self._name, time.perf_counter() - started)
+
+
+class ImportProfiler:
+    """sys.meta_path 맨 앞에서 모듈별 (자체, 누적) import 시간 기록"""
+
+    def __init__(self):
+        self.records = {}      # 모듈 이름 → (자체 초, 누적 초)
+        self._local = threading.local()
+
+    def find_spec(self, name, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimedLoader(spec.loader, name, self)
+            return spec
+        return None
+
+    def _enter(self):
+        stack = self._local.__dict__.setdefault("stack", [])
+        stack.append(0.0)
+
+    def _exit(self, name: str, elapsed: float):
+        stack = self._local.stack
+        children = stack.pop()
+        if stack:
+            stack[-1] += elapsed
+        self.records[name] = (elapsed - children, elapsed)
+
+    def top(self, count: int = IMPORT_PROFILE_TOP) -> list:
+        """누적 시간이 긴 순서의 (모듈, 자체 초, 누적 초) 목록"""
+        ranked = sorted(self.records.items(), key=lambda item: item[1][1], reverse=True)
+        return [(name, own, total) for name, (own, total) in ranked[:count]]
+
+
+_profiler = None
+
+
+def install_import_profiler() -> ImportProfiler:
+    global _profiler
+    if _profiler is None:
+        _profiler = ImportProfiler()
+        sys.meta_path.insert(0, _profiler)
+    return _profiler
+
+
+if os.environ.get(IMPORT_PROFILE_ENV, "") not in ("", "0"):
+    install_import_profiler()
+
+
+class StartupTimer:
+    """시작 단계별 소요 시간 - mark(단계)는 직전 단계 이후 걸린 시간을 기록"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.phases = [("인터프리터 + import", process_uptime())]
+        self._last = time.monotonic()
+
+    def mark(self, phase: str):
+        now = time.monotonic()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    @property
+    def total(self) -> float:
+        return sum(elapsed for _, elapsed in self.phases)
+
+    def log(self):
+        phases = ", ".join(f"{phase} {elapsed * 1000:.0f}ms" for phase, elapsed in self.phases)
+        _LOGGER.info(f"{self.name} 수신 시작까지 {self.total:.2f}초 ({phases})")
+        if _profiler is not None:
+            _LOGGER.info(f"import 시간 상위 {IMPORT_PROFILE_TOP}개 (누적 / 자체 ms):")
+            for name, own, total in _profiler.top():
+                _LOGGER.info(f"  {total * 1000:8.1f} / {own * 1000:7.1f}  {name}")
+
+
+def preload(modules: list):
+    """무거운 모듈을 미리 import (수신 시작 후 스레드에서 호출 - 첫 요청 지연 방지)"""
+    started = time.monotonic()
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            _LOGGER.warning(f"미리 import 실패 ({name}): {e}")
+    _LOGGER.info(f"백그라운드 import 완료 ({', '.join(modules)}): {(time.monotonic() - started) * 1000:.0f}ms")
+
+
+async def wait_for_stop_signal():
+    """SIGTERM/SIGINT를 받을 때까지 대기 (정리 코드가 실행되도록)"""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+    try:
+        await stop.wait()
+    finally:
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.remove_signal_handler(sig)
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""STT 업로드 전 무음 구간 제거 (에너지 기반 VAD, NumPy 벡터 연산)"""
+import numpy as np
+from utterance_buffer import SAMPLE_RATE, SAMPLE_WIDTH
+
+FRAME_MS = 20
+# 음성 앞뒤로 남겨둘 여유 구간 (단어 첫 자음/끝 음절 보호)
+PADDING_MS = 200
+# 노이즈 바닥 대비 음성으로 판단할 에너지 차이
+MARGIN_DB = 10.0
+# 이 값보다 조용한 프레임은 항상 무음
+MIN_SPEECH_DBFS = -55.0
+# 발화 전체가 음성이어도 부드러운 음절을 놓치지 않도록 임계값 상한 (최대 에너지 - N dB)
+MAX_RANGE_DB = 20.0
+
+
+def frame_energies(samples: np.ndarray, frame_len: int) -> np.ndarray:
+    """프레임별 RMS 에너지 (dBFS)"""
+    n_frames = len(samples) // frame_len
+    frames = samples[:n_frames * frame_len].reshape(n_frames, frame_len).astype(np.float32)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    return 20.0 * np.log10(np.maximum(rms, 1.0) / 32768.0)
+
+
+def speech_mask(energies: np.ndarray) -> np.ndarray:
+    """노이즈 바닥을 추정하여 프레임별 음성 여부 판정"""
+    noise_floor = np.percentile(energies, 10)
+    peak = energies.max()
+    threshold = min(noise_floor + MARGIN_DB, peak - MAX_RANGE_DB)
+    threshold = max(threshold, MIN_SPEECH_DBFS)
+    return energies > threshold
+
+
+def _run_positions(mask: np.ndarray):
+    """각 프레임의 (같은 값이 이어지는 구간 내 위치, 그 구간 길이)"""
+    n = len(mask)
+    change = np.flatnonzero(np.diff(mask.astype(np.int8))) + 1
+    starts = np.concatenate(([0], change))
+    lengths = np.diff(np.concatenate((starts, [n])))
+    run_id = np.repeat(np.arange(len(starts)), lengths)
+    return np.arange(n) - starts[run_id], lengths[run_id]
+
+
+def trim_silence(audio, max_pause_ms: int = 0,
+                 padding_ms: int = PADDING_MS, sample_rate: int = SAMPLE_RATE):
+    """앞뒤 무음 제거, max_pause_ms > 0이면 내부의 긴 쉼도 그 길이로 압축
+
+    음성으로 판단되는 프레임이 없으면 입력(bytes 또는 memoryview)을 복사 없이 그대로 반환합니다.
+    """
+    # 잘린 마지막 청크의 반쪽 샘플은 버림 (끝점 검출기와 같은 처리)
+    audio = audio[:len(audio) - len(audio) % SAMPLE_WIDTH]
+    samples = np.frombuffer(audio, dtype='<i2')
+    frame_len = sample_rate * FRAME_MS // 1000
+    if len(samples) < frame_len:
+        return audio
+
+    speech = speech_mask(frame_energies(samples, frame_len))
+
+    # 음성 프레임 주변으로 padding 만큼 확장
+    pad = padding_ms // FRAME_MS
+    if pad > 0:
+        speech = np.convolve(speech.astype(np.int8), np.ones(2 * pad + 1, dtype=np.int8), mode='same') > 0
+
+    voiced = np.flatnonzero(speech)
+    if len(voiced) == 0:
+        return audio
+    start, end = voiced[0], voiced[-1] + 1
+    speech = speech[start:end]
+
+    frames = samples[start * frame_len:end * frame_len].reshape(-1, frame_len)
+    if max_pause_ms > 0:
+        # 긴 쉼은 앞/뒤 절반씩만 남겨 max_pause_ms로 압축
+        half = max(1, max_pause_ms // FRAME_MS // 2)
+        pos, length = _run_positions(speech)
+        keep = speech | (pos < half) | (length - pos <= half)
+        frames = frames[keep]
+
+    return frames.tobytes()
+
+
+# --- 스트리밍 끝점 검출 (추측 인식용) ---
+
+ENDPOINT = "endpoint"
+RESUMED = "resumed"
+
+# 끝점으로 판단할 발화 후 무음 길이
+ENDPOINT_SILENCE_MS = 600
+# 클릭/잡음을 음성으로 오인하지 않도록 연속 음성 프레임 수
+MIN_SPEECH_FRAMES = 3
+# 무음 프레임에서 노이즈 바닥이 올라가는 속도 (dB 차이의 비율)
+NOISE_FLOOR_RISE = 0.02
+
+
+class EndpointDetector:
+    """AudioChunk 단위로 입력받아 발화 끝점(무음 지속)과 발화 재개를 알려줌"""
+
+    def __init__(self, silence_ms: int = ENDPOINT_SILENCE_MS, sample_rate: int = SAMPLE_RATE):
+        self.frame_len = sample_rate * FRAME_MS // 1000
+        self.endpoint_frames = max(1, silence_ms // FRAME_MS)
+        self.reset()
+
+    def reset(self):
+        self._pending = b""
+        self._noise_floor = None
+        self._speech_run = 0
+        self._silence_frames = 0
+        self.speech_detected = False
+        self.endpointed = False
+
+    def process(self, audio) -> str:
+        """ENDPOINT, RESUMED 또는 None (한 청크에서 둘 다 일어나면 마지막 상태)"""
+        data = self._pending + bytes(audio)
+        usable = len(data) - len(data) % (self.frame_len * SAMPLE_WIDTH)
+        self._pending = data[usable:]
+        if not usable:
+            return None
+
+        samples = np.frombuffer(data[:usable], dtype='<i2')
+        result = None
+        for energy in frame_energies(samples, self.frame_len).tolist():
+            if self._noise_floor is None or energy < self._noise_floor:
+                self._noise_floor = energy
+            threshold = max(MIN_SPEECH_DBFS, self._noise_floor + MARGIN_DB)
+
+            if energy > threshold:
+                self._speech_run += 1
+                if self._speech_run >= MIN_SPEECH_FRAMES:
+                    self.speech_detected = True
+                    self._silence_frames = 0
+                    if self.endpointed:
+                        self.endpointed = False
+                        result = RESUMED
+                continue
+
+            self._speech_run = 0
+            self._noise_floor += (energy - self._noise_floor) * NOISE_FLOOR_RISE
+            if self.speech_detected and not self.endpointed:
+                self._silence_frames += 1
+                if self._silence_frames >= self.endpoint_frames:
+                    self.endpointed = True
+                    result = ENDPOINT
+        return result
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""단일 프로세스 모드 - STT/TTS Wyoming 서버와 Chat UI를 하나의 이벤트 루프에서 실행
+
+run.sh의 3개 프로세스(app.py, wyoming_stt.py, wyoming_tts.py) 대신 인터프리터 하나가
+의존성을 한 번만 불러오므로 시작 시간과 전체 메모리가 줄어듭니다. 각 구성 요소는
+실패하면 지수 백오프로 다시 시작하고, 상태는 Chat UI 포트의 /health에서 확인합니다.
+"""
+from startup import StartupTimer, process_uptime, wait_for_stop_signal
+import asyncio
+import logging
+import time
+
+from aiohttp import web
+from wyoming.server import AsyncServer
+
+import wyoming_stt
+import wyoming_tts
+from chat_web import ChatWebServer
+from chat_feed import LocalChatFeed
+from addon_options import load_options
+
+_LOGGER = logging.getLogger(__name__)
+
+# 다시 시작 대기 시간 (초, 실패할 때마다 두 배)
+RESTART_MIN_DELAY = 1.0
+RESTART_MAX_DELAY = 30.0
+# 이 시간 이상 정상 실행된 뒤의 실패는 대기 시간을 처음부터 다시 계산
+RESTART_RESET_AFTER = 60.0
+# 모든 구성 요소가 준비될 때까지 기다리는 시간 (시작 시간 기록용)
+STARTUP_TIMEOUT = 30.0
+
+
+def rss_mb() -> float:
+    """현재 프로세스의 상주 메모리 (MB, /proc 없으면 0)"""
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return 0.0
+
+
+class Component:
+    """감시 대상 구성 요소 - run(ready)는 취소될 때까지 실행되는 코루틴 함수"""
+
+    def __init__(self, name: str, run):
+        self.name = name
+        self.run = run
+        self.state = "starting"
+        self.restarts = 0
+        self.last_error = None
+        self.ready_event = asyncio.Event()
+
+    def ready(self):
+        self.state = "running"
+        self.ready_event.set()
+
+    async def supervise(self):
+        delay = RESTART_MIN_DELAY
+        while True:
+            started = time.monotonic()
+            try:
+                await self.run(self.ready)
+                raise RuntimeError("예기치 않게 종료됨")
+            except asyncio.CancelledError:
+                self.state = "stopped"
+                raise
+            except Exception as e:
+                if time.monotonic() - started >= RESTART_RESET_AFTER:
+                    delay = RESTART_MIN_DELAY
+                self.state = "restarting"
+                self.restarts += 1
+                self.last_error = str(e)
+                _LOGGER.error(f"{self.name} 실패: {e} - {delay:.0f}초 후 다시 시작")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RESTART_MAX_DELAY)
+
+    def stats(self) -> dict:
+        return {"state": self.state, "restarts": self.restarts, "last_error": self.last_error}
+
+
+async def serve_wyoming(uri: str, factory, ready):
+    """Wyoming 서버 실행 (취소될 때까지) - SIGTERM은 supervisor가 처리하므로 start/stop 사용"""
+    server = AsyncServer.from_uri(uri)
+    await server.start(factory)
+    _LOGGER.info(f"Wyoming 서버 리스닝 중 ({uri})...")
+    ready()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+async def main():
+    """메인 함수"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='[%(levelname)s] %(message)s'
+    )
+
+    timer = StartupTimer("STT/TTS/Chat UI")
+    options = load_options()
+    # STT/TTS → Chat UI 직접 전달 (같은 루프 안, 소켓 없음)
+    chat_feed = LocalChatFeed() if bool(options.get("chat_direct_feed", True)) else None
+    timer.mark("옵션")
+
+    stt_factory, stt_executor, stt_warmup, stt_close = wyoming_stt.create_handler_factory(options, chat_feed)
+    tts_factory, tts_executor, tts_warmup, tts_close = wyoming_tts.create_handler_factory(options, chat_feed)
+    components = {}
+    executors = [stt_executor, tts_executor]
+
+    async def health(request: web.Request):
+        """구성 요소 상태 + 스레드 풀 통계 (모두 실행 중이면 200, 아니면 503)"""
+        healthy = all(c.state == "running" for c in components.values())
+        report = {
+            "status": "ok" if healthy else "degraded",
+            "uptime": round(process_uptime(), 1),
+            "rss_mb": rss_mb(),
+            "components": {name: c.stats() for name, c in components.items()},
+            "executors": {e.name: e.stats() for e in executors},
+        }
+        if chat_feed is not None:
+            report["chat_feed"] = {"sent": chat_feed.sent, "dropped": chat_feed.dropped}
+        return web.json_response(report, status=200 if healthy else 503)
+
+    chat = ChatWebServer(options, chat_feed=chat_feed, health=health)
+    executors.append(chat.executor)
+    timer.mark("초기화")
+
+    components["stt"] = Component(
+        "stt", lambda ready: serve_wyoming(f"tcp://{wyoming_stt.HOST}:{wyoming_stt.PORT}", stt_factory, ready)
+    )
+    components["tts"] = Component(
+        "tts", lambda ready: serve_wyoming(f"tcp://{wyoming_tts.HOST}:{wyoming_tts.PORT}", tts_factory, ready)
+    )
+    # Wyoming 포트를 먼저 열고 대화 기록은 그동안 불러옴
+    tasks = [asyncio.create_task(c.supervise(), name=c.name) for c in components.values()]
+    try:
+        await chat.load()
+        timer.mark("대화 기록")
+
+        components["chat_ui"] = Component("chat_ui", chat.serve)
+        components["chat_retention"] = Component("chat_retention", chat.retention_loop)
+        if chat_feed is not None:
+            components["chat_feed"] = Component("chat_feed", chat.feed_loop)
+        tasks += [
+            asyncio.create_task(c.supervise(), name=c.name)
+            for name, c in components.items() if name not in ("stt", "tts")
+        ]
+
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(c.ready_event.wait() for c in components.values())), STARTUP_TIMEOUT
+            )
+            timer.mark("수신 시작")
+            timer.log()
+            _LOGGER.info(f"단일 프로세스 메모리: {rss_mb()} MB")
+        except asyncio.TimeoutError:
+            failed = [c.name for c in components.values() if c.state != "running"]
+            _LOGGER.warning(f"{STARTUP_TIMEOUT:.0f}초 안에 시작하지 못한 구성 요소: {', '.join(failed)}")
+        # 무거운 모듈 import와 사전 합성은 수신을 시작한 뒤 백그라운드에서
+        stt_warmup()
+        tts_warmup()
+
+        await wait_for_stop_signal()
+        _LOGGER.info("종료 신호 수신 - 모든 구성 요소 정리 중...")
+    finally:
+        # 수신을 먼저 멈춘 뒤 스레드 풀/연결 정리
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await stt_close()
+        await tts_close()
+        chat.close()
+        if chat_feed is not None:
+            chat_feed.close()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except Exception as e:
+        print(f"치명적 오류: {e}")
+        import traceback
+        traceback.print_exc()
+        exit(1)
+    print("서버 종료됨")
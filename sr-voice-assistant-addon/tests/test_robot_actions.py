@@ -0,0 +1,124 @@
+"""로봇 동작 블록 파서 - 경계 사례와 무작위 입력 (조각 단위 입력 == 한 번에 입력)"""
+import json
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from robot_actions import ActionBlockParser, extract_actions  # noqa: E402
+
+ACTIONS = [{"r": 10, "d": 0.5}, {"y": -20}]
+BLOCK = json.dumps(ACTIONS)
+
+
+def _chunked(text, size):
+    parser = ActionBlockParser()
+    out = "".join(parser.feed(text[i:i + size]) for i in range(0, len(text), size))
+    return (out + parser.finish()).strip(), parser.actions
+
+
+def _raw(text, size):
+    parser = ActionBlockParser()
+    out = "".join(parser.feed(text[i:i + size]) for i in range(0, len(text), size))
+    return out + parser.finish(), parser.actions
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("안녕하세요! " + BLOCK + " 반가워요.", ("안녕하세요!  반가워요.", ACTIONS)),
+    ("인사할게요!\n```json\n" + BLOCK + "\n```\n반갑습니다.", ("인사할게요!\n\n반갑습니다.", ACTIONS)),
+    ("```" + BLOCK + "```", ("", ACTIONS)),
+    # 문자열 안의 괄호와 중첩 배열
+    ('[{"say": "[a]", "seq": [[1, 2], [3]]}] 끝', ("끝", [{"say": "[a]", "seq": [[1, 2], [3]]}])),
+    # JSON이 아닌 괄호는 텍스트로 두고 뒤의 블록을 찾음
+    ("[웃음] 알겠어요. " + BLOCK + " 끝!", ("[웃음] 알겠어요.  끝!", ACTIONS)),
+    ("[1, 2] 숫자 목록 [] 빈 목록", ("[1, 2] 숫자 목록 [] 빈 목록", None)),
+    ("[[웃음]] 그리고 " + BLOCK, ("[[웃음]] 그리고", ACTIONS)),
+    # 응답 하나에서 첫 블록만 동작으로 사용
+    (BLOCK + " " + json.dumps([{"y": 5}]), (json.dumps([{"y": 5}]), ACTIONS)),
+    ("동작 없음", ("동작 없음", None)),
+])
+def test_extract_actions(text, expected):
+    assert extract_actions(text) == expected
+    for size in (1, 2, 3, 7):
+        assert _chunked(text, size) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "시작 [",
+    '시작 [{"r": 10',
+    '시작 ```json\n[{"r": 10}, "]',
+    "```json\n[[[",
+    "` `` ```",
+    "백슬래시 [\"\\",
+])
+def test_unterminated_block_is_kept_as_text(text):
+    for size in (1, 2, 5, len(text)):
+        assert _raw(text, size) == (text, None)
+
+
+def test_unterminated_block_then_valid_block():
+    text = "[잘린 괄호 " + BLOCK + " 끝"
+    assert extract_actions(text) == ("[잘린 괄호  끝", ACTIONS)
+
+
+def test_oversized_block_is_abandoned():
+    parser = ActionBlockParser(max_block_chars=16)
+    text = "[" + "가" * 32 + " " + BLOCK
+    out = parser.feed(text) + parser.finish()
+    assert out == "[" + "가" * 32 + " "
+    assert parser.actions == ACTIONS
+
+
+def test_actions_available_as_soon_as_block_closes():
+    parser = ActionBlockParser()
+    assert parser.feed("좋아요 ```json\n" + BLOCK[:-1]) == "좋아요 "
+    assert parser.actions is None
+    parser.feed(BLOCK[-1])
+    assert parser.actions == ACTIONS
+    assert parser.feed("\n``` 다음 문장") == " 다음 문장"
+
+
+# --- 무작위 입력 ---
+
+PIECES = ["안녕", " ", "\n", "[", "]", "{", "}", '"', "\\", "`", "```", "```json\n", ",", "1", "웃음"]
+PLAIN = ["안녕", "하세요", " ", "\n", ".", "!", "a", "1"]
+
+
+def _random_text(rng, alphabet):
+    return "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+
+
+def _random_actions(rng):
+    return [
+        {key: round(rng.uniform(-40, 40), 1) for key in rng.sample("rpyad", rng.randint(1, 5))}
+        for _ in range(rng.randint(1, 4))
+    ]
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_fuzz_chunked_matches_whole_without_losing_text(seed):
+    """어떤 입력에도 예외 없음, 조각 결과 == 한 번에 입력한 결과, 동작이 없으면 출력 == 입력"""
+    rng = random.Random(seed)
+    for _ in range(2000):
+        text = _random_text(rng, PIECES) + _random_text(rng, PIECES)
+        whole = extract_actions(text)
+        assert _chunked(text, rng.randint(1, 8)) == whole, text
+        if whole[1] is None:
+            assert _raw(text, rng.randint(1, 8)) == (text, None), text
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_fuzz_block_between_plain_text_is_extracted(seed):
+    rng = random.Random(seed)
+    for _ in range(2000):
+        actions = _random_actions(rng)
+        block = json.dumps(actions, ensure_ascii=False, indent=rng.choice([None, 2]))
+        if rng.random() < 0.5:
+            block = f"```json\n{block}\n```"
+        pre, post = _random_text(rng, PLAIN), _random_text(rng, PLAIN)
+        text = pre + block + post
+        expected = ((pre + post).strip(), actions)
+        assert extract_actions(text) == expected, text
+        assert _chunked(text, rng.randint(1, 8)) == expected, text
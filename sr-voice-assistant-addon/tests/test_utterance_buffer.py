@@ -0,0 +1,127 @@
+"""발화 버퍼 참조 카운트 - 취소/거절/시간 초과된 인식도 버퍼를 풀로 돌려주는지 확인"""
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import wyoming_stt  # noqa: E402
+from bounded_executor import BoundedExecutor  # noqa: E402
+from utterance_buffer import BufferPool  # noqa: E402
+from wyoming.audio import AudioStart  # noqa: E402
+
+
+class Handler(wyoming_stt.GoogleSttEventHandler):
+    """Google 요청 대신 잠깐 대기하는 핸들러"""
+
+    async def write_event(self, event):
+        pass
+
+    def _recognize_google(self, audio):
+        time.sleep(0.05)
+        return "인식 결과"
+
+
+async def _start_session(pool, executor):
+    handler = Handler(None, None, buffer_pool=pool, executor=executor)
+    await handler.handle_event(AudioStart(rate=16000, width=2, channels=1).event())
+    return handler, handler.audio_buffer
+
+
+async def _wait_recycled(pool, buffer):
+    for _ in range(100):
+        if buffer in pool._idle:
+            return True
+        await asyncio.sleep(0.01)
+    return False
+
+
+def test_speculative_cancelled_while_queued_returns_buffer():
+    async def scenario():
+        pool = BufferPool(32000)
+        executor = BoundedExecutor("test", 1, 4)
+        # 유일한 스레드를 막아 추측 인식이 대기열에 머물게 함
+        gate = threading.Event()
+        blocker = executor.submit(gate.wait, 5)
+
+        handler, buffer = await _start_session(pool, executor)
+        handler._speculative_task = asyncio.create_task(handler._recognize_speech(buffer, 0))
+        await asyncio.sleep(0.01)
+        assert buffer._refs == 1
+        assert executor.stats()["queued"] == 1
+
+        # 발화 재개 → 추측 인식 취소, 세션 종료
+        handler._cancel_speculative()
+        await handler.disconnect()
+        gate.set()
+        await blocker
+
+        assert await _wait_recycled(pool, buffer)
+        assert buffer._refs == 0
+        executor.shutdown()
+
+    asyncio.run(asyncio.wait_for(scenario(), 5))
+
+
+def test_speculative_cancelled_before_start_returns_buffer():
+    async def scenario():
+        pool = BufferPool(32000)
+        executor = BoundedExecutor("test", 1, 4)
+        handler, buffer = await _start_session(pool, executor)
+        handler._speculative_task = asyncio.create_task(handler._recognize_speech(buffer, 0))
+        handler._cancel_speculative()
+        await handler.disconnect()
+
+        assert await _wait_recycled(pool, buffer)
+        assert buffer._refs == 0
+        executor.shutdown()
+
+    asyncio.run(asyncio.wait_for(scenario(), 5))
+
+
+def test_timed_out_recognition_keeps_buffer_until_thread_finishes(monkeypatch):
+    async def scenario():
+        monkeypatch.setattr(wyoming_stt, "STT_DEADLINE", 0.01)
+        pool = BufferPool(32000)
+        executor = BoundedExecutor("test", 1, 4)
+        handler, buffer = await _start_session(pool, executor)
+
+        assert await handler._recognize_speech(buffer, 0) == ""
+        await handler.disconnect()
+        # 스레드가 아직 view를 읽는 중이면 재사용되지 않음
+        assert buffer._refs == 1
+        assert buffer not in pool._idle
+
+        assert await _wait_recycled(pool, buffer)
+        assert buffer._refs == 0
+        executor.shutdown()
+
+    asyncio.run(asyncio.wait_for(scenario(), 5))
+
+
+def test_rejected_recognition_returns_buffer():
+    async def scenario():
+        pool = BufferPool(32000)
+        executor = BoundedExecutor("test", 1, 0)
+        gate = threading.Event()
+        blocker = executor.submit(gate.wait, 5)
+
+        handler, buffer = await _start_session(pool, executor)
+        assert await handler._recognize_speech(buffer, 0) == ""
+        await handler.disconnect()
+        gate.set()
+        await blocker
+
+        assert await _wait_recycled(pool, buffer)
+        executor.shutdown()
+
+    asyncio.run(asyncio.wait_for(scenario(), 5))
+
+
+def test_unref_without_retain_raises():
+    buffer = BufferPool(1024).acquire()
+    with pytest.raises(RuntimeError):
+        buffer.unref()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""TTS 합성 결과(PCM) 캐시 - 메모리 LRU + /data 디스크 계층"""
+import hashlib
+import logging
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = "/data/tts_cache"
+MEMORY_CACHE_BYTES = 32 * 1024 * 1024
+DISK_CACHE_BYTES = 256 * 1024 * 1024
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_SUFFIX = ".pcm"
+
+
+def normalize_text(text: str) -> str:
+    """캐시 키용 텍스트 정규화 (유니코드 NFKC, 공백 정리)"""
+    text = unicodedata.normalize("NFKC", text)
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+class TtsCache:
+    """(정규화 텍스트, 언어, 출력 포맷)을 키로 하는 2단 LRU 캐시"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR,
+                 memory_bytes=MEMORY_CACHE_BYTES, disk_bytes=DISK_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # key -> bytes
+        self._memory_size = 0
+        self._disk = OrderedDict()    # key -> size (오래된 것부터)
+        self._disk_size = 0
+        # 고정 항목: LRU 용량 계산과 eviction 대상에서 제외
+        self._pinned = {}             # key -> bytes
+
+        self.hits = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._load_disk_index()
+
+    @staticmethod
+    def make_key(text: str, language: str, audio_format: str) -> str:
+        raw = "\0".join((normalize_text(text), language, audio_format))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + _SUFFIX)
+
+    def _load_disk_index(self):
+        """재시작 후에도 디스크 항목을 쓸 수 있도록 mtime 순으로 인덱스 구성"""
+        if not self.cache_dir or self.disk_bytes <= 0:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            entries = []
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(".tmp"):
+                        # 기록 도중 종료된 임시 파일 정리
+                        os.unlink(entry.path)
+                    elif entry.is_file() and entry.name.endswith(_SUFFIX):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, entry.name[:-len(_SUFFIX)], stat.st_size))
+        except OSError as e:
+            _LOGGER.warning(f"TTS 디스크 캐시 사용 불가 ({self.cache_dir}): {e}")
+            self.cache_dir = None
+            return
+
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_size += size
+        self._evict_disk()
+        _LOGGER.info(f"TTS 디스크 캐시: {len(self._disk)}개, {self._disk_size // 1024} KB")
+
+    def get(self, key, record=True):
+        """캐시 조회 - 고정 항목, 메모리, 디스크 순. 없으면 None"""
+        with self._lock:
+            data = self._pinned.get(key)
+            if data is not None:
+                if record:
+                    self.hits += 1
+                    self.memory_hits += 1
+                return data
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                if record:
+                    self.hits += 1
+                    self.memory_hits += 1
+                return data
+            on_disk = self.cache_dir is not None and key in self._disk
+
+        if on_disk:
+            try:
+                with open(self._path(key), "rb") as f:
+                    data = f.read()
+                os.utime(self._path(key))
+            except OSError:
+                data = None
+            with self._lock:
+                if data is not None:
+                    self._disk.move_to_end(key)
+                    if record:
+                        self.hits += 1
+                        self.disk_hits += 1
+                    self._put_memory(key, data)
+                    return data
+                self._drop_disk(key)
+
+        if record:
+            with self._lock:
+                self.misses += 1
+        return None
+
+    def put(self, key, data: bytes):
+        """메모리 계층에 저장 (디스크 기록은 persist로 별도 수행)"""
+        if not data:
+            return
+        with self._lock:
+            self._put_memory(key, data)
+
+    def pin(self, key, data: bytes):
+        """절대 eviction 되지 않는 고정 항목으로 저장 (사전 워밍용)"""
+        if not data:
+            return
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_size -= len(old)
+            self._pinned[key] = data
+
+    def persist(self, key, data: bytes):
+        """디스크 계층에 원자적으로 기록 (블로킹 - executor에서 호출)"""
+        if not data or self.cache_dir is None or len(data) > self.disk_bytes:
+            return
+        with self._lock:
+            if key in self._disk:
+                return
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            _LOGGER.warning(f"TTS 캐시 기록 실패: {e}")
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            return
+        with self._lock:
+            self._disk[key] = len(data)
+            self._disk_size += len(data)
+            self._evict_disk()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "pinned_entries": len(self._pinned),
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_size,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_size,
+            }
+
+    # --- 내부 함수 (self._lock 보유 상태에서 호출) ---
+
+    def _put_memory(self, key, data):
+        if key in self._pinned or len(data) > self.memory_bytes:
+            return
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_size -= len(old)
+        self._memory[key] = data
+        self._memory_size += len(data)
+        while self._memory_size > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted)
+            self.evictions += 1
+
+    def _drop_disk(self, key):
+        size = self._disk.pop(key, None)
+        if size is not None:
+            self._disk_size -= size
+
+    def _evict_disk(self):
+        if self._disk_size <= self.disk_bytes:
+            return
+        victims = []
+        excess = self._disk_size - self.disk_bytes
+        for key, size in self._disk.items():
+            if excess <= 0:
+                break
+            if key in self._pinned:
+                continue
+            victims.append(key)
+            excess -= size
+        for key in victims:
+            self._drop_disk(key)
+            self.evictions += 1
+            try:
+                os.unlink(self._path(key))
+            except OSError:
+                pass
@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""gTTS MP3 스트림을 ffmpeg로 실시간 PCM 디코딩"""
+import asyncio
+import logging
+import re
+import time
+from collections import deque
+from functools import partial
+from bounded_executor import ExecutorBusy
+import metrics
+
+_LOGGER = logging.getLogger(__name__)
+
+# Wyoming 클라이언트로 보내는 PCM 포맷 (AudioStart/AudioChunk와 일치해야 함)
+TTS_RATE = 22050
+TTS_WIDTH = 2
+TTS_CHANNELS = 1
+# 캐시 키에 들어가는 출력 포맷 식별자
+PCM_FORMAT = f"pcm_s16le_{TTS_RATE}_{TTS_CHANNELS}"
+
+FFMPEG_CMD = [
+    "ffmpeg",
+    "-hide_banner",
+    "-loglevel", "error",
+    "-analyzeduration", "0",
+    "-f", "mp3",
+    "-i", "pipe:0",
+    "-f", "s16le",
+    "-acodec", "pcm_s16le",
+    "-ac", str(TTS_CHANNELS),
+    "-ar", str(TTS_RATE),
+    "pipe:1",
+]
+
+# 동시에 합성/디코딩하는 문장 수 (재생 중인 문장 포함)
+MAX_SEGMENTS_IN_FLIGHT = 3
+# 미리 띄워 둘 ffmpeg 디코더 수 (응답 하나가 처음에 동시에 꺼내는 수)
+DECODER_SPARES = MAX_SEGMENTS_IN_FLIGHT
+# 스레드 풀 대기 중 이 시간이 지나면 합성하지 않음 (초)
+SEGMENT_DEADLINE = 20.0
+
+# 문장 분할 기준
+# - 영문/한국어: . ! ? … 뒤에 공백이 오거나 문장 끝 (3.5 같은 소수점은 분할하지 않음)
+# - 일본어/중국어 전각 구두점: 。！？ 는 공백 없이도 분할
+# - 줄바꿈
+_SENTENCE_RE = re.compile(r'.+?(?:[.!?…]+(?=\s|$)|[。！？]+|\n+|$)', re.DOTALL)
+# 너무 긴 문장은 쉼표/쉼표류에서 한 번 더 분할
+_CLAUSE_RE = re.compile(r'.+?(?:[,，、;；:：]+(?=\s)|[、，；]+|$)', re.DOTALL)
+MIN_SEGMENT_CHARS = 8
+MAX_SEGMENT_CHARS = 100
+
+_END = object()
+
+DECODER_STARTS = metrics.counter(
+    "sr_tts_decoder_starts_total", "문장 디코딩에 쓴 ffmpeg 프로세스 (미리 띄움/요청 경로)", ("source",))
+
+# 결과를 기다리지 않는 디스크 캐시 저장 (완료 시 오류를 로그로 남기려고 참조 유지)
+_persist_futures = set()
+
+
+def _stripped_span(text: str, start: int, end: int):
+    """text[start:end]에서 앞뒤 공백을 뺀 구간"""
+    piece = text[start:end]
+    lead = len(piece) - len(piece.lstrip())
+    return start + lead, start + len(piece.rstrip())
+
+
+def split_sentences(text: str) -> list:
+    """TTS 파이프라인용 문장/절 단위 분할 (한국어, 일본어, 중국어 구두점 포함)"""
+    # 원문에서의 (시작, 끝) 구간 - 합칠 때 원래 구분 문자를 그대로 쓰기 위함
+    spans = []
+    for match in _SENTENCE_RE.finditer(text):
+        start, end = _stripped_span(text, *match.span())
+        if start >= end:
+            continue
+        if end - start <= MAX_SEGMENT_CHARS:
+            spans.append((start, end))
+            continue
+        for clause in _CLAUSE_RE.finditer(text, start, end):
+            clause_start, clause_end = _stripped_span(text, *clause.span())
+            if clause_start < clause_end:
+                spans.append((clause_start, clause_end))
+
+    # 짧은 조각("네.", "はい。")은 다음 조각과 합쳐 불필요한 요청을 줄임
+    # (원문 구간을 이어 붙이므로 "はい。そうです"에 없던 공백이 생기지 않음)
+    merged = []
+    carry = None
+    for start, end in spans:
+        if carry is not None:
+            start = carry
+        if end - start < MIN_SEGMENT_CHARS:
+            carry = start
+            continue
+        merged.append((start, end))
+        carry = None
+    if carry is not None:
+        if merged:
+            merged[-1] = (merged[-1][0], spans[-1][1])
+        else:
+            merged.append((carry, spans[-1][1]))
+    return [text[start:end] for start, end in merged]
+
+
+def _produce_mp3(text, language, loop, queue):
+    """gTTS 응답 조각을 받는 즉시 이벤트 루프 큐로 전달 (동기, 스레드에서 실행)"""
+    try:
+        # gTTS(requests 포함)는 첫 합성 때 이 스레드에서 import
+        from gtts import gTTS
+        tts = gTTS(text=text, lang=language, slow=False)
+        for part in tts.stream():
+            loop.call_soon_threadsafe(queue.put_nowait, part)
+    except Exception as e:
+        loop.call_soon_threadsafe(queue.put_nowait, e)
+    finally:
+        loop.call_soon_threadsafe(queue.put_nowait, _END)
+
+
+def _on_producer_done(queue, future):
+    """스레드 풀에서 실행되지 못한 경우(마감 초과/취소)에도 디코더가 끝나도록 함"""
+    if future.cancelled():
+        queue.put_nowait(_END)
+        return
+    error = future.exception()
+    if error is not None:
+        queue.put_nowait(error)
+        queue.put_nowait(_END)
+
+
+async def _feed_decoder(queue, stdin):
+    """MP3 조각을 ffmpeg stdin으로 흘려보내고, 끝나면 stdin을 닫음"""
+    error = None
+    try:
+        while True:
+            part = await queue.get()
+            if part is _END:
+                break
+            if isinstance(part, Exception):
+                error = part
+                continue
+            stdin.write(part)
+            await stdin.drain()
+    finally:
+        try:
+            stdin.close()
+        except Exception:
+            pass
+    if error is not None:
+        raise error
+
+
+async def _spawn_decoder():
+    return await asyncio.create_subprocess_exec(
+        *FFMPEG_CMD,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+
+
+async def _kill(proc):
+    if proc.returncode is None:
+        try:
+            proc.kill()
+        except ProcessLookupError:
+            pass
+    await proc.wait()
+
+
+class DecoderPool:
+    """미리 띄워 둔 ffmpeg 디코더 프로세스 (모든 연결 공유)
+
+    ffmpeg는 stdin이 닫혀야 마지막 PCM을 내보내므로 프로세스 하나는 문장 하나만 디코딩합니다.
+    여러 문장을 한 프로세스에 이어 넣으면 문장별 PCM 경계를 알 수 없어 문장 단위 캐시를
+    쓸 수 없기 때문입니다. 대신 다 쓴 프로세스를 돌려받을 때 다음 프로세스를 띄워 두어
+    fork/exec(이벤트 루프에서 실행됨)와 ffmpeg 초기화가 첫 오디오 지연에 들어가지 않게 합니다.
+    (측정: benchmarks/bench_tts_emit.py --decoder)
+    """
+
+    def __init__(self, spares: int = DECODER_SPARES):
+        self.spares = spares
+        self._idle = deque()
+        self._starting = set()
+        self._closed = False
+        # 통계
+        self.hits = 0       # 미리 띄운 프로세스 사용
+        self.misses = 0     # 남은 프로세스가 없어 요청 경로에서 띄움
+
+    def fill(self):
+        """부족한 만큼 백그라운드에서 디코더 시작 (이벤트 루프 안에서 호출)"""
+        while not self._closed and len(self._idle) + len(self._starting) < self.spares:
+            task = asyncio.create_task(self._start_spare())
+            self._starting.add(task)
+            task.add_done_callback(self._starting.discard)
+
+    async def _start_spare(self):
+        try:
+            proc = await _spawn_decoder()
+        except Exception as e:
+            _LOGGER.warning(f"ffmpeg 디코더 미리 띄우기 실패: {e}")
+            return
+        if self._closed:
+            await _kill(proc)
+        else:
+            self._idle.append(proc)
+
+    async def acquire(self):
+        """디코딩에 쓸 프로세스 (다 쓰면 release()로 돌려줌)"""
+        proc = None
+        while self._idle:
+            proc = self._idle.popleft()
+            if proc.returncode is None:
+                break
+            proc = None
+        if proc is None:
+            self.misses += 1
+            DECODER_STARTS.labels("request").inc()
+            proc = await _spawn_decoder()
+        else:
+            self.hits += 1
+            DECODER_STARTS.labels("spare").inc()
+        return proc
+
+    async def release(self, proc):
+        """다 쓴 프로세스를 종료하고 빈 자리를 다시 채움"""
+        await _kill(proc)
+        self.fill()
+
+    def stats(self) -> dict:
+        return {"idle": len(self._idle), "hits": self.hits, "misses": self.misses}
+
+    async def close(self):
+        self._closed = True
+        # 시작 중인 프로세스는 취소하지 않고 기다림 (_start_spare가 종료시킴)
+        await asyncio.gather(*self._starting, return_exceptions=True)
+        while self._idle:
+            await _kill(self._idle.popleft())
+
+
+async def stream_pcm(text: str, language: str, read_size: int = 4096,
+                     executor=None, timeout: float = SEGMENT_DEADLINE, decoders=None):
+    """텍스트를 합성하여 디코딩된 PCM 프레임을 도착하는 대로 yield
+
+    executor(BoundedExecutor)가 가득 차 있으면 ffmpeg를 띄우기 전에 ExecutorBusy 발생
+    decoders(DecoderPool)가 있으면 미리 띄워 둔 ffmpeg를 사용
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+
+    if executor is not None:
+        producer = executor.submit(
+            _produce_mp3, text, language, loop, queue,
+            deadline=time.monotonic() + timeout
+        )
+    else:
+        producer = loop.run_in_executor(None, _produce_mp3, text, language, loop, queue)
+    producer.add_done_callback(partial(_on_producer_done, queue))
+
+    proc = await (decoders.acquire() if decoders is not None else _spawn_decoder())
+
+    feeder = asyncio.create_task(_feed_decoder(queue, proc.stdin))
+
+    frame_bytes = TTS_WIDTH * TTS_CHANNELS
+    remainder = b""
+    try:
+        while True:
+            data = await proc.stdout.read(read_size)
+            if not data:
+                break
+
+            data = remainder + data
+            usable = len(data) - (len(data) % frame_bytes)
+            remainder = data[usable:]
+            if usable:
+                yield data[:usable]
+
+        # gTTS 오류가 있으면 여기서 전파
+        await feeder
+        returncode = await proc.wait()
+        if returncode != 0:
+            raise RuntimeError(f"ffmpeg 디코딩 실패 (code={returncode})")
+    finally:
+        if not feeder.done():
+            feeder.cancel()
+        await (decoders.release(proc) if decoders is not None else _kill(proc))
+
+
+async def _cache_get(cache, key, io_executor=None, record=True):
+    """캐시 조회 (디스크 읽기는 io_executor에서, 대기열이 가득 차면 캐시 미스로 처리)"""
+    if io_executor is None:
+        return cache.get(key, record=record)
+    try:
+        return await io_executor.run(partial(cache.get, key, record=record))
+    except ExecutorBusy:
+        _LOGGER.debug("TTS 캐시 I/O 대기열 가득 참 - 캐시 조회 생략")
+        return None
+
+
+def _persist(cache, key, data: bytes, io_executor=None):
+    """디스크 캐시 저장 (기다리지 않음, 실패는 완료 시 로그)"""
+    if io_executor is None:
+        cache.persist(key, data)
+        return
+    try:
+        future = io_executor.submit(cache.persist, key, data)
+    except ExecutorBusy:
+        _LOGGER.warning("TTS 캐시 I/O 대기열 가득 참 - 디스크 저장 생략")
+        return
+    _persist_futures.add(future)
+    future.add_done_callback(_on_persisted)
+
+
+def _on_persisted(future):
+    _persist_futures.discard(future)
+    if not future.cancelled() and future.exception() is not None:
+        _LOGGER.error(f"TTS 캐시 디스크 저장 실패: {future.exception()}")
+
+
+async def _produce_segment(text, language, queue, semaphore, cache=None, executor=None, io_executor=None,
+                           decoders=None):
+    """한 문장을 합성하여 PCM을 문장별 큐에 적재 (캐시 적중 시 네트워크 호출 없음)"""
+    try:
+        key = None
+        if cache is not None:
+            key = cache.make_key(text, language, PCM_FORMAT)
+            cached = await _cache_get(cache, key, io_executor)
+            if cached:
+                queue.put_nowait(cached)
+                return
+
+        chunks = []
+        async with semaphore:
+            async for pcm in stream_pcm(text, language, executor=executor, decoders=decoders):
+                queue.put_nowait(pcm)
+                chunks.append(pcm)
+
+        if key is not None and chunks:
+            data = b"".join(chunks)
+            cache.put(key, data)
+            _persist(cache, key, data, io_executor)
+    except asyncio.CancelledError:
+        raise
+    except ExecutorBusy as e:
+        # 과부하는 건너뛰지 않고 호출 측에 알려 대체 응답을 고르게 함
+        queue.put_nowait(e)
+    except Exception as e:
+        _LOGGER.error(f"문장 합성 오류 ({text[:20]}...): {e}")
+    finally:
+        queue.put_nowait(_END)
+
+
+async def stream_segments(text: str, language: str, cache=None, executor=None,
+                          max_in_flight: int = MAX_SEGMENTS_IN_FLIGHT, io_executor=None, decoders=None):
+    """문장 단위로 병렬 합성하고, PCM은 원래 순서대로 yield
+
+    합성 스레드 풀이 가득 차면 해당 위치에서 ExecutorBusy 발생
+    io_executor: 캐시 디스크 읽기/쓰기용 BoundedExecutor (None이면 호출 위치에서 바로 실행)
+    decoders: DecoderPool (None이면 문장마다 ffmpeg를 새로 띄움)
+    """
+    segments = split_sentences(text) or [text]
+    _LOGGER.debug(f"TTS 문장 분할: {len(segments)}개")
+
+    semaphore = asyncio.Semaphore(max(1, max_in_flight))
+    queues = [asyncio.Queue() for _ in segments]
+    # Semaphore는 FIFO이므로 앞 문장이 항상 먼저 슬롯을 얻음
+    tasks = [
+        asyncio.create_task(
+            _produce_segment(segment, language, queue, semaphore, cache, executor, io_executor, decoders)
+        )
+        for segment, queue in zip(segments, queues)
+    ]
+
+    try:
+        for queue in queues:
+            while True:
+                pcm = await queue.get()
+                if pcm is _END:
+                    break
+                if isinstance(pcm, ExecutorBusy):
+                    raise pcm
+                yield pcm
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def prewarm(cache, phrases_by_language: dict, executor=None, io_executor=None, decoders=None):
+    """시작 시 자주 쓰는 문구를 미리 합성하여 캐시에 고정 (백그라운드 실행용)"""
+    warmed = 0
+    for language, phrases in phrases_by_language.items():
+        for phrase in phrases:
+            # 재생 시와 동일한 문장 단위 키로 고정해야 적중함
+            for segment in split_sentences(phrase):
+                key = cache.make_key(segment, language, PCM_FORMAT)
+                try:
+                    data = await _cache_get(cache, key, io_executor, record=False)
+                    if not data:
+                        data = b"".join([
+                            pcm async for pcm in stream_pcm(
+                                segment, language, executor=executor, decoders=decoders
+                            )
+                        ])
+                        _persist(cache, key, data, io_executor)
+                    cache.pin(key, data)
+                    warmed += 1
+                except Exception as e:
+                    _LOGGER.warning(f"TTS 사전 워밍 실패 ({language}: {segment[:20]}): {e}")
+    _LOGGER.info(f"TTS 사전 워밍 완료: {warmed}개 문장 고정")
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""TTS 오디오 전송 - 형식에서 계산한 청크 크기, 여러 AudioChunk를 한 번에 쓰기, 재생 속도 맞춤
+
+AudioChunk마다 write_event(JSON 직렬화 + drain)를 기다리는 대신 청크 크기별로 한 번 만든
+헤더를 재사용해 직렬화된 이벤트를 모으고, 일정 오디오 길이마다 transport에 한 번 씁니다.
+받는 쪽에 쌓인 오디오가 한 묶음보다 적으면 바로 보내므로 재생이 끊기지 않고,
+pace_lead_ms > 0이면 재생 시각보다 그만큼만 앞서 보내 위성 장치 버퍼가 넘치지 않게 합니다.
+"""
+import asyncio
+import json
+import time
+
+from wyoming.audio import AudioChunk, AudioStop
+from wyoming.event import async_write_event
+from wyoming.version import __version__ as WYOMING_VERSION
+
+# AudioChunk 하나의 오디오 길이 (ms, 기존 1024 bytes = 22.05kHz 16bit mono에서 약 23ms)
+DEFAULT_CHUNK_MS = 100
+# transport 쓰기 한 번에 모을 오디오 길이 (ms)
+WRITE_BATCH_MS = 300
+# 재생 시각보다 앞서 보낼 수 있는 최대 오디오 길이 (ms, 0이면 속도 제한 없음)
+DEFAULT_PACE_LEAD_MS = 0
+
+
+def chunk_bytes(rate: int, width: int, channels: int, chunk_ms: int) -> int:
+    """chunk_ms 길이의 오디오 바이트 수 (프레임 경계에 맞춤)"""
+    frames = max(1, rate * chunk_ms // 1000)
+    return frames * width * channels
+
+
+class AudioStreamWriter:
+    """AudioStart 이후의 PCM을 AudioChunk로 묶어 전송하고 finish()에서 AudioStop"""
+
+    def __init__(self, writer: asyncio.StreamWriter, rate: int, width: int, channels: int,
+                 chunk_ms: int = DEFAULT_CHUNK_MS, batch_ms: int = WRITE_BATCH_MS,
+                 pace_lead_ms: int = DEFAULT_PACE_LEAD_MS):
+        self.writer = writer
+        self.bytes_per_second = rate * width * channels
+        self.chunk_bytes = chunk_bytes(rate, width, channels, chunk_ms)
+        self.batch_bytes = max(self.chunk_bytes, self.bytes_per_second * batch_ms // 1000)
+        self.pace_lead = pace_lead_ms / 1000
+        # 모든 청크가 같은 형식이므로 data 부분은 한 번만 직렬화
+        self._data = json.dumps(
+            AudioChunk(rate=rate, width=width, channels=channels, audio=b"").event().data,
+            ensure_ascii=False,
+        ).encode("utf-8")
+        self._headers = {}           # payload 길이 → 헤더 줄 + data
+        self._pending = bytearray()  # 청크 하나에 못 미친 PCM
+        self._out = bytearray()      # 아직 쓰지 않은 직렬화된 이벤트
+        self._out_audio = 0
+        self._started = None
+        # 통계 (요청 하나 기준)
+        self.audio_bytes = 0
+        self.chunks = 0
+        self.writes = 0
+
+    def _header(self, size: int) -> bytes:
+        header = self._headers.get(size)
+        if header is None:
+            line = json.dumps({
+                "type": "audio-chunk",
+                "version": WYOMING_VERSION,
+                "data_length": len(self._data),
+                "payload_length": size,
+            })
+            header = self._headers[size] = line.encode("utf-8") + b"\n" + self._data
+        return header
+
+    def _append_chunk(self, pcm):
+        self._out += self._header(len(pcm))
+        self._out += pcm
+        self._out_audio += len(pcm)
+        self.chunks += 1
+
+    def _buffered_seconds(self) -> float:
+        """받는 쪽에 아직 재생되지 않고 쌓여 있을 오디오 길이 (추정)"""
+        if self._started is None:
+            return 0.0
+        return self.audio_bytes / self.bytes_per_second - (time.monotonic() - self._started)
+
+    async def write(self, pcm: bytes):
+        self._pending += pcm
+        size = self.chunk_bytes
+        full = len(self._pending) - len(self._pending) % size
+        with memoryview(self._pending) as view:
+            for i in range(0, full, size):
+                self._append_chunk(view[i:i + size])
+        del self._pending[:full]
+
+        # 한 묶음이 찼거나, 받는 쪽 버퍼가 한 묶음보다 적게 남았으면 바로 전송
+        if self._out_audio >= self.batch_bytes or (
+            self._out and self._buffered_seconds() * self.bytes_per_second < self.batch_bytes
+        ):
+            await self.flush()
+
+    async def flush(self):
+        """모은 이벤트를 transport에 한 번에 쓰고 drain (pace_lead 초과분은 대기)"""
+        if not self._out:
+            return
+        if self._started is None:
+            self._started = time.monotonic()
+        self.writer.write(bytes(self._out))
+        self.writes += 1
+        self.audio_bytes += self._out_audio
+        self._out.clear()
+        self._out_audio = 0
+        await self.writer.drain()
+
+        if self.pace_lead > 0:
+            ahead = self._buffered_seconds() - self.pace_lead
+            if ahead > 0:
+                await asyncio.sleep(ahead)
+
+    async def finish(self):
+        """남은 PCM을 마지막 청크로 보내고 AudioStop"""
+        if self._pending:
+            self._append_chunk(bytes(self._pending))
+            self._pending.clear()
+        await self.flush()
+        await async_write_event(AudioStop().event(), self.writer)
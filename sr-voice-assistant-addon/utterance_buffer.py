@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""STT 세션용 고정 크기 발화 버퍼와 재사용 풀"""
+import threading
+
+# Wyoming 위성에서 받는 오디오 포맷 (16kHz, 16bit, mono)
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+
+# 기본 최대 발화 길이 (16kHz, 16bit mono 기준 초)
+MAX_UTTERANCE_SECONDS = 30
+# 풀에 보관할 유휴 버퍼 수 (그 이상은 GC에 맡김)
+MAX_IDLE_BUFFERS = 4
+
+
+class UtteranceBuffer:
+    """미리 할당된 bytearray에 오디오를 이어 쓰고, 복사 없이 memoryview로 제공
+
+    인식 스레드가 view를 읽는 동안에는 retain/unref로 참조를 잡아 두어
+    세션이 끝나도 다른 세션에 재사용되지 않도록 합니다. retain()마다 unref()가 정확히
+    한 번 호출돼야 하며 (BoundedExecutor.run의 on_done), 그래야 버퍼가 풀로 돌아갑니다.
+    """
+
+    def __init__(self, max_bytes: int, pool=None):
+        self._data = bytearray(max_bytes)
+        self._pool = pool
+        self._refs = 0
+        self._owned = True
+        self.length = 0
+
+    def __len__(self):
+        return self.length
+
+    @property
+    def capacity(self) -> int:
+        return len(self._data)
+
+    @property
+    def full(self) -> bool:
+        return self.length >= len(self._data)
+
+    def append(self, audio) -> bool:
+        """오디오 추가. 용량을 넘는 부분은 버리고 False 반환"""
+        size = len(audio)
+        room = len(self._data) - self.length
+        if size > room:
+            self._data[self.length:] = memoryview(audio)[:room]
+            self.length = len(self._data)
+            return False
+        self._data[self.length:self.length + size] = audio
+        self.length += size
+        return True
+
+    def view(self) -> memoryview:
+        return memoryview(self._data)[:self.length]
+
+    def retain(self) -> memoryview:
+        """다른 스레드에서 읽을 view를 참조 카운트와 함께 반환 (읽은 뒤 unref 호출)"""
+        with self._lock():
+            self._refs += 1
+        return self.view()
+
+    def unref(self):
+        with self._lock():
+            if self._refs <= 0:
+                raise RuntimeError("retain() 없이 unref() 호출")
+            self._refs -= 1
+            self._maybe_recycle()
+
+    def release(self):
+        """세션 종료 - 참조가 모두 끝나면 풀로 반환"""
+        with self._lock():
+            self._owned = False
+            self._maybe_recycle()
+
+    def _lock(self):
+        return self._pool.lock if self._pool is not None else _NO_POOL_LOCK
+
+    def _maybe_recycle(self):
+        if not self._owned and self._refs == 0 and self._pool is not None:
+            self._pool.recycle(self)
+
+
+_NO_POOL_LOCK = threading.Lock()
+
+
+class BufferPool:
+    """세션 간 UtteranceBuffer 재사용 - 위성이 많아도 메모리 사용량을 일정하게 유지"""
+
+    def __init__(self, max_bytes: int, max_idle: int = MAX_IDLE_BUFFERS):
+        self.max_bytes = max_bytes
+        self.max_idle = max_idle
+        self.lock = threading.Lock()
+        self._idle = []
+
+    def acquire(self) -> UtteranceBuffer:
+        with self.lock:
+            buffer = self._idle.pop() if self._idle else None
+        if buffer is None:
+            buffer = UtteranceBuffer(self.max_bytes, pool=self)
+        buffer._owned = True
+        buffer.length = 0
+        return buffer
+
+    def recycle(self, buffer: UtteranceBuffer):
+        # self.lock 보유 상태에서 호출됨
+        if len(self._idle) < self.max_idle and buffer not in self._idle:
+            self._idle.append(buffer)
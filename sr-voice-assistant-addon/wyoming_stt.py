@@ -1,27 +1,82 @@
 #!/usr/bin/env python3
 """Wyoming Protocol wrapper for Google STT"""
+from startup import StartupTimer, preload, wait_for_stop_signal
 import asyncio
 import logging
-import speech_recognition as sr
+import time
 from functools import partial
 from wyoming.audio import AudioChunk, AudioStart, AudioStop
 from wyoming.event import Event
 from wyoming.info import Describe, Info, Attribution, AsrProgram, AsrModel
 from wyoming.server import AsyncEventHandler, AsyncServer
 from wyoming.asr import Transcribe, Transcript
+from utterance_buffer import SAMPLE_RATE, SAMPLE_WIDTH, MAX_UTTERANCE_SECONDS, BufferPool
+from bounded_executor import BoundedExecutor, DeadlineExceeded, ExecutorBusy
+from addon_options import load_options
+from chat_feed import ChatFeedPublisher
+import metrics
 
 _LOGGER = logging.getLogger(__name__)
 
+HOST = "0.0.0.0"
+PORT = 10300
+LANGUAGE = "ko-KR"
+
+# 인식 전용 스레드 풀 기본값
+STT_MAX_WORKERS = 4
+STT_MAX_QUEUE = 8
+# 대기 + Google 요청을 포함한 요청당 마감 시간 (초)
+STT_DEADLINE = 15.0
+# 수신 시작 후 백그라운드에서 미리 불러올 모듈 (NumPy VAD, SpeechRecognition, libsndfile)
+PRELOAD_MODULES = ["stt_vad", "flac_encoder"]
+
+
+# 단계별 지표 (/metrics)
+AUDIO_RECEIVE_SECONDS = metrics.histogram(
+    "sr_stt_audio_receive_seconds", "AudioStart부터 수신 종료까지 시간")
+UTTERANCE_BYTES = metrics.histogram(
+    "sr_stt_utterance_bytes", "발화당 수신 오디오 바이트", buckets=metrics.BYTES_BUCKETS)
+RECOGNITION_SECONDS = metrics.histogram(
+    "sr_stt_recognition_seconds", "수신 종료부터 인식 결과까지 시간 (speculative: 추측 인식 사용)",
+    ("mode",))
+STAGE_SECONDS = metrics.histogram(
+    "sr_stt_stage_seconds", "인식 스레드 단계별 시간 (trim: 무음 제거, encode: FLAC, google: Google 요청)",
+    ("stage",))
+RECOGNITIONS = metrics.counter(
+    "sr_stt_recognitions_total", "인식 요청 결과별 수", ("result",))
+
+
+def _vad():
+    """stt_vad 모듈 - NumPy를 불러오므로 처음 쓸 때 import"""
+    import stt_vad
+    return stt_vad
+
 
 class GoogleSttEventHandler(AsyncEventHandler):
     """Wyoming event handler for Google STT"""
 
-    def __init__(self, *args, language="ko-KR", **kwargs):
+    def __init__(self, *args, language="ko-KR", trim_silence=True, max_pause_ms=0,
+                 endpoint_ms=0, buffer_pool=None, executor=None, chat_feed=None, **kwargs):
         super().__init__(*args, **kwargs)
         self.language = language
-        self.recognizer = sr.Recognizer()
-        self.audio_buffer = bytearray()
+        self.trim_silence = trim_silence
+        self.max_pause_ms = max_pause_ms
+        # 첫 인식 시 생성 (SpeechRecognition은 인식 스레드에서 import)
+        self.recognizer = None
+        # 발화 버퍼는 AudioStart에서 풀에서 빌려오고 인식이 끝나면 반환
+        self.buffer_pool = buffer_pool or BufferPool(
+            SAMPLE_RATE * SAMPLE_WIDTH * MAX_UTTERANCE_SECONDS
+        )
+        self.audio_buffer = None
         self.is_receiving = False
+        self.executor = executor or BoundedExecutor("stt", STT_MAX_WORKERS, STT_MAX_QUEUE)
+        # endpoint_ms > 0: 끝점 검출 시 AudioStop 전에 추측 인식 시작 (검출기는 첫 발화에서 생성)
+        self.endpoint_ms = endpoint_ms
+        self.endpoint_detector = None
+        self._speculative_task = None
+        self._audio_started = 0.0
+        # 인식 결과를 Chat UI로 바로 전달 (None이면 사용 안 함)
+        self.chat_feed = chat_feed
 
     async def handle_event(self, event: Event) -> bool:
         if Describe.is_type(event.type):
@@ -60,7 +115,14 @@ class GoogleSttEventHandler(AsyncEventHandler):
         if AudioStart.is_type(event.type):
 
             self.is_receiving = True
-            self.audio_buffer = bytearray()
+            self._audio_started = time.monotonic()
+            self._cancel_speculative()
+            self._release_buffer()
+            self.audio_buffer = self.buffer_pool.acquire()
+            if self.endpoint_ms > 0:
+                if self.endpoint_detector is None:
+                    self.endpoint_detector = _vad().EndpointDetector(self.endpoint_ms)
+                self.endpoint_detector.reset()
             _LOGGER.debug("오디오 수신 시작")
             return True
 
@@ -68,22 +130,23 @@ class GoogleSttEventHandler(AsyncEventHandler):
 
             if self.is_receiving:
                 chunk = AudioChunk.from_event(event)
-                self.audio_buffer.extend(chunk.audio)
+                if not self.audio_buffer.append(chunk.audio):
+                    # 최대 발화 길이 초과 - 버퍼를 늘리지 않고 여기서 확정
+                    _LOGGER.warning(
+                        f"최대 발화 길이 초과 ({self.audio_buffer.capacity} bytes) - 강제 인식"
+                    )
+                    await self._finalize()
+                    return True
+                if self.endpoint_detector is not None:
+                    self._check_endpoint(chunk.audio)
             return True
 
         if AudioStop.is_type(event.type):
 
-            self.is_receiving = False
-            _LOGGER.debug(f"오디오 수신 완료: {len(self.audio_buffer)} bytes")
-            
-            # 음성 인식 실행
-            text = await self._recognize_speech()
-            
-            # 결과 전송
-            await self.write_event(
-                Transcript(text=text).event()
-            )
-            _LOGGER.info(f"인식 결과: {text}")
+            if self.audio_buffer is None:
+                # 이미 강제 확정된 발화
+                return True
+            await self._finalize()
             return True
 
         if Transcribe.is_type(event.type):
@@ -93,33 +156,183 @@ class GoogleSttEventHandler(AsyncEventHandler):
 
         return True
 
-    async def _recognize_speech(self) -> str:
-        """음성 인식 (블로킹 작업을 비동기로)"""
-        loop = asyncio.get_event_loop()
+    async def _finalize(self):
+        """수신 종료 - 인식 결과를 전송하고 버퍼 반환"""
+        self.is_receiving = False
+        _LOGGER.debug(f"오디오 수신 완료: {len(self.audio_buffer)} bytes")
+        stopped = time.monotonic()
+        AUDIO_RECEIVE_SECONDS.observe(stopped - self._audio_started)
+        UTTERANCE_BYTES.observe(len(self.audio_buffer))
+        
+        # 음성 인식 실행 - 끝점 이후 발화가 없었다면 추측 인식 결과를 확정
+        if self._speculative_task is not None:
+            _LOGGER.debug("추측 인식 결과 사용")
+            text = await self._speculative_task
+            self._speculative_task = None
+            mode = "speculative"
+        else:
+            text = await self._recognize_speech(self.audio_buffer, len(self.audio_buffer))
+            mode = "final"
+        RECOGNITION_SECONDS.labels(mode).observe(time.monotonic() - stopped)
+        self._release_buffer()
         
+        # 결과 전송
+        await self.write_event(
+            Transcript(text=text).event()
+        )
+        _LOGGER.info(f"인식 결과: {text}")
+        if self.chat_feed is not None:
+            self.chat_feed.publish("user", text)
+
+    def _release_buffer(self):
+        if self.audio_buffer is not None:
+            self.audio_buffer.release()
+            self.audio_buffer = None
+
+    def _check_endpoint(self, audio):
+        """끝점이면 현재까지의 오디오로 추측 인식 시작, 발화가 재개되면 취소"""
+        vad = _vad()
+        state = self.endpoint_detector.process(audio)
+        if state == vad.RESUMED:
+            _LOGGER.debug("발화 재개 - 추측 인식 취소")
+            self._cancel_speculative()
+        elif state == vad.ENDPOINT:
+            self._cancel_speculative()
+            _LOGGER.debug(f"끝점 검출 - 추측 인식 시작 ({len(self.audio_buffer)} bytes)")
+            # 지금까지의 길이로 view를 고정 (이후 청크는 뒤에만 추가되므로 복사 불필요)
+            self._speculative_task = asyncio.create_task(
+                self._recognize_speech(self.audio_buffer, len(self.audio_buffer))
+            )
+
+    def _cancel_speculative(self):
+        # 실행 중인 스레드는 멈출 수 없으므로 결과만 버림
+        if self._speculative_task is not None:
+            self._speculative_task.cancel()
+            self._speculative_task = None
+
+    async def disconnect(self) -> None:
+        self._cancel_speculative()
+        self._release_buffer()
+
+    async def _recognize_speech(self, buffer, length: int) -> str:
+        """음성 인식 (전용 스레드 풀에서 마감 시간 내 실행)
+
+        버퍼 참조는 이벤트 루프에서 잡고, 스레드 작업이 끝나거나 시작 전에 취소될 때 해제합니다
+        (인식 스레드는 view만 읽음). 태스크가 시작 전에 취소되면 참조를 잡지 않습니다.
+        """
+        audio = buffer.retain()[:length]
         try:
 
-            audio_data = sr.AudioData(bytes(self.audio_buffer), 16000, 2)
-            text = await loop.run_in_executor(
-                None,
-                partial(
-                    self.recognizer.recognize_google,
-                    audio_data,
-                    language=self.language
-                )
+            text = await self.executor.run(
+                self._recognize_google, audio,
+                timeout=STT_DEADLINE, on_done=buffer.unref
             )
 
+            return text
+        except ExecutorBusy:
+            RECOGNITIONS.labels("busy").inc()
+            _LOGGER.warning(f"인식 대기열 가득 참 - 요청 거절: {self.executor.stats()}")
+            return ""
+        except (asyncio.TimeoutError, DeadlineExceeded):
+            RECOGNITIONS.labels("timeout").inc()
+            _LOGGER.warning(f"인식 마감 시간 초과 ({STT_DEADLINE}초): {self.executor.stats()}")
+            return ""
+        except Exception as e:
+            RECOGNITIONS.labels("error").inc()
+            _LOGGER.error(f"인식 오류: {e}")
+            return ""
+        finally:
+            _LOGGER.debug(f"인식 스레드 풀 상태: {self.executor.stats()}")
+
+    def _recognize_google(self, audio: memoryview) -> str:
+        """무음 제거 후 Google 인식 요청 (동기, 인식 스레드)"""
+        # SpeechRecognition/FLAC 인코더는 첫 인식 때 이 스레드에서 import (이미 불러왔으면 바로 반환)
+        import speech_recognition as sr
+        from flac_encoder import make_audio_data
+
+        started = time.monotonic()
+        if self.trim_silence:
+            trimmed = _vad().trim_silence(audio, max_pause_ms=self.max_pause_ms)
+            _LOGGER.debug(f"무음 제거: {len(audio)} -> {len(trimmed)} bytes")
+            audio = trimmed
+            now = time.monotonic()
+            STAGE_SECONDS.labels("trim").observe(now - started)
+            started = now
+
+        if self.recognizer is None:
+            self.recognizer = sr.Recognizer()
+        audio_data = make_audio_data(audio, SAMPLE_RATE, SAMPLE_WIDTH)
+        now = time.monotonic()
+        STAGE_SECONDS.labels("encode").observe(now - started)
+        started = now
+        try:
+            text = self.recognizer.recognize_google(audio_data, language=self.language)
+            RECOGNITIONS.labels("ok").inc()
             return text
         except sr.UnknownValueError:
+            RECOGNITIONS.labels("no_speech").inc()
             _LOGGER.warning("음성을 인식할 수 없습니다")
             return ""
         except sr.RequestError as e:
+            RECOGNITIONS.labels("google_error").inc()
             _LOGGER.error(f"Google 서비스 에러: {e}")
             return ""
-        except Exception as e:
-            _LOGGER.error(f"인식 오류: {e}")
-            return ""
+        finally:
+            STAGE_SECONDS.labels("google").observe(time.monotonic() - started)
+
+
+
+def create_handler_factory(options: dict, chat_feed=None):
+    """옵션으로 모든 연결이 공유하는 자원을 만들고
+    (핸들러 팩토리, 인식 스레드 풀, 워밍업 시작 함수, 정리 함수) 반환
+
+    워밍업(무거운 모듈 import)은 서버가 수신을 시작한 뒤 호출합니다.
+    chat_feed: 인식 결과를 Chat UI로 보낼 publish(role, message) 객체 (None이면 사용 안 함)
+    """
+    trim = bool(options.get("stt_trim_silence", True))
+    max_pause_ms = int(options.get("stt_max_pause_ms", 0))
+    endpoint_ms = int(options.get("stt_speculative_endpoint_ms", 600))
+    max_seconds = int(options.get("stt_max_utterance_seconds", MAX_UTTERANCE_SECONDS))
+    max_workers = int(options.get("stt_max_workers", STT_MAX_WORKERS))
+    max_queue = int(options.get("stt_max_queue", STT_MAX_QUEUE))
 
+    _LOGGER.info("=" * 50)
+    _LOGGER.info("Google STT Wyoming 서버 시작")
+    _LOGGER.info(f"주소: {HOST}:{PORT}")
+    _LOGGER.info(f"언어: {LANGUAGE}")
+    _LOGGER.info(f"무음 제거: {trim} (최대 쉼: {max_pause_ms or '-'} ms)")
+    _LOGGER.info(f"추측 인식 끝점: {endpoint_ms or '사용 안 함'} ms")
+    _LOGGER.info(f"최대 발화 길이: {max_seconds}초")
+    _LOGGER.info(f"인식 스레드: {max_workers}개 (대기열 {max_queue})")
+    _LOGGER.info(f"Chat UI 직접 전달: {chat_feed is not None}")
+    _LOGGER.info("=" * 50)
+
+    # 모든 연결이 공유하는 발화 버퍼 풀
+    buffer_pool = BufferPool(SAMPLE_RATE * SAMPLE_WIDTH * max_seconds)
+    # 모든 연결이 공유하는 인식 전용 스레드 풀
+    executor = BoundedExecutor("stt", max_workers, max_queue)
+
+    factory = partial(
+        GoogleSttEventHandler,
+        language=LANGUAGE,
+        trim_silence=trim,
+        max_pause_ms=max_pause_ms,
+        endpoint_ms=endpoint_ms,
+        buffer_pool=buffer_pool,
+        executor=executor,
+        chat_feed=chat_feed
+    )
+    warmup_tasks = []
+
+    def warmup():
+        warmup_tasks.append(asyncio.create_task(asyncio.to_thread(preload, PRELOAD_MODULES)))
+
+    async def close():
+        for task in warmup_tasks:
+            task.cancel()
+        executor.shutdown()
+
+    return factory, executor, warmup, close
 
 
 async def main():
@@ -129,25 +342,32 @@ async def main():
         format='[%(levelname)s] %(message)s'
     )
     
-
-    host = "0.0.0.0"
-    port = 10300
-    language = "ko-KR"
+    timer = StartupTimer("STT")
+    options = load_options()
+    # 인식 결과를 Chat UI로 직접 전달 (HA 자동화 왕복 없이)
+    chat_feed = ChatFeedPublisher() if bool(options.get("chat_direct_feed", True)) else None
+    timer.mark("옵션")
     
     try:
-        _LOGGER.info("=" * 50)
-        _LOGGER.info("Google STT Wyoming 서버 시작")
-        _LOGGER.info(f"주소: {host}:{port}")
-        _LOGGER.info(f"언어: {language}")
-        _LOGGER.info("=" * 50)
-        
-
-        server = AsyncServer.from_uri(f"tcp://{host}:{port}")
+        factory, _, warmup, close = create_handler_factory(options, chat_feed)
+        timer.mark("초기화")
+        server = AsyncServer.from_uri(f"tcp://{HOST}:{PORT}")
+        await server.start(factory)
+        timer.mark("수신 시작")
         
         _LOGGER.info("서버 리스닝 중...")
-        await server.run(
-            partial(GoogleSttEventHandler, language=language)
-        )
+        timer.log()
+        # 무거운 모듈은 연결을 받기 시작한 뒤 백그라운드에서 불러옴
+        warmup()
+        # 단계별 지표 제공 (Chat UI의 /metrics가 수집)
+        metrics_server = await metrics.serve_metrics_socket("stt")
+        try:
+            await wait_for_stop_signal()
+        finally:
+            metrics_server.close()
+            await server.stop()
+            await close()
+        _LOGGER.info("서버 종료됨")
     except Exception as e:
         _LOGGER.error(f"서버 시작 실패: {e}")
         import traceback
@@ -1,129 +1,115 @@
 #!/usr/bin/env python3
 """Wyoming Protocol wrapper for Google TTS"""
+from startup import StartupTimer, preload, wait_for_stop_signal
 import asyncio
 import logging
-import io
-import os
-from gtts import gTTS
+import time
 from functools import partial
 from wyoming.info import Describe, Info, Attribution, TtsProgram, TtsVoice
 from wyoming.server import AsyncEventHandler, AsyncServer
-from wyoming.tts import Synthesize
-from wyoming.audio import AudioChunk, AudioStart, AudioStop
+from wyoming.tts import (
+    Synthesize, SynthesizeStart, SynthesizeChunk, SynthesizeStop, SynthesizeStopped
+)
+from wyoming.audio import AudioStart
 from wyoming.event import Event
+from tts_stream import (
+    TTS_RATE, TTS_WIDTH, TTS_CHANNELS, PCM_FORMAT, DecoderPool, split_sentences, stream_segments,
+    prewarm, _cache_get
+)
+from tts_writer import AudioStreamWriter, DEFAULT_CHUNK_MS, DEFAULT_PACE_LEAD_MS
+from bounded_executor import BoundedExecutor, ExecutorBusy
+from tts_cache import TtsCache
+from addon_options import load_options
+from robot_actions import ActionBlockParser, extract_actions
+from chat_feed import ChatFeedPublisher
+import metrics
 _LOGGER = logging.getLogger(__name__)
-import math
-import re
-import json
-import numpy as np
-
-# --- Blossom Robot Control Logic ---
-
-class RotationTransformer:
-    def __init__(self):
-        # a, b, c Axis Angles (Radians)
-        angles = np.radians([0, 120, 240])
-
-        # Basis Vectors (3x3 Matrix)
-        # Each row is x, y, z component of a, b, c vectors
-        # z component is 1.0 to ensure Yaw moves all motors
-        self.basis_vectors = np.array([
-            [np.cos(theta), np.sin(theta), 1.0] for theta in angles
-        ])
-
-    def rpy_to_abc_rotation(self, roll, pitch, yaw):
-        """Global RPY to Local ABC rotation (Degrees)"""
-        # Global Rotation Vector
-        global_rotation_vec = np.array([roll, pitch, yaw])
-
-        # Matrix Multiplication
-        abc_rotations = self.basis_vectors @ global_rotation_vec
-        return abc_rotations[0], abc_rotations[1], abc_rotations[2]
-
-class BlossomController:
-    """Robot controller using Home Assistant ESPHome API"""
-    
-    def __init__(self):
-        self.ha_url = os.getenv("SUPERVISOR_API", "http://supervisor/core")
-        self.ha_token = os.getenv("SUPERVISOR_TOKEN", "")
-        self.transformer = RotationTransformer()
-        self._stop_event = asyncio.Event()
-        _LOGGER.info(f"Initialized BlossomController (HA API Mode)")
-
-    async def send_cmd(self, m1, m2, m3, m4):
-        """Send motor angles via Home Assistant ESPHome service"""
-        import aiohttp
-        
-        service_url = f"{self.ha_url}/api/services/esphome/esp32_voice_set_motors"
-        headers = {
-            "Authorization": f"Bearer {self.ha_token}",
-            "Content-Type": "application/json"
-        }
-        data = {"m1": float(m1), "m2": float(m2), "m3": float(m3), "m4": float(m4)}
-        
-        _LOGGER.info(f"Calling HA API: {service_url}")
-        _LOGGER.info(f"Motor data: {data}")
-        
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(service_url, json=data, headers=headers) as resp:
-                    resp_text = await resp.text()
-                    _LOGGER.info(f"HA API Response: {resp.status} - {resp_text[:200]}")
-                    if resp.status != 200:
-                        _LOGGER.error(f"HA API Error: {resp.status} - {resp_text}")
-        except Exception as e:
-            _LOGGER.error(f"HA API Send Error: {e}")
-
-    async def run_sequence(self, actions):
-        """Execute a sequence of actions."""
-        self._stop_event.clear()
-        _LOGGER.info(f"Starting Robot Sequence: {len(actions)} steps")
-        
-        try:
-            for i, action in enumerate(actions):
-                if self._stop_event.is_set():
-                    break
-                
-                r = float(action.get('r', 0))
-                p = float(action.get('p', 0))
-                y = float(action.get('y', 0))
-                ear = float(action.get('a', 0))
-                delay = max(float(action.get('d', 1.0)), 0.2)  # Minimum 0.2s delay
-                
-                _LOGGER.info(f"Motion Step {i+1}: R={r}, P={p}, Y={y}, Ear={ear}, Delay={delay}")
-
-                # Calculate Motor Angles (IK)
-                m1, m2, m3 = self.transformer.rpy_to_abc_rotation(r, p, y)
-                
-                # Send Command via HA API
-                await self.send_cmd(m1, m2, m3, ear)
-                
-                # Delay (Async, interruptible)
-                try:
-                    await asyncio.wait_for(self._stop_event.wait(), timeout=delay)
-                    break  # stop_event was set
-                except asyncio.TimeoutError:
-                    pass  # Timeout reached, continue
-                    
-        except Exception as e:
-            _LOGGER.error(f"Sequence Error: {e}")
-        finally:
-            _LOGGER.info("Robot Sequence Ended")
-
-    def stop(self):
-        self._stop_event.set()
-
-# Global Controller Instance
-robot_controller = BlossomController()
 
+HOST = "0.0.0.0"
+PORT = 10400
+LANGUAGE = "ko"
+
+# 단계별 지표 (/metrics)
+SYNTHESIS_SECONDS = metrics.histogram(
+    "sr_tts_synthesis_seconds", "합성 요청부터 마지막 오디오 전송까지 시간")
+FIRST_CHUNK_SECONDS = metrics.histogram(
+    "sr_tts_first_chunk_seconds", "합성 요청부터 첫 AudioChunk 전송까지 시간")
+AUDIO_CHUNKS = metrics.counter("sr_tts_audio_chunks_total", "전송한 AudioChunk 수")
+AUDIO_BYTES = metrics.counter("sr_tts_audio_bytes_total", "전송한 PCM 바이트")
+TRANSPORT_WRITES = metrics.counter("sr_tts_transport_writes_total", "AudioChunk를 묶어 쓴 transport 쓰기 수")
+REQUESTS = metrics.counter("sr_tts_requests_total", "합성 요청 결과별 수", ("result",))
+
+# gTTS 호환 언어 코드
+LANGUAGE_MAP = {
+    "ko-KR": "ko",
+    "ko": "ko",
+    "en-US": "en",
+    "en": "en",
+    "ja-JP": "ja",
+    "ja": "ja",
+}
+
+# 합성 대기열이 가득 찼을 때 대신 재생할 안내 문구 (시작 시 캐시에 고정)
+BUSY_PHRASES = {
+    "ko": "지금은 요청이 많아요. 잠시 후 다시 말씀해 주세요.",
+    "en": "I'm busy right now. Please try again in a moment.",
+    "ja": "ただいま混み合っています。少し後でもう一度お試しください。",
+}
+
+# 합성 전용 스레드 풀 기본값
+TTS_MAX_WORKERS = 6
+TTS_MAX_QUEUE = 12
+# TTS 캐시 디스크 읽기/쓰기 전용 스레드 풀 (합성 슬롯과 분리)
+CACHE_IO_WORKERS = 2
+CACHE_IO_QUEUE = 64
+# 수신 시작 후 백그라운드에서 미리 불러올 모듈 (로봇을 쓰면 blossom_robot도)
+PRELOAD_MODULES = ["gtts"]
+
+
+class LazyRobotRegistry:
+    """첫 로봇 동작이 나올 때 RobotRegistry 생성 - NumPy/aiohttp는 그때 import"""
+
+    def __init__(self, devices=None, **options):
+        self.devices = devices
+        self._options = options
+        self._registry = None
+
+    def controller_for(self, target=None):
+        if self._registry is None:
+            from blossom_robot import RobotRegistry
+            self._registry = RobotRegistry(self.devices, **self._options)
+        return self._registry.controller_for(target)
+
+    async def close(self):
+        if self._registry is not None:
+            await self._registry.close()
 
 
 class GoogleTtsEventHandler(AsyncEventHandler):
     """Wyoming event handler for Google TTS"""
 
-    def __init__(self, *args, language="ko", **kwargs):
+    def __init__(self, *args, language="ko", cache=None, executor=None, robots=None,
+                 chat_feed=None, chunk_ms=DEFAULT_CHUNK_MS, pace_lead_ms=DEFAULT_PACE_LEAD_MS,
+                 cache_executor=None, decoders=None, **kwargs):
         super().__init__(*args, **kwargs)
         self.language = language
+        self.cache = cache
+        self.executor = executor or BoundedExecutor("tts", TTS_MAX_WORKERS, TTS_MAX_QUEUE)
+        # 캐시 디스크 I/O (None이면 호출 위치에서 바로 실행)
+        self.cache_executor = cache_executor
+        # 미리 띄워 둔 ffmpeg 디코더 (None이면 문장마다 새로 띄움)
+        self.decoders = decoders
+        # 로봇 장치별 컨트롤러 (None이면 로봇 동작은 텍스트에서 제거만 함)
+        self.robots = robots
+        # 응답 문장을 Chat UI로 바로 전달 (None이면 사용 안 함)
+        self.chat_feed = chat_feed
+        # AudioChunk 길이와 재생 시각보다 앞서 보낼 최대 길이 (ms, tts_writer.AudioStreamWriter)
+        self.chunk_ms = chunk_ms
+        self.pace_lead_ms = pace_lead_ms
+        # 스트리밍 합성 요청 상태 (SynthesizeStart ~ SynthesizeStop)
+        self._stream_parser = None
+        self._stream_voice = None
+        self._stream_text = []
 
     async def handle_event(self, event: Event) -> bool:
         _LOGGER.info(
@@ -145,6 +131,7 @@ class GoogleTtsEventHandler(AsyncEventHandler):
                             ),
                             installed=True,
                             version="1.0",
+                            supports_synthesize_streaming=True,
                             voices=[
                                 TtsVoice(
                                     name="ko",
@@ -198,156 +185,260 @@ class GoogleTtsEventHandler(AsyncEventHandler):
             return True
 
         if Synthesize.is_type(event.type):
+            if self._stream_parser is not None:
+                # 스트리밍 요청 중 호환용으로 함께 오는 전체 텍스트 - 무시
+                return True
 
             synthesize = Synthesize.from_event(event)
             text = synthesize.text
             _LOGGER.info(f"TTS 요청 수신: {text}")
 
-            # --- Check for Robot Control JSON ---
-            # Robust Regex: Find [ ... ] block anywhere, accommodating Markdown ```json ... ``` wrapper
-            # Pattern: 
-            # 1. Optional ```json (or just ```)
-            # 2. [ ... ] (Non-greedy content)
-            # 3. Optional ```
-            
-            robot_action_task = None
-            json_pattern = r'(\[.*?\])'
-            
-            # Simple Search for array structure first
-            match = re.search(json_pattern, text, re.DOTALL)
-            
-            if match:
-                json_str = match.group(1)
-                
-                try:
-                    # Attempt parse
-                    actions = json.loads(json_str)
-                    _LOGGER.info(f"Robot Actions Found: {len(actions)} steps")
-                    
-                    # Start Robot Task
-                    robot_action_task = asyncio.create_task(robot_controller.run_sequence(actions))
-                    
-                    # Remove the JSON part from text for TTS
-                    # Also clean up potential surrounding backticks if they exist
-                    start, end = match.span(1)
-                    
-                    # Check for preceding ``` or ```json
-                    pre_text = text[:start]
-                    post_text = text[end:]
-                    
-                    # Simple cleanup: Remove markdown code block markers if they were wrapping the JSON
-                    # If pre_text ends with ```json or ``` and post_text starts with ```
-                    pre_text = re.sub(r'```\w*\s*$', '', pre_text)
-                    post_text = re.sub(r'^\s*```', '', post_text)
-                    
-                    text = (pre_text + post_text).strip()
-                    
-                    if not text:
-                        text = " " # Prevent empty text error
-                        
-                except json.JSONDecodeError:
-                    _LOGGER.warning(f"Found bracket block but failed to parse JSON: {json_str[:20]}...")
-                except Exception as e:
-                    _LOGGER.error(f"Robot processing error: {e}")
-
-            # 언어 설정
-
-            
-            # 언어 설정
-            voice = synthesize.voice
-            if voice and voice.name:
-                language = voice.name
-            else:
-                language = self.language
-
-            # gTTS 호환 언어로 정규화
-            LANGUAGE_MAP = {
-                "ko-KR": "ko",
-                "ko": "ko",
-                "en-US": "en",
-                "en": "en",
-                "ja-JP": "ja",
-                "ja": "ja",
-            }
-
-            language = LANGUAGE_MAP.get(language, self.language)
-            
-            # 음성 합성 실행
-            audio_data = await self._synthesize_speech(text, language)
-            
-            if audio_data:
-                # 오디오 시작 이벤트
-                await self.write_event(
-                    AudioStart(
-                        rate=22050,
-                        width=2,
-                        channels=1
-                    ).event()
-                )
-                
-                # 오디오 데이터를 청크로 전송
-                chunk_size = 1024
-                for i in range(0, len(audio_data), chunk_size):
-                    chunk = audio_data[i:i + chunk_size]
-                    await self.write_event(
-                        AudioChunk(
-                            audio=chunk,
-                            rate=22050,
-                            width=2,
-                            channels=1
-                        ).event()
-                    )
-                
-                # 오디오 종료 이벤트
-                await self.write_event(AudioStop().event())
-                
-                # Robot sequence runs independently - don't stop it when TTS ends
-                # It will complete on its own based on its delay timings
-                # robot_controller.stop() removed - let sequence complete
-
-                _LOGGER.info(f"음성 합성 완료: {len(audio_data)} bytes")
-            else:
-                _LOGGER.error("음성 합성 실패")
-            
-            return True
+            # 로봇 동작 JSON 블록 분리 (마크다운 코드 펜스 포함)
+            text, actions = extract_actions(text)
+            if actions:
+                self._start_robot(actions, synthesize.voice)
 
+            await self._speak(text, synthesize.voice)
+            return True
 
+        if SynthesizeStart.is_type(event.type):
+            # 스트리밍 요청 - 텍스트가 오는 대로 동작 블록을 찾아 바로 로봇 시작
+            self._stream_voice = SynthesizeStart.from_event(event).voice
+            self._stream_parser = ActionBlockParser()
+            self._stream_text = []
+            return True
 
+        if SynthesizeChunk.is_type(event.type):
+            if self._stream_parser is None:
+                return True
+            parser = self._stream_parser
+            had_actions = parser.actions is not None
+            self._stream_text.append(parser.feed(SynthesizeChunk.from_event(event).text))
+            if parser.actions is not None and not had_actions:
+                self._start_robot(parser.actions, self._stream_voice)
+            return True
 
+        if SynthesizeStop.is_type(event.type):
+            if self._stream_parser is None:
+                return True
+            self._stream_text.append(self._stream_parser.finish())
+            text = "".join(self._stream_text).strip()
+            voice = self._stream_voice
+            self._stream_parser = None
+            self._stream_text = []
+            _LOGGER.info(f"TTS 스트리밍 요청 수신: {text}")
+
+            await self._speak(text, voice)
+            await self.write_event(SynthesizeStopped().event())
+            return True
 
         return True
 
-    async def _synthesize_speech(self, text: str, language: str) -> bytes:
-        """음성 합성 (블로킹 작업을 비동기로)"""
-        loop = asyncio.get_event_loop()
-        
+    def _start_robot(self, actions: list, voice):
+        """대상 로봇의 동작 시퀀스 시작 - 같은 로봇의 이전 동작만 선점 (다른 로봇은 영향 없음)"""
+        _LOGGER.info(f"Robot Actions Found: {len(actions)} steps")
+        if self.robots is None:
+            _LOGGER.debug("로봇 장치 미설정 - 동작 무시")
+            return
         try:
-
-            audio_bytes = await loop.run_in_executor(
-                None,
-                partial(self._create_audio, text, language)
-            )
-            return audio_bytes
+            target = voice.speaker if voice else None
+            self.robots.controller_for(target).start_sequence(actions)
         except Exception as e:
+            _LOGGER.error(f"Robot processing error: {e}")
+
+    async def _speak(self, text: str, voice):
+        """텍스트를 합성하여 AudioStart/Chunk/Stop으로 전송"""
+        requested = time.monotonic()
+        if self.chat_feed is not None:
+            # 합성을 시작하는 순간 화면에 표시
+            self.chat_feed.publish("assistant", text)
+        if not text:
+            text = " "  # Prevent empty text error
+
+        # 언어 설정
+        if voice and voice.name:
+            language = voice.name
+        else:
+            language = self.language
+
+        # gTTS 호환 언어로 정규화
+        language = LANGUAGE_MAP.get(language, self.language)
+
+        # 음성 합성 실행 (디코딩되는 대로 바로 스트리밍)
+        stream = None
+        first_sent = False
+        result = "ok"
+        try:
+            async for pcm in self._synthesize_speech(text, language):
+                stream = await self._write_audio(pcm, stream)
+                if not first_sent and stream.writes:
+                    first_sent = True
+                    FIRST_CHUNK_SECONDS.observe(time.monotonic() - requested)
+        except ExecutorBusy:
+            result = "busy"
+            _LOGGER.warning(f"합성 대기열 가득 참: {self.executor.stats()}")
+            busy_audio = await self._busy_audio(language)
+            if busy_audio and stream is None:
+                # 과부하 시 짧은 안내 음성으로 대체
+                stream = await self._write_audio(busy_audio, stream)
+        except Exception as e:
+            result = "error"
             _LOGGER.error(f"음성 합성 오류: {e}")
+        REQUESTS.labels(result if stream is not None or result != "ok" else "empty").inc()
+
+        if stream is not None:
+            # 남은 청크 + 오디오 종료 이벤트
+            await stream.finish()
+            if not first_sent:
+                FIRST_CHUNK_SECONDS.observe(time.monotonic() - requested)
+            SYNTHESIS_SECONDS.observe(time.monotonic() - requested)
+            AUDIO_CHUNKS.inc(stream.chunks)
+            AUDIO_BYTES.inc(stream.audio_bytes)
+            TRANSPORT_WRITES.inc(stream.writes)
+
+            # Robot sequence runs independently - don't stop it when TTS ends
+            # It will complete on its own based on its delay timings
+
+            _LOGGER.info(
+                f"음성 합성 완료: {stream.audio_bytes} bytes ({stream.chunks} chunks, 쓰기 {stream.writes}회)"
+            )
+            if self.cache is not None:
+                _LOGGER.debug(f"TTS 캐시 상태: {self.cache.stats()}")
+            _LOGGER.debug(f"합성 스레드 풀 상태: {self.executor.stats()}")
+        else:
+            _LOGGER.error("음성 합성 실패")
+
+    async def _write_audio(self, pcm: bytes, stream: AudioStreamWriter = None) -> AudioStreamWriter:
+        """PCM을 AudioChunk로 전송 (첫 호출이면 AudioStart를 보내고 전송기 생성)"""
+        if stream is None:
+            # 첫 PCM 프레임이 나오자마자 오디오 시작 이벤트
+            await self.write_event(
+                AudioStart(
+                    rate=TTS_RATE,
+                    width=TTS_WIDTH,
+                    channels=TTS_CHANNELS
+                ).event()
+            )
+            stream = AudioStreamWriter(
+                self.writer, TTS_RATE, TTS_WIDTH, TTS_CHANNELS,
+                chunk_ms=self.chunk_ms, pace_lead_ms=self.pace_lead_ms
+            )
+
+        # 청크 단위로 모아서 전송
+        await stream.write(pcm)
+        return stream
+
+    async def _busy_audio(self, language: str) -> bytes:
+        """캐시에 고정된 과부하 안내 음성 (없으면 빈 bytes, 디스크 읽기는 cache_executor에서)"""
+        phrase = BUSY_PHRASES.get(language)
+        if self.cache is None or not phrase:
             return b""
+        parts = []
+        for segment in split_sentences(phrase):
+            key = self.cache.make_key(segment, language, PCM_FORMAT)
+            data = await _cache_get(self.cache, key, self.cache_executor, record=False)
+            if not data:
+                return b""
+            parts.append(data)
+        return b"".join(parts)
+
+    async def _synthesize_speech(self, text: str, language: str):
+        """음성 합성 - 문장 단위로 병렬 합성, 디코딩되는 PCM을 순서대로 yield"""
+        async for pcm in stream_segments(
+            text, language, cache=self.cache, executor=self.executor, io_executor=self.cache_executor,
+            decoders=self.decoders
+        ):
+            yield pcm
+
+
+def _load_prewarm_phrases(options: dict) -> dict:
+    """애드온 옵션의 tts_prewarm 목록을 {gTTS 언어: [문구...]}로 변환"""
+    phrases_by_language = {}
+    for entry in options.get("tts_prewarm") or []:
+        language = LANGUAGE_MAP.get(entry.get("language", ""), entry.get("language"))
+        phrases = [p for p in entry.get("phrases") or [] if p and p.strip()]
+        if language and phrases:
+            phrases_by_language.setdefault(language, []).extend(phrases)
+    return phrases_by_language
+
+
+def create_handler_factory(options: dict, chat_feed=None):
+    """옵션으로 모든 연결이 공유하는 자원을 만들고
+    (핸들러 팩토리, 합성 스레드 풀, 워밍업 시작 함수, 정리 함수) 반환
+
+    워밍업(무거운 모듈 import, 자주 쓰는 문구 사전 합성)은 서버가 수신을 시작한 뒤
+    이벤트 루프 안에서 호출합니다.
+    chat_feed: 응답 문장을 Chat UI로 보낼 publish(role, message) 객체 (None이면 사용 안 함)
+    """
+    max_workers = int(options.get("tts_max_workers", TTS_MAX_WORKERS))
+    max_queue = int(options.get("tts_max_queue", TTS_MAX_QUEUE))
+    chunk_ms = int(options.get("tts_chunk_ms", DEFAULT_CHUNK_MS))
+    pace_lead_ms = int(options.get("tts_pace_lead_ms", DEFAULT_PACE_LEAD_MS))
+    # 로봇별 컨트롤러 (첫 동작 시 생성, HTTP 연결 풀은 공유) - 장치 목록이 비어 있으면 사용 안 함
+    devices = options.get("robot_devices")
+    robots = None
+    if devices != []:
+        robots = LazyRobotRegistry(
+            devices,
+            trajectory_upload=bool(options.get("robot_trajectory_upload", False)),
+            interpolation_step=int(options.get("robot_interpolation_ms", 0)) / 1000.0,
+        )
 
-    def _create_audio(self, text: str, language: str) -> bytes:
-        """실제 음성 생성 함수 (동기)"""
-        try:
+    _LOGGER.info("=" * 50)
+    _LOGGER.info("Google TTS Wyoming 서버 시작")
+    _LOGGER.info(f"주소: {HOST}:{PORT}")
+    _LOGGER.info(f"언어: {LANGUAGE}")
+    _LOGGER.info(f"합성 스레드: {max_workers}개 (대기열 {max_queue})")
+    _LOGGER.info(f"오디오 청크: {chunk_ms}ms, 앞서 보내기: {f'{pace_lead_ms}ms' if pace_lead_ms else '제한 없음'}")
+    _LOGGER.info(f"로봇 장치: {', '.join(devices or ['기본']) if robots else '사용 안 함'}")
+    _LOGGER.info(f"Chat UI 직접 전달: {chat_feed is not None}")
+    _LOGGER.info("=" * 50)
+
+    # 모든 연결이 공유하는 합성 전용 스레드 풀
+    executor = BoundedExecutor("tts", max_workers, max_queue)
+
+    # 합성 결과 캐시 (/data 아래 디스크 계층은 재시작 후에도 유지)
+    cache = TtsCache()
+    cache_executor = BoundedExecutor("tts_cache", CACHE_IO_WORKERS, CACHE_IO_QUEUE)
+    # 문장마다 fork/exec를 기다리지 않도록 ffmpeg 디코더를 미리 띄워 둠
+    decoders = DecoderPool()
+
+    # 자주 쓰는 문구 사전 워밍 목록
+    prewarm_phrases = _load_prewarm_phrases(options)
+    # 과부하 안내 음성은 항상 고정
+    for busy_language in set(prewarm_phrases) | {LANGUAGE}:
+        if busy_language in BUSY_PHRASES:
+            prewarm_phrases.setdefault(busy_language, []).append(BUSY_PHRASES[busy_language])
+    preload_modules = PRELOAD_MODULES + (["blossom_robot"] if robots else [])
+
+    factory = partial(
+        GoogleTtsEventHandler,
+        language=LANGUAGE, cache=cache, executor=executor, robots=robots,
+        chat_feed=chat_feed, chunk_ms=chunk_ms, pace_lead_ms=pace_lead_ms,
+        cache_executor=cache_executor, decoders=decoders
+    )
+    warmup_tasks = []
 
-            tts = gTTS(text=text, lang=language, slow=False)
-            mp3_buffer = io.BytesIO()
-            tts.write_to_fp(mp3_buffer)
-            mp3_buffer.seek(0)
-            
+    async def run_warmup():
+        decoders.fill()
+        await asyncio.to_thread(preload, preload_modules)
+        await prewarm(cache, prewarm_phrases, executor=executor, io_executor=cache_executor, decoders=decoders)
 
-            audio_data = mp3_buffer.read()
+    def warmup():
+        # 서버 수신 시작을 막지 않도록 백그라운드 실행
+        warmup_tasks.append(asyncio.create_task(run_warmup()))
 
-            return audio_data
-        except Exception as e:
-            _LOGGER.error(f"오디오 생성 오류: {e}")
-            return b""
+    async def close():
+        for task in warmup_tasks:
+            task.cancel()
+        if robots is not None:
+            await robots.close()
+        executor.shutdown()
+        await decoders.close()
+        # 진행 중인 디스크 저장은 마치고 종료
+        cache_executor.shutdown(cancel_futures=False)
+
+    return factory, executor, warmup, close
 
 
 async def main():
@@ -357,25 +448,32 @@ async def main():
         format='[%(levelname)s] %(message)s'
     )
     
-
-    host = "0.0.0.0"
-    port = 10400
-    language = "ko"
+    timer = StartupTimer("TTS")
+    options = load_options()
+    # 응답 문장을 Chat UI로 직접 전달 (HA 자동화 왕복 없이)
+    chat_feed = ChatFeedPublisher() if bool(options.get("chat_direct_feed", True)) else None
+    timer.mark("옵션")
     
     try:
-        _LOGGER.info("=" * 50)
-        _LOGGER.info("Google TTS Wyoming 서버 시작")
-        _LOGGER.info(f"주소: {host}:{port}")
-        _LOGGER.info(f"언어: {language}")
-        _LOGGER.info("=" * 50)
-        
-
-        server = AsyncServer.from_uri(f"tcp://{host}:{port}")
+        factory, _, warmup, close = create_handler_factory(options, chat_feed)
+        timer.mark("초기화")
+        server = AsyncServer.from_uri(f"tcp://{HOST}:{PORT}")
+        await server.start(factory)
+        timer.mark("수신 시작")
         
         _LOGGER.info("서버 리스닝 중...")
-        await server.run(
-            partial(GoogleTtsEventHandler, language=language)
-        )
+        timer.log()
+        # 무거운 모듈 import와 사전 합성은 연결을 받기 시작한 뒤 백그라운드에서
+        warmup()
+        # 단계별 지표 제공 (Chat UI의 /metrics가 수집)
+        metrics_server = await metrics.serve_metrics_socket("tts")
+        try:
+            await wait_for_stop_signal()
+        finally:
+            metrics_server.close()
+            await server.stop()
+            await close()
+        _LOGGER.info("서버 종료됨")
     except Exception as e:
         _LOGGER.error(f"서버 시작 실패: {e}")
         import traceback